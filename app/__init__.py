@@ -1,7 +1,9 @@
 from flask import Flask
-from app.ui import register_blueprints
 
 def create_app():
+    # Imported here so the workers and the monitor can import app.* without the UI
+    from app.ui import register_blueprints
+    
     app = Flask(__name__)
     
     # Configure the app
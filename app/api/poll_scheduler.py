@@ -0,0 +1,395 @@
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from zoneinfo import ZoneInfo
+
+from pymongo.errors import PyMongoError
+
+from app.core.database import QuotaUsageRepository
+from config.config import (
+    CHECK_INTERVAL_MINUTES,
+    YOUTUBE_DAILY_QUOTA_BUDGET,
+    SCHEDULER_MIN_INTERVAL_MINUTES,
+    SCHEDULER_MAX_INTERVAL_MINUTES
+)
+
+logger = logging.getLogger(__name__)
+
+# YouTube Data API quota costs of the calls the monitor makes
+QUOTA_COSTS = {
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "search.list": 100,
+    "videos.list": 1
+}
+
+# The daily quota resets at midnight Pacific Time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Polls per expected upload gap while a channel is active
+POLLS_PER_UPLOAD = 4
+
+# A channel is dormant once its last upload is this many gaps old
+DORMANT_AFTER_GAPS = 3
+
+# Consecutive failures stop doubling the interval after this many
+MAX_FAILURE_BACKOFF = 6
+
+
+def upload_cadence(publish_times: Sequence[float]) -> Optional[float]:
+    """
+    Typical number of seconds between a channel's uploads.
+    
+    Uses the median gap so that a single burst or hiatus does not skew it.
+    
+    Args:
+        publish_times: Upload timestamps (epoch seconds), in any order
+    
+    Returns:
+        Median gap in seconds, or None with fewer than two uploads
+    """
+    times = sorted(publish_times)
+    gaps = [later - earlier for earlier, later in zip(times, times[1:]) if later > earlier]
+    if not gaps:
+        return None
+    return median(gaps)
+
+
+class QuotaBudget:
+    """
+    Thread-safe tally of YouTube API quota spent in the current quota day.
+    
+    The tally is kept in MongoDB (QuotaUsageRepository), so every process
+    calling the API with the same key charges one daily budget: the
+    monitor's polls, the WebSub receiver's videos.list lookups and
+    backfills. If MongoDB cannot be reached, the units this process spent
+    are still counted.
+    """
+    
+    def __init__(self, daily_budget: int = YOUTUBE_DAILY_QUOTA_BUDGET, persistent: bool = True):
+        """
+        Args:
+            daily_budget: Units available per quota day
+            persistent: Share the tally with other processes through MongoDB;
+                        if False, only this process's calls are counted
+        """
+        self.daily_budget = daily_budget
+        self.persistent = persistent
+        self._lock = threading.Lock()
+        self._day = None
+        self._spent = 0
+        self._spent_here = 0
+    
+    @staticmethod
+    def day_bounds(now: Optional[float] = None) -> tuple:
+        """Start and end (epoch seconds) of the quota day containing `now`."""
+        local = datetime.fromtimestamp(now if now is not None else time.time(), QUOTA_TIMEZONE)
+        start = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = start + timedelta(days=1)
+        return start.timestamp(), end.timestamp()
+    
+    @staticmethod
+    def day_key(day_start: float) -> str:
+        """Date of a quota day in the quota timezone, e.g. 2024-01-31."""
+        return datetime.fromtimestamp(day_start, QUOTA_TIMEZONE).date().isoformat()
+    
+    def _roll(self, now: float) -> float:
+        day = self.day_bounds(now)[0]
+        if day != self._day:
+            self._day = day
+            self._spent = 0
+            self._spent_here = 0
+        return day
+    
+    def _observe(self, day: float, total: int) -> None:
+        """Take in the shared total of a day read from or written to MongoDB."""
+        with self._lock:
+            if day == self._day:
+                self._spent = max(self._spent, total)
+    
+    def charge(self, method: str, now: Optional[float] = None) -> None:
+        """Record one executed API call."""
+        units = QUOTA_COSTS.get(method, 1)
+        with self._lock:
+            day = self._roll(now if now is not None else time.time())
+            self._spent += units
+            self._spent_here += units
+        
+        if self.persistent:
+            try:
+                self._observe(day, QuotaUsageRepository.add_units(self.day_key(day), units))
+            except PyMongoError as e:
+                logger.warning(f"Could not record {units} quota units for {method}: {str(e)}")
+    
+    def spent(self, now: Optional[float] = None) -> int:
+        """Units spent so far in the current quota day, by every process."""
+        with self._lock:
+            day = self._roll(now if now is not None else time.time())
+        
+        if self.persistent:
+            try:
+                self._observe(day, QuotaUsageRepository.get_units(self.day_key(day)))
+            except PyMongoError as e:
+                logger.warning(f"Could not read the quota spent today: {str(e)}")
+        with self._lock:
+            return self._spent
+    
+    def spent_here(self, now: Optional[float] = None) -> int:
+        """Units this process spent so far in the current quota day."""
+        with self._lock:
+            self._roll(now if now is not None else time.time())
+            return self._spent_here
+    
+    def remaining(self, now: Optional[float] = None) -> int:
+        """Units left in the current quota day."""
+        return max(self.daily_budget - self.spent(now), 0)
+
+
+class PollScheduler:
+    """
+    Decides when each channel is polled next.
+    
+    Channels sit on a min-heap keyed by their next due time. After each
+    poll a channel's interval is derived from its upload cadence (the
+    median gap between its recent uploads): about POLLS_PER_UPLOAD polls
+    per gap, tightening as the next upload becomes due and backing off in
+    proportion to how long a channel has been quiet. Channels without
+    enough history use CHECK_INTERVAL_MINUTES. Failing channels back off
+    exponentially.
+    
+    Intervals are then stretched uniformly whenever polling every channel
+    at its cadence would overrun the remaining daily quota, and nothing is
+    scheduled before the quota reset once the budget is spent.
+    """
+    
+    def __init__(
+        self,
+        quota: Optional[QuotaBudget] = None,
+        min_interval: float = SCHEDULER_MIN_INTERVAL_MINUTES * 60,
+        max_interval: float = SCHEDULER_MAX_INTERVAL_MINUTES * 60,
+        default_interval: float = CHECK_INTERVAL_MINUTES * 60
+    ):
+        """
+        Args:
+            quota: Shared quota tally; a fresh one if omitted
+            min_interval: Shortest interval between polls of a channel, in seconds
+            max_interval: Longest interval between polls of a channel, in seconds
+            default_interval: Interval for channels with no upload history, in seconds
+        """
+        self.quota = quota or QuotaBudget()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self._heap: List[tuple] = []
+        self._due: Dict[str, float] = {}
+        self._intervals: Dict[str, float] = {}
+        self._polls = 0
+        self._polls_day = None
+    
+    def __contains__(self, channel_id: str) -> bool:
+        return channel_id in self._due
+    
+    def __len__(self) -> int:
+        return len(self._due)
+    
+    def add(self, channel_id: str, due_at: Optional[float] = None) -> None:
+        """Schedule a channel; it is due immediately unless `due_at` is given."""
+        self._push(channel_id, due_at if due_at is not None else time.time())
+        self._intervals.setdefault(channel_id, self.default_interval)
+    
+    def remove(self, channel_id: str) -> None:
+        """Stop scheduling a channel; its heap entry is discarded lazily."""
+        self._due.pop(channel_id, None)
+        self._intervals.pop(channel_id, None)
+    
+    def sync(self, channel_ids: Iterable[str], due_times: Optional[Dict[str, float]] = None) -> None:
+        """
+        Match the schedule to the channel registry.
+        
+        Args:
+            channel_ids: Channels that should be scheduled
+            due_times: Persisted next poll times for channels not yet scheduled
+        """
+        due_times = due_times or {}
+        wanted = set(channel_ids)
+        for channel_id in wanted - self._due.keys():
+            self.add(channel_id, due_times.get(channel_id))
+        for channel_id in self._due.keys() - wanted:
+            self.remove(channel_id)
+    
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """Remove and return every channel whose poll is due."""
+        now = now if now is not None else time.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, channel_id = heapq.heappop(self._heap)
+            if self._due.get(channel_id) == due_at:
+                del self._due[channel_id]
+                due.append(channel_id)
+        return due
+    
+    def next_due(self) -> Optional[float]:
+        """Time of the earliest scheduled poll."""
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+    
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        """Seconds until the earliest scheduled poll, zero if one is overdue."""
+        next_due = self.next_due()
+        if next_due is None:
+            return self.default_interval
+        return max(next_due - (now if now is not None else time.time()), 0.0)
+    
+    def cadence_interval(
+        self,
+        publish_times: Sequence[float],
+        now: Optional[float] = None,
+        failures: int = 0
+    ) -> float:
+        """
+        Interval until a channel's next poll, before the quota budget is applied.
+        
+        Args:
+            publish_times: Recent upload timestamps (epoch seconds)
+            now: Current time (epoch seconds)
+            failures: Consecutive failed polls of the channel
+        """
+        now = now if now is not None else time.time()
+        cadence = upload_cadence(publish_times)
+        
+        if cadence is None:
+            interval = self.default_interval
+        else:
+            since_last = now - max(publish_times)
+            if since_last > cadence * DORMANT_AFTER_GAPS:
+                # Quiet for several gaps: poll less the longer it stays quiet
+                interval = since_last / POLLS_PER_UPLOAD
+            elif since_last >= cadence / 2:
+                # Next upload is likely soon: poll twice as often
+                interval = cadence / (POLLS_PER_UPLOAD * 2)
+            else:
+                interval = cadence / POLLS_PER_UPLOAD
+        
+        interval *= 2 ** min(failures, MAX_FAILURE_BACKOFF)
+        return min(max(interval, self.min_interval), self.max_interval)
+    
+    def cost_per_poll(self, now: Optional[float] = None) -> float:
+        """
+        Average quota units spent per channel poll so far today.
+        
+        Only this process's spending counts, so pushes and backfills run
+        elsewhere do not inflate it; both tallies restart with the quota day.
+        """
+        polls = self._count_polls(0, now)
+        if not polls:
+            return QUOTA_COSTS["playlistItems.list"]
+        return max(self.quota.spent_here(now) / polls, QUOTA_COSTS["playlistItems.list"])
+    
+    def budget_stretch(self, now: Optional[float] = None) -> float:
+        """
+        Factor applied to every interval so the rest of the day fits the budget.
+        
+        1.0 while the remaining quota covers polling each channel at its
+        cadence until the reset; larger otherwise.
+        """
+        now = now if now is not None else time.time()
+        projected = self._project_units(self.quota.day_bounds(now)[1] - now, now)
+        remaining = self.quota.remaining(now)
+        if projected <= remaining:
+            return 1.0
+        if remaining <= 0:
+            return float("inf")
+        return projected / remaining
+    
+    def reschedule(
+        self,
+        channel_id: str,
+        publish_times: Sequence[float] = (),
+        failures: int = 0,
+        now: Optional[float] = None,
+        min_interval: Optional[float] = None
+    ) -> float:
+        """
+        Schedule a channel's next poll after it was polled.
+        
+        Args:
+            channel_id: Channel that was polled
+            publish_times: Recent upload timestamps (epoch seconds)
+            failures: Consecutive failed polls of the channel
+            now: Current time (epoch seconds)
+            min_interval: Lower bound for this channel's interval in seconds,
+                          e.g. when pushes already cover it
+        
+        Returns:
+            Time of the next poll (epoch seconds)
+        """
+        now = now if now is not None else time.time()
+        self._count_polls(1, now)
+        interval = self.cadence_interval(publish_times, now, failures)
+        if min_interval is not None:
+            interval = max(interval, min(min_interval, self.max_interval))
+        self._intervals[channel_id] = interval
+        
+        stretch = self.budget_stretch(now)
+        if stretch == float("inf"):
+            due_at = self.quota.day_bounds(now)[1]
+        else:
+            due_at = now + min(self._intervals[channel_id] * stretch, self.max_interval)
+        self._push(channel_id, due_at)
+        return due_at
+    
+    def quota_report(self, now: Optional[float] = None) -> Dict:
+        """
+        Quota spent and projected at the current intervals.
+        
+        Returns:
+            Dictionary with the daily budget, units spent today, units
+            projected by the end of the quota day, units a full day would
+            cost, and per-channel intervals in minutes
+        """
+        now = now if now is not None else time.time()
+        spent = self.quota.spent(now)
+        stretch = self.budget_stretch(now)
+        day_end = self.quota.day_bounds(now)[1]
+        
+        if stretch == float("inf"):
+            projected_rest = 0.0
+        else:
+            projected_rest = self._project_units(day_end - now, now) / stretch
+        
+        return {
+            "daily_budget": self.quota.daily_budget,
+            "spent_today": spent,
+            "projected_today": round(spent + projected_rest),
+            "projected_per_day": round(self._project_units(24 * 60 * 60, now)),
+            "budget_stretch": stretch,
+            "channels": len(self._intervals),
+            "intervals_minutes": {
+                channel_id: round(interval / 60, 1)
+                for channel_id, interval in self._intervals.items()
+            }
+        }
+    
+    def _count_polls(self, polls: int, now: Optional[float] = None) -> int:
+        """Add to the polls made in the current quota day and return their number."""
+        day = self.quota.day_bounds(now)[0]
+        if day != self._polls_day:
+            self._polls_day = day
+            self._polls = 0
+        self._polls += polls
+        return self._polls
+    
+    def _project_units(self, seconds: float, now: Optional[float] = None) -> float:
+        """Quota units needed to poll every channel at its cadence for `seconds`."""
+        cost = self.cost_per_poll(now)
+        return sum(seconds / interval * cost for interval in self._intervals.values())
+    
+    def _push(self, channel_id: str, due_at: float) -> None:
+        self._due[channel_id] = due_at
+        heapq.heappush(self._heap, (due_at, channel_id))
@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of YouTube Data API responses and their ETags.
+    
+    Entries are keyed by the request URI, which carries every request
+    parameter. A cached ETag is sent as If-None-Match; when the API answers
+    304 Not Modified the cached response is reused instead of downloading
+    and parsing the page again. Responses are shared, not copied, so
+    callers must treat them as read-only.
+    """
+    
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return the cached (etag, response) for a request, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        """Store a response that carries an etag; others are not cacheable."""
+        etag = response.get("etag")
+        if not etag:
+            return
+        with self._lock:
+            self._entries[key] = (etag, response)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def record(self, hit: bool) -> None:
+        """Count a revalidation (304) as a hit and a full response as a miss."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+    
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,288 @@
+import hashlib
+import hmac
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from defusedxml import ElementTree
+
+from app.core.database import ChannelStateRepository
+from app.models.video import Video
+from app.utils.dates import as_utc
+from config.config import (
+    WEBSUB_HUB_URL,
+    WEBSUB_CALLBACK_URL,
+    WEBSUB_SECRET,
+    WEBSUB_LEASE_SECONDS,
+    WEBSUB_RENEW_BEFORE_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Topic YouTube publishes a channel's upload notifications on
+TOPIC_URL = "https://www.youtube.com/xml/feeds/videos.xml?channel_id={channel_id}"
+
+# Namespaces used in YouTube's Atom push notifications
+ATOM_NAMESPACES = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "yt": "http://www.youtube.com/xml/schemas/2015",
+    "at": "http://purl.org/atompub/tombstones/1.0"
+}
+
+# Notifications larger than this are rejected unparsed
+MAX_NOTIFICATION_BYTES = 1024 * 1024
+
+# A subscription request still awaiting verification is not re-sent for this long
+SUBSCRIBE_RETRY_SECONDS = 60 * 60
+
+
+def topic_url(channel_id: str) -> str:
+    """WebSub topic URL for a channel's uploads."""
+    return TOPIC_URL.format(channel_id=channel_id)
+
+
+def channel_id_from_topic(topic: str) -> Optional[str]:
+    """Channel ID of a YouTube uploads topic URL, or None for any other topic."""
+    parts = urlsplit(topic or "")
+    if parts.netloc != "www.youtube.com" or parts.path != "/xml/feeds/videos.xml":
+        return None
+    return parse_qs(parts.query).get("channel_id", [None])[0]
+
+
+def lease_active(state: Dict, now: Optional[datetime] = None) -> bool:
+    """Check whether a channel has a verified WebSub lease that has not expired."""
+    expires_at = state.get("websub_lease_expires_at")
+    if expires_at is None:
+        return False
+    return as_utc(expires_at) > (now or datetime.now(timezone.utc))
+
+
+def require_secret(secret: Optional[str] = WEBSUB_SECRET) -> None:
+    """
+    Refuse to run WebSub without a subscription secret.
+    
+    The callback URL is public, so without signed notifications anyone
+    could push made-up videos into the pipeline.
+    
+    Raises:
+        ValueError: If no secret is configured
+    """
+    if not secret:
+        raise ValueError("WEBSUB_SECRET must be set when WebSub is enabled")
+
+
+def signature_valid(body: bytes, signature: Optional[str], secret: Optional[str] = WEBSUB_SECRET) -> bool:
+    """
+    Check the X-Hub-Signature of a notification against the subscription secret.
+    
+    Without a configured secret no notification is accepted.
+    """
+    if not secret:
+        return False
+    if not signature or "=" not in signature:
+        return False
+    algorithm, digest = signature.split("=", 1)
+    if algorithm not in ("sha1", "sha256", "sha384", "sha512"):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, getattr(hashlib, algorithm)).hexdigest()
+    return hmac.compare_digest(expected, digest)
+
+
+def parse_notification(body: bytes) -> Tuple[List[Video], List[str]]:
+    """
+    Parse a YouTube Atom push notification.
+    
+    YouTube pushes an entry when a video is published and again when its
+    title or description changes, and a tombstone when it is deleted.
+    The body is parsed with defusedxml, which rejects entity expansion
+    and external references.
+    
+    Returns:
+        Tuple of (announced videos, IDs of deleted videos)
+    """
+    root = ElementTree.fromstring(body)
+    
+    videos = []
+    for entry in root.findall("atom:entry", ATOM_NAMESPACES):
+        video_id = entry.findtext("yt:videoId", namespaces=ATOM_NAMESPACES)
+        if not video_id:
+            continue
+        published = entry.findtext("atom:published", namespaces=ATOM_NAMESPACES)
+        videos.append(Video(
+            video_id=video_id,
+            title=entry.findtext("atom:title", "", ATOM_NAMESPACES),
+            channel_id=entry.findtext("yt:channelId", "", ATOM_NAMESPACES),
+            channel_title=entry.findtext("atom:author/atom:name", "", ATOM_NAMESPACES),
+            published_at=datetime.fromisoformat(published) if published else datetime.now(timezone.utc)
+        ))
+    
+    deleted = [
+        tombstone.get("ref", "").rsplit(":", 1)[-1]
+        for tombstone in root.findall("at:deleted-entry", ATOM_NAMESPACES)
+    ]
+    return videos, deleted
+
+
+def request_subscription(
+    channel_id: str,
+    mode: str = "subscribe",
+    session=None,
+    hub_url: str = WEBSUB_HUB_URL,
+    callback_url: str = WEBSUB_CALLBACK_URL
+) -> bool:
+    """
+    Ask the hub to (un)subscribe the callback to a channel's uploads topic.
+    
+    The hub confirms asynchronously with a GET to the callback (see
+    verify_intent), which is when the lease is recorded.
+    
+    Args:
+        channel_id: YouTube channel ID
+        mode: "subscribe" or "unsubscribe"
+        session: Object with a requests-style post(); defaults to requests
+        hub_url: Hub subscription endpoint
+        callback_url: Public URL of the callback endpoint
+    
+    Returns:
+        True if the hub accepted the request
+    """
+    data = {
+        "hub.callback": callback_url,
+        "hub.topic": topic_url(channel_id),
+        "hub.mode": mode,
+        "hub.verify": "async",
+        "hub.lease_seconds": str(WEBSUB_LEASE_SECONDS)
+    }
+    if WEBSUB_SECRET:
+        data["hub.secret"] = WEBSUB_SECRET
+    
+    # Recorded first: the hub may verify before it answers this request
+    ChannelStateRepository.update_state(channel_id, websub_requested_at=datetime.now(timezone.utc))
+    response = (session or requests).post(hub_url, data=data, timeout=10)
+    accepted = response.status_code in (202, 204)
+    if accepted:
+        logger.info(f"WebSub {mode} requested for channel {channel_id}")
+    else:
+        logger.error(f"WebSub {mode} for channel {channel_id} rejected: {response.status_code}")
+    return accepted
+
+
+def verify_intent(params: Dict[str, str]) -> Optional[str]:
+    """
+    Answer a hub's verification of intent for the callback endpoint.
+    
+    Subscriptions are confirmed only for enabled channels in the registry,
+    and the granted lease is recorded on the channel's state; unsubscribes
+    are confirmed only for channels no longer enabled.
+    
+    Args:
+        params: Query parameters of the hub's GET request
+    
+    Returns:
+        The challenge to echo back, or None to refuse
+    """
+    mode = params.get("hub.mode")
+    channel_id = channel_id_from_topic(params.get("hub.topic"))
+    challenge = params.get("hub.challenge")
+    if not channel_id or not challenge:
+        return None
+    
+    state = ChannelStateRepository.get_state(channel_id) or {}
+    if mode == "subscribe" and state.get("enabled"):
+        lease_seconds = int(params.get("hub.lease_seconds") or WEBSUB_LEASE_SECONDS)
+        ChannelStateRepository.update_state(
+            channel_id,
+            websub_lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds),
+            websub_requested_at=None
+        )
+        logger.info(f"WebSub subscription verified for channel {channel_id} ({lease_seconds}s lease)")
+        return challenge
+    
+    if mode == "unsubscribe" and not state.get("enabled"):
+        if state:
+            ChannelStateRepository.update_state(channel_id, websub_lease_expires_at=None)
+        logger.info(f"WebSub unsubscription verified for channel {channel_id}")
+        return challenge
+    
+    logger.warning(f"Refused WebSub {mode} verification for channel {channel_id}")
+    return None
+
+
+def renew_leases(session=None, now: Optional[datetime] = None) -> int:
+    """
+    Subscribe enabled channels whose lease is missing or about to expire.
+    
+    Channels with a request still awaiting verification are skipped for
+    SUBSCRIBE_RETRY_SECONDS so a slow or failing hub is not flooded.
+    
+    Returns:
+        Number of subscription requests the hub accepted
+    """
+    now = now or datetime.now(timezone.utc)
+    renew_by = now + timedelta(seconds=WEBSUB_RENEW_BEFORE_SECONDS)
+    retry_after = now - timedelta(seconds=SUBSCRIBE_RETRY_SECONDS)
+    
+    renewed = 0
+    for state in ChannelStateRepository.list_channels():
+        expires_at = state.get("websub_lease_expires_at")
+        if expires_at is not None and as_utc(expires_at) > renew_by:
+            continue
+        requested_at = state.get("websub_requested_at")
+        if requested_at is not None and as_utc(requested_at) > retry_after:
+            continue
+        try:
+            renewed += request_subscription(state["channel_id"], session=session)
+        except requests.RequestException as e:
+            logger.error(f"WebSub subscribe for channel {state['channel_id']} failed: {str(e)}")
+    return renewed
+
+
+class WebSubReceiver:
+    """
+    Feeds push notifications into the monitor's save-and-enqueue path.
+    
+    The YouTubeMonitor (and with it the RabbitMQ publisher) is created on
+    the first notification; a lock serializes notifications so concurrent
+    pushes for one channel do not race on its saved videos and watermark.
+    Only notifications signed with the subscription secret are accepted.
+    """
+    
+    def __init__(self, monitor=None, secret: Optional[str] = WEBSUB_SECRET):
+        """
+        Raises:
+            ValueError: If no secret is configured
+        """
+        require_secret(secret)
+        self._monitor = monitor
+        self._secret = secret
+        self._lock = threading.Lock()
+    
+    def _get_monitor(self):
+        if self._monitor is None:
+            # Imported here: the monitor module imports this one for lease handling
+            from app.api.youtube_monitor import YouTubeMonitor
+            self._monitor = YouTubeMonitor()
+        return self._monitor
+    
+    def handle(self, body: bytes, signature: Optional[str] = None) -> int:
+        """
+        Process one notification body.
+        
+        Returns:
+            Number of new videos queued or deferred
+        """
+        if not signature_valid(body, signature, self._secret):
+            logger.warning("Ignoring WebSub notification with an invalid signature")
+            return 0
+        
+        videos, deleted = parse_notification(body)
+        if deleted:
+            logger.info(f"WebSub reported deleted videos: {', '.join(deleted)}")
+        if not videos:
+            return 0
+        
+        with self._lock:
+            return len(self._get_monitor().process_pushed_videos(videos))
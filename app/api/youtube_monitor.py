@@ -1,23 +1,44 @@
+import argparse
 import time
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 
 import googleapiclient.discovery
 import pika
+from googleapiclient.errors import HttpError
 
+from app.api.poll_scheduler import PollScheduler, QuotaBudget
+from app.api.response_cache import ResponseCache
+from app.api.websub import lease_active, renew_leases, require_secret
+from app.core.publisher import ConfirmedPublisher
 from app.models.video import Video
-from app.core.database import VideoRepository
+from app.models.video_message import CONTENT_TYPE, MESSAGE_SCHEMA_VERSION, MESSAGE_TYPE, VideoMessage
+from app.core.database import VideoRepository, ChannelStateRepository, ID_ONLY_FIELDS
+from app.core.indexes import ensure_indexes
+from app.utils.dates import as_utc
 from config.config import (
     YOUTUBE_API_KEY,
     YOUTUBE_CHANNEL_ID,
     CHECK_INTERVAL_MINUTES,
-    RABBITMQ_HOST,
-    RABBITMQ_PORT,
-    RABBITMQ_USER,
-    RABBITMQ_PASSWORD,
-    RABBITMQ_VHOST,
-    RABBITMQ_QUEUE
+    YOUTUBE_MAX_PAGES_PER_POLL,
+    MONITOR_MAX_WORKERS,
+    MONITOR_CHANNEL_TIMEOUT_SECONDS,
+    YOUTUBE_RESPONSE_CACHE_ENABLED,
+    YOUTUBE_RESPONSE_CACHE_MAX_ENTRIES,
+    SCHEDULER_CADENCE_HISTORY,
+    VIDEO_DEFER_MINUTES,
+    VIDEO_CAPTION_GRACE_MINUTES,
+    WEBSUB_ENABLED,
+    WEBSUB_FALLBACK_POLL_MINUTES,
+    RABBITMQ_QUEUE,
+    RABBITMQ_BACKFILL_QUEUE,
+    RABBITMQ_PUBLISH_BATCH_SIZE,
+    BACKFILL_BATCH_SIZE,
+    BACKFILL_ENQUEUE_PER_MINUTE,
+    BACKFILL_MAX_QUEUE_DEPTH
 )
 
 # Configure logging
@@ -31,15 +52,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# videos.list accepts at most this many IDs per request
+VIDEOS_LIST_MAX_IDS = 50
+
 class YouTubeMonitor:
-    """Service for monitoring YouTube channel for new uploads."""
+    """
+    Service for monitoring YouTube channels for new uploads.
+    
+    Channels come from the registry in the channel state collection and are
+    fetched concurrently on a bounded thread pool. A fetch reads the
+    channel's state and also writes fetch bookkeeping to it (the uploads
+    playlist ID on first use, recent publish times for the scheduler);
+    each pool thread only touches its own channel's document. Saving
+    videos, publishing to RabbitMQ and advancing watermarks happen on the
+    monitor thread as each channel's fetch completes. Messages are
+    versioned JSON (VideoMessage), published in confirmed batches by a
+    ConfirmedPublisher.
+    
+    run() polls each channel when the PollScheduler says it is due, at an
+    interval learned from the channel's upload cadence and kept within the
+    daily quota budget.
+    
+    New videos are enriched with duration, caption and live status before
+    they are queued; livestreams and caption-less fresh uploads are held
+    back and re-checked once their deferral ends.
+    
+    With WEBSUB_ENABLED, run() also keeps WebSub leases for the registered
+    channels renewed; pushes arrive through process_pushed_videos, and
+    channels with an active lease are still polled, at least every
+    WEBSUB_FALLBACK_POLL_MINUTES, to catch missed pushes.
+    """
     
-    def __init__(self):
-        self.youtube = self._init_youtube_api()
-        self.connection = None
-        self.channel = None
+    def __init__(self, youtube=None, max_workers: int = MONITOR_MAX_WORKERS):
+        """
+        Args:
+            youtube: YouTube Data API client shared by all threads; if omitted,
+                     each pool thread builds its own from YOUTUBE_API_KEY
+                     (googleapiclient clients are not thread-safe)
+            max_workers: Maximum number of channels fetched at once
+        
+        Raises:
+            ValueError: If WEBSUB_ENABLED is set without WEBSUB_SECRET
+        """
+        if WEBSUB_ENABLED:
+            require_secret()
+        self._shared_youtube = youtube
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="channel-poll")
+        self._in_flight = {}
+        self.quota = QuotaBudget()
+        self.scheduler = PollScheduler(self.quota)
+        self.response_cache = (
+            ResponseCache(YOUTUBE_RESPONSE_CACHE_MAX_ENTRIES) if YOUTUBE_RESPONSE_CACHE_ENABLED else None
+        )
+        self.publisher = None
+        ensure_indexes()
         self._init_rabbitmq()
     
+    @property
+    def youtube(self):
+        """YouTube API client for the calling thread."""
+        if self._shared_youtube is not None:
+            return self._shared_youtube
+        if getattr(self._local, "youtube", None) is None:
+            self._local.youtube = self._init_youtube_api()
+        return self._local.youtube
+    
     def _init_youtube_api(self):
         """Initialize YouTube API client."""
         api_service_name = "youtube"
@@ -55,122 +133,663 @@ class YouTubeMonitor:
     def _init_rabbitmq(self):
         """Initialize RabbitMQ connection."""
         logger.info("Connecting to RabbitMQ")
-        credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASSWORD)
-        parameters = pika.ConnectionParameters(
-            host=RABBITMQ_HOST,
-            port=RABBITMQ_PORT,
-            virtual_host=RABBITMQ_VHOST,
-            credentials=credentials
+        # Queues for video processing: fresh uploads and the backfill lane
+        self.publisher = ConfirmedPublisher([RABBITMQ_QUEUE, RABBITMQ_BACKFILL_QUEUE]).start()
+    
+    def _execute(self, request, method: str):
+        """Execute a YouTube API request and charge it to the daily quota."""
+        self.quota.charge(method)
+        return request.execute()
+    
+    def _execute_conditional(self, request, method: str) -> Tuple[Dict, bool]:
+        """
+        Execute a YouTube API request, revalidating a cached response by ETag.
+        
+        YouTube does not document 304 responses as free, so they are still
+        charged to the daily quota; what they save is the transfer and the
+        caller's work on an unchanged page.
+        
+        Returns:
+            Tuple of (response, whether it is unchanged since it was cached)
+        """
+        if self.response_cache is None:
+            return self._execute(request, method), False
+        
+        key = request.uri
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            request.headers["If-None-Match"] = cached[0]
+        
+        try:
+            response = self._execute(request, method)
+        except HttpError as e:
+            if cached is not None and e.resp.status == 304:
+                self.response_cache.record(hit=True)
+                return cached[1], True
+            raise
+        
+        self.response_cache.record(hit=False)
+        self.response_cache.set(key, response)
+        return response, False
+    
+    def get_uploads_playlist_id(self, channel_id: str) -> str:
+        """
+        Get the ID of a channel's uploads playlist.
+        
+        The ID never changes, so it is looked up once (1 quota unit) and
+        kept in the channel state collection.
+        """
+        state = ChannelStateRepository.get_state(channel_id) or {}
+        if state.get("uploads_playlist_id"):
+            return state["uploads_playlist_id"]
+        
+        response = self._execute(
+            self.youtube.channels().list(part="contentDetails", id=channel_id),
+            "channels.list"
         )
         
-        self.connection = pika.BlockingConnection(parameters)
-        self.channel = self.connection.channel()
+        items = response.get("items", [])
+        if not items:
+            raise ValueError(f"YouTube channel not found: {channel_id}")
         
-        # Declare queue for video processing
-        self.channel.queue_declare(queue=RABBITMQ_QUEUE, durable=True)
-        logger.info(f"Connected to RabbitMQ and declared queue: {RABBITMQ_QUEUE}")
+        playlist_id = items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+        ChannelStateRepository.update_state(channel_id, uploads_playlist_id=playlist_id)
+        return playlist_id
     
-    def get_latest_videos(self, published_after: Optional[datetime] = None) -> List[Video]:
+    def get_latest_videos(
+        self,
+        published_after: Optional[datetime] = None,
+        channel_id: str = YOUTUBE_CHANNEL_ID
+    ) -> List[Video]:
         """
-        Get latest videos from channel.
+        Get videos uploaded since the channel's persisted watermark.
+        
+        Walks the uploads playlist (playlistItems.list, 1 quota unit per
+        page of 50) newest first until it reaches the last video seen, a
+        video older than the watermark, or YOUTUBE_MAX_PAGES_PER_POLL pages.
         
         Args:
-            published_after: Only return videos published after this datetime
+            published_after: Override the stored watermark; without either,
+                             the last 24 hours are checked
+            channel_id: YouTube channel ID
             
         Returns:
-            List of Video objects
-        """
-        request = self.youtube.search().list(
-            part="snippet",
-            channelId=YOUTUBE_CHANNEL_ID,
-            maxResults=10,
-            order="date",
-            type="video"
-        )
+            List of enriched Video objects, oldest first
+        """
+        state = ChannelStateRepository.get_state(channel_id) or {}
+        playlist_id = self.get_uploads_playlist_id(channel_id)
+        
+        last_video_id = None if published_after else state.get("last_video_id")
+        watermark = published_after or state.get("last_published_at")
+        if watermark is None:
+            watermark = datetime.now(timezone.utc) - timedelta(days=1)
+        watermark = as_utc(watermark)
         
-        response = request.execute()
         videos = []
+        publish_times = []
+        page_token = None
+        for _ in range(YOUTUBE_MAX_PAGES_PER_POLL):
+            response, unchanged = self._execute_conditional(
+                self.youtube.playlistItems().list(
+                    part="snippet,contentDetails",
+                    playlistId=playlist_id,
+                    maxResults=50,
+                    pageToken=page_token
+                ),
+                "playlistItems.list"
+            )
+            
+            # An unchanged first page still starting at the last video seen has nothing new
+            items = response.get("items", [])
+            first_video_id = items[0].get("contentDetails", {}).get("videoId") if items else None
+            if unchanged and page_token is None and last_video_id and first_video_id == last_video_id:
+                logger.info(f"Uploads playlist unchanged for channel {channel_id}")
+                return []
+            
+            reached_watermark = False
+            for item in items:
+                video = Video.from_playlist_item(item)
+                publish_times.append(as_utc(video.published_at))
+                if video.video_id == last_video_id or as_utc(video.published_at) < watermark:
+                    reached_watermark = True
+                if not reached_watermark:
+                    videos.append(video)
+            
+            page_token = response.get("nextPageToken")
+            if reached_watermark or not page_token:
+                break
+        else:
+            logger.warning(
+                f"Stopped after {YOUTUBE_MAX_PAGES_PER_POLL} pages without reaching "
+                f"the watermark for channel {channel_id}"
+            )
+        
+        # Keep the upload history the pages already contained for the scheduler
+        if publish_times:
+            ChannelStateRepository.update_state(
+                channel_id,
+                recent_published_at=publish_times[:SCHEDULER_CADENCE_HISTORY]
+            )
         
-        for item in response.get("items", []):
-            # Create Video object from API response
-            video = Video.from_youtube_api_response(item)
+        videos.reverse()
+        logger.info(f"Found {len(videos)} new videos")
+        return self.enrich_videos(videos)
+    
+    def enrich_videos(self, videos: List[Video]) -> List[Video]:
+        """
+        Fill duration, caption and live status on videos from videos.list.
+        
+        IDs are sent VIDEOS_LIST_MAX_IDS at a time (1 quota unit per call).
+        Videos the API does not return (deleted or private) are marked
+        unavailable.
+        """
+        for start in range(0, len(videos), VIDEOS_LIST_MAX_IDS):
+            batch = videos[start:start + VIDEOS_LIST_MAX_IDS]
+            response = self._execute(
+                self.youtube.videos().list(
+                    part="snippet,contentDetails,liveStreamingDetails",
+                    id=",".join(video.video_id for video in batch)
+                ),
+                "videos.list"
+            )
             
-            # Check if video was published after the specified timestamp
-            if published_after and video.published_at < published_after:
+            items = {item["id"]: item for item in response.get("items", [])}
+            for video in batch:
+                item = items.get(video.video_id)
+                if item is None:
+                    video.skip_reason = "unavailable"
+                else:
+                    video.skip_reason = None
+                    video.apply_details(item)
+        return videos
+    
+    def triage_videos(self, videos: List[Video], now: Optional[datetime] = None) -> List[Video]:
+        """
+        Decide which videos can be processed now.
+        
+        Live and upcoming broadcasts are deferred for VIDEO_DEFER_MINUTES at
+        a time until they end. Videos without uploaded captions are deferred
+        until VIDEO_CAPTION_GRACE_MINUTES after publishing, giving YouTube
+        time to generate automatic captions, and then processed anyway.
+        Unavailable videos are skipped.
+        
+        Returns:
+            The videos that are ready; the others get deferred_until set
+        """
+        now = now or datetime.now(timezone.utc)
+        caption_grace = timedelta(minutes=VIDEO_CAPTION_GRACE_MINUTES)
+        
+        ready = []
+        for video in videos:
+            video.deferred_until = None
+            if video.skip_reason:
                 continue
-                
-            videos.append(video)
+            if video.live_status in ("live", "upcoming"):
+                video.deferred_until = now + timedelta(minutes=VIDEO_DEFER_MINUTES)
+            elif video.has_captions is False and as_utc(video.published_at) + caption_grace > now:
+                video.deferred_until = as_utc(video.published_at) + caption_grace
+            else:
+                ready.append(video)
+        return ready
+    
+    def check_channel(self, channel_id: str = YOUTUBE_CHANNEL_ID) -> List[Video]:
+        """
+        Fetch, save and enqueue new videos for a channel, then advance its watermark.
         
-        logger.info(f"Found {len(videos)} new videos")
+        The watermark only moves after the videos were saved and queued, so
+        a crash in between re-discovers them instead of losing them.
+        """
+        videos = self.get_latest_videos(channel_id=channel_id)
+        if videos:
+            self._handle_new_videos(channel_id, videos)
         return videos
     
-    def process_new_videos(self, videos: List[Video]) -> None:
+    def process_new_videos(
+        self,
+        videos: List[Video],
+        queue: str = RABBITMQ_QUEUE,
+        source: str = "poll"
+    ) -> int:
         """
         Process list of new videos.
         
-        For each video:
-        1. Save to database
-        2. Send message to RabbitMQ for processing
+        1. Triage videos into ready, deferred and skipped
+        2. Save all videos to database in one bulk write, each with
+           `queue` so deferred ones are later queued on the same lane
+        3. Publish a VideoMessage to `queue` for each ready video, in
+           confirmed batches of RABBITMQ_PUBLISH_BATCH_SIZE
+        
+        Returns:
+            Number of videos published (deferred and skipped ones are not)
         """
+        ready = self.triage_videos(videos)
         for video in videos:
-            # Save video to database
-            video_dict = video.to_dict()
-            VideoRepository.save_video(video_dict)
-            
-            # Send message to RabbitMQ
-            message = {
-                "video_id": video.video_id,
-                "title": video.title,
-                "timestamp": datetime.now().isoformat()
+            video.queue = queue
+        
+        # Save videos to database
+        inserted = VideoRepository.save_videos([video.to_dict() for video in videos])
+        logger.info(f"Saved {len(videos)} videos ({len(inserted)} new)")
+        
+        for video in videos:
+            if video.deferred_until:
+                logger.info(f"Video deferred until {video.deferred_until.isoformat()}: {video.video_id} - {video.title}")
+            elif video.skip_reason:
+                logger.info(f"Video skipped ({video.skip_reason}): {video.video_id} - {video.title}")
+        
+        for start in range(0, len(ready), RABBITMQ_PUBLISH_BATCH_SIZE):
+            batch = ready[start:start + RABBITMQ_PUBLISH_BATCH_SIZE]
+            self.publisher.publish_batch([
+                (queue, message.to_json(), self._message_properties(message))
+                for message in (VideoMessage.from_video(video, source) for video in batch)
+            ])
+            for video in batch:
+                logger.info(f"Video queued for processing: {video.video_id} - {video.title}")
+        return len(ready)
+    
+    @staticmethod
+    def _message_properties(message: VideoMessage) -> pika.BasicProperties:
+        """AMQP properties for a persistent video message."""
+        return pika.BasicProperties(
+            delivery_mode=2,  # make message persistent
+            content_type=CONTENT_TYPE,
+            type=MESSAGE_TYPE,
+            message_id=message.message_id,
+            timestamp=int(message.discovered_at.timestamp()),
+            headers={"schema_version": MESSAGE_SCHEMA_VERSION}
+        )
+    
+    def process_deferred_videos(self) -> int:
+        """
+        Re-check deferred videos whose deferral has ended and queue the ready ones.
+        
+        Each video goes back to the queue it was deferred from, so deferred
+        backfill videos stay in the backfill lane.
+        
+        Returns:
+            Number of videos re-checked
+        """
+        docs = VideoRepository.list_deferred_videos(datetime.now(timezone.utc))
+        if not docs:
+            return 0
+        
+        videos = self.enrich_videos([Video.from_dict(doc) for doc in docs])
+        by_queue: Dict[str, List[Video]] = {}
+        for video in videos:
+            by_queue.setdefault(video.queue or RABBITMQ_QUEUE, []).append(video)
+        for queue, queue_videos in by_queue.items():
+            self.process_new_videos(queue_videos, queue=queue, source="deferred")
+        return len(videos)
+    
+    def process_pushed_videos(self, videos: List[Video]) -> List[Video]:
+        """
+        Save and enqueue videos announced by WebSub push notifications.
+        
+        Pushes also announce title and description edits, so videos that are
+        already stored, and videos of channels not in the registry, are
+        dropped. The rest take the same enrich, save and enqueue path as
+        polled videos and advance their channel's watermark.
+        
+        The channel named in a push is only trusted after videos.list
+        confirms it: videos it does not return, or returns for a channel
+        outside the registry, are rejected.
+        
+        Returns:
+            The new videos
+        """
+        known = VideoRepository.get_videos([video.video_id for video in videos], projection=ID_ONLY_FIELDS)
+        enabled = {channel["channel_id"] for channel in self.get_channels()}
+        new_videos = [
+            video for video in videos
+            if video.video_id not in known and video.channel_id in enabled
+        ]
+        if not new_videos:
+            return []
+        
+        self.enrich_videos(new_videos)
+        rejected = [
+            video.video_id for video in new_videos
+            if video.skip_reason or video.channel_id not in enabled
+        ]
+        if rejected:
+            logger.warning(f"Rejected pushed videos not confirmed for a registered channel: {', '.join(rejected)}")
+            new_videos = [video for video in new_videos if video.video_id not in rejected]
+            if not new_videos:
+                return []
+        
+        by_channel: Dict[str, List[Video]] = {}
+        for video in new_videos:
+            by_channel.setdefault(video.channel_id, []).append(video)
+        for channel_id, channel_videos in by_channel.items():
+            self._handle_new_videos(channel_id, channel_videos, source="push")
+        
+        logger.info(f"Processed {len(new_videos)} pushed videos")
+        return new_videos
+    
+    def get_channels(self) -> List[Dict]:
+        """
+        Get the state documents of the enabled channels in the registry.
+        
+        YOUTUBE_CHANNEL_ID, if set, is registered on first use so existing
+        single-channel deployments keep working.
+        """
+        channels = ChannelStateRepository.list_channels()
+        if not channels and YOUTUBE_CHANNEL_ID:
+            ChannelStateRepository.register_channel(YOUTUBE_CHANNEL_ID)
+            return [{"channel_id": YOUTUBE_CHANNEL_ID}]
+        return channels
+    
+    def get_channel_ids(self) -> List[str]:
+        """Get the IDs of the enabled channels in the registry."""
+        return [channel["channel_id"] for channel in self.get_channels()]
+    
+    def schedule_channels(self) -> None:
+        """Add newly registered channels to the scheduler and drop disabled ones."""
+        channels = self.get_channels()
+        self.scheduler.sync(
+            [channel["channel_id"] for channel in channels],
+            {
+                channel["channel_id"]: as_utc(channel["next_poll_at"]).timestamp()
+                for channel in channels if channel.get("next_poll_at")
             }
+        )
+    
+    def reschedule_channel(self, channel_id: str) -> datetime:
+        """
+        Schedule a channel's next poll from its upload history and poll outcomes.
+        
+        The history combines stored videos with the publish times seen on
+        the channel's last uploads playlist fetch, which also covers uploads
+        older than the watermark.
+        
+        The next poll time is stored on the channel's state document so a
+        restarted monitor picks up the schedule where it left off.
+        """
+        state = ChannelStateRepository.get_state(channel_id) or {}
+        history = VideoRepository.get_publish_times(channel_id, SCHEDULER_CADENCE_HISTORY)
+        history += state.get("recent_published_at") or []
+        publish_times = sorted({as_utc(published_at).timestamp() for published_at in history})
+        publish_times = publish_times[-SCHEDULER_CADENCE_HISTORY:]
+        due_at = self.scheduler.reschedule(
+            channel_id,
+            publish_times,
+            failures=state.get("consecutive_failures", 0),
+            min_interval=WEBSUB_FALLBACK_POLL_MINUTES * 60 if lease_active(state) else None
+        )
+        next_poll_at = datetime.fromtimestamp(due_at, timezone.utc)
+        ChannelStateRepository.update_state(channel_id, next_poll_at=next_poll_at)
+        return next_poll_at
+    
+    def poll_channels(
+        self,
+        channel_ids: Optional[List[str]] = None,
+        timeout: float = MONITOR_CHANNEL_TIMEOUT_SECONDS
+    ) -> Dict[str, int]:
+        """
+        Poll channels concurrently and process each one as soon as its fetch completes.
+        
+        get_latest_videos runs on the thread pool, including its writes to
+        the channel's state (uploads playlist ID, recent publish times).
+        Saving and queueing the videos, advancing the watermark and
+        recording the poll outcome happen here, on the calling thread.
+        
+        A failing channel is logged and recorded on its state document without
+        affecting the others. Channels still running after `timeout` seconds
+        are left to finish in the background and skipped until they do.
+        
+        Args:
+            channel_ids: Channels to poll; defaults to the enabled registry
+            timeout: Seconds to wait for the slowest channel in this cycle
             
-            self.channel.basic_publish(
-                exchange='',
-                routing_key=RABBITMQ_QUEUE,
-                body=str(message),
-                properties=pika.BasicProperties(
-                    delivery_mode=2,  # make message persistent
-                )
+        Returns:
+            Number of new videos per channel that completed in this cycle
+        """
+        if channel_ids is None:
+            channel_ids = self.get_channel_ids()
+        
+        futures = {}
+        for channel_id in channel_ids:
+            if channel_id in self._in_flight:
+                logger.warning(f"Channel {channel_id} is still being polled, skipping this cycle")
+                continue
+            future = self._executor.submit(self.get_latest_videos, channel_id=channel_id)
+            self._in_flight[channel_id] = future
+            future.add_done_callback(lambda _, channel_id=channel_id: self._in_flight.pop(channel_id, None))
+            futures[future] = channel_id
+        
+        results = {}
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                channel_id = futures[future]
+                try:
+                    videos = future.result()
+                    if videos:
+                        self._handle_new_videos(channel_id, videos)
+                    ChannelStateRepository.record_poll(channel_id)
+                    results[channel_id] = len(videos)
+                except Exception as e:
+                    logger.error(f"Error while checking channel {channel_id}: {str(e)}")
+                    ChannelStateRepository.record_poll(channel_id, error=str(e))
+        except TimeoutError:
+            pending = [channel_id for future, channel_id in futures.items() if not future.done()]
+            logger.warning(f"Channels still polling after {timeout}s: {', '.join(pending)}")
+        
+        logger.info(
+            f"Polled {len(results)}/{len(channel_ids)} channels, "
+            f"{sum(results.values())} new videos"
+        )
+        return results
+    
+    def _handle_new_videos(self, channel_id: str, videos: List[Video], source: str = "poll") -> None:
+        """Save and enqueue a channel's new videos, then advance its watermark."""
+        self.process_new_videos(videos, source=source)
+        newest = max(videos, key=lambda video: as_utc(video.published_at))
+        ChannelStateRepository.save_watermark(
+            channel_id,
+            newest.video_id,
+            as_utc(newest.published_at)
+        )
+    
+    def log_quota_report(self) -> Dict:
+        """Log the quota spent today and what the current schedule projects to spend."""
+        report = self.scheduler.quota_report()
+        logger.info(
+            f"Quota: {report['spent_today']}/{report['daily_budget']} units spent today, "
+            f"{report['projected_today']} projected by reset, "
+            f"{report['projected_per_day']} per day at the current cadence "
+            f"({report['channels']} channels)"
+        )
+        if report["budget_stretch"] > 1:
+            logger.warning(
+                f"Polling intervals stretched x{report['budget_stretch']:.2f} "
+                f"to stay within the daily quota budget"
+            )
+        return report
+    
+    def log_response_cache_stats(self) -> Optional[Dict]:
+        """Log how often polled pages were revalidated instead of downloaded."""
+        if self.response_cache is None:
+            return None
+        stats = self.response_cache.stats()
+        logger.info(
+            f"Response cache: {stats['hits']}/{stats['hits'] + stats['misses']} requests "
+            f"not modified ({stats['hit_rate']:.0%}), {stats['size']}/{stats['max_entries']} entries, "
+            f"{stats['evictions']} evictions"
+        )
+        return stats
+    
+    def log_publisher_stats(self) -> Dict:
+        """Log RabbitMQ publish counts and confirm latency."""
+        stats = self.publisher.stats()
+        logger.info(
+            f"Publisher: {stats['published']} messages in {stats['batches']} confirmed batches, "
+            f"avg {stats['avg_batch_ms']:.1f} ms/batch (max {stats['max_batch_ms']:.1f}), "
+            f"{stats['nacked']} nacked, {stats['reconnects']} reconnects"
+        )
+        return stats
+    
+    def backfill(self, channel_id: str, restart: bool = False) -> int:
+        """
+        Ingest a channel's whole upload history into the backfill lane.
+        
+        Walks the uploads playlist newest to oldest, 50 videos per page, and
+        queues videos that are not stored yet on RABBITMQ_BACKFILL_QUEUE.
+        The video consumer runs them on the backfill stage queues of the
+        pipeline, apart from fresh uploads (see VideoConsumer).
+        Progress (page token and position within the page) is checkpointed
+        on the channel state after every batch, so an interrupted backfill
+        resumes where it stopped. New uploads arriving meanwhile shift the
+        playlist towards later pages, which only causes already-stored
+        videos to be seen again.
+        
+        Enqueueing is paced to BACKFILL_ENQUEUE_PER_MINUTE and pauses while
+        the backfill queue holds BACKFILL_MAX_QUEUE_DEPTH messages. That
+        queue only drains while the pipeline's backfill stage queues have
+        room, so the pause also holds while workers are behind.
+        
+        Args:
+            channel_id: YouTube channel ID
+            restart: Start from the newest upload even if a backfill is in progress
+            
+        Returns:
+            Number of videos this backfill published, including earlier runs
+            it resumed (videos triage deferred or skipped are not counted)
+        """
+        state = ChannelStateRepository.get_state(channel_id) or {}
+        if restart or state.get("backfill_status") != "running":
+            page_token, offset, queued = None, 0, 0
+            ChannelStateRepository.update_state(
+                channel_id,
+                backfill_status="running",
+                backfill_started_at=datetime.now(timezone.utc),
+                backfill_page_token=None,
+                backfill_page_offset=0,
+                backfill_queued=0
+            )
+            logger.info(f"Starting backfill of channel {channel_id}")
+        else:
+            page_token = state.get("backfill_page_token")
+            offset = state.get("backfill_page_offset", 0)
+            queued = state.get("backfill_queued", 0)
+            logger.info(f"Resuming backfill of channel {channel_id} ({queued} videos queued so far)")
+        
+        playlist_id = self.get_uploads_playlist_id(channel_id)
+        seconds_per_video = 60.0 / BACKFILL_ENQUEUE_PER_MINUTE
+        
+        while True:
+            response = self._execute(
+                self.youtube.playlistItems().list(
+                    part="snippet,contentDetails",
+                    playlistId=playlist_id,
+                    maxResults=50,
+                    pageToken=page_token
+                ),
+                "playlistItems.list"
             )
+            items = response.get("items", [])
+            
+            for start in range(offset, len(items), BACKFILL_BATCH_SIZE):
+                batch = [Video.from_playlist_item(item) for item in items[start:start + BACKFILL_BATCH_SIZE]]
+                known = VideoRepository.get_videos([video.video_id for video in batch], projection=ID_ONLY_FIELDS)
+                new_videos = [video for video in batch if video.video_id not in known]
+                
+                if new_videos:
+                    self._wait_for_backfill_capacity()
+                    queued += self.process_new_videos(
+                        self.enrich_videos(new_videos),
+                        queue=RABBITMQ_BACKFILL_QUEUE,
+                        source="backfill"
+                    )
+                
+                ChannelStateRepository.update_state(
+                    channel_id,
+                    backfill_page_token=page_token,
+                    backfill_page_offset=start + len(batch),
+                    backfill_queued=queued
+                )
+                if new_videos:
+                    time.sleep(seconds_per_video * len(new_videos))
             
-            logger.info(f"Video queued for processing: {video.video_id} - {video.title}")
+            page_token = response.get("nextPageToken")
+            offset = 0
+            if not page_token:
+                break
+            ChannelStateRepository.update_state(channel_id, backfill_page_token=page_token, backfill_page_offset=0)
+        
+        ChannelStateRepository.update_state(
+            channel_id,
+            backfill_status="completed",
+            backfill_completed_at=datetime.now(timezone.utc),
+            backfill_page_token=None,
+            backfill_page_offset=0
+        )
+        logger.info(f"Backfill of channel {channel_id} completed: {queued} videos queued")
+        return queued
+    
+    def _wait_for_backfill_capacity(self) -> None:
+        """
+        Block while the backfill queue already holds BACKFILL_MAX_QUEUE_DEPTH messages.
+        
+        The consumer stops taking from it while the pipeline's backfill stage
+        queues are full, so this also waits for the workers.
+        """
+        while True:
+            depth = self.publisher.queue_depth(RABBITMQ_BACKFILL_QUEUE)
+            if depth < BACKFILL_MAX_QUEUE_DEPTH:
+                return
+            logger.info(f"Backfill queue holds {depth} messages, waiting for consumers")
+            time.sleep(30)
     
     def run(self) -> None:
         """Run the monitoring loop."""
         logger.info("Starting YouTube channel monitoring service")
         
         try:
-            last_check_time = datetime.now() - timedelta(days=1)  # Start by checking last 24 hours
-            
             while True:
-                logger.info(f"Checking for new videos since {last_check_time}")
-                
-                # Get latest videos
+                # Poll the channels that are due, then schedule their next poll
                 try:
-                    videos = self.get_latest_videos(published_after=last_check_time)
-                    
-                    # Process new videos
-                    if videos:
-                        self.process_new_videos(videos)
-                    
+                    self.schedule_channels()
+                    if WEBSUB_ENABLED:
+                        renew_leases()
+                    due = self.scheduler.pop_due()
+                    if due:
+                        self.poll_channels(due)
+                        for channel_id in due:
+                            self.reschedule_channel(channel_id)
+                        self.log_quota_report()
+                        self.log_response_cache_stats()
+                        self.log_publisher_stats()
+                    self.process_deferred_videos()
                 except Exception as e:
-                    logger.error(f"Error while checking YouTube API: {str(e)}")
+                    logger.error(f"Error while polling channels: {str(e)}")
                 
-                # Update last check time
-                last_check_time = datetime.now()
-                
-                # Sleep until next check
-                logger.info(f"Sleeping for {CHECK_INTERVAL_MINUTES} minutes until next check")
-                time.sleep(CHECK_INTERVAL_MINUTES * 60)
+                # Sleep until the next channel is due, re-reading the registry at least every interval
+                sleep_seconds = min(self.scheduler.seconds_until_next(), CHECK_INTERVAL_MINUTES * 60)
+                logger.info(f"Sleeping for {sleep_seconds / 60:.1f} minutes until next check")
+                time.sleep(sleep_seconds)
                 
         except KeyboardInterrupt:
             logger.info("Keyboard interrupt received, shutting down")
         finally:
-            if self.connection:
-                self.connection.close()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            if self.publisher:
+                self.publisher.close()
                 logger.info("RabbitMQ connection closed")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monitor YouTube channels for new uploads")
+    subparsers = parser.add_subparsers(dest="command")
+    backfill_parser = subparsers.add_parser("backfill", help="Ingest a channel's upload history")
+    backfill_parser.add_argument("channel_id", help="YouTube channel ID")
+    backfill_parser.add_argument("--restart", action="store_true", help="Ignore a checkpoint and start over")
+    args = parser.parse_args()
+    
     monitor = YouTubeMonitor()
-    monitor.run() 
\ No newline at end of file
+    if args.command == "backfill":
+        try:
+            monitor.backfill(args.channel_id, restart=args.restart)
+        finally:
+            monitor.publisher.close()
+    else:
+        monitor.run()
+ 
\ No newline at end of file
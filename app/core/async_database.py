@@ -0,0 +1,637 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import pymongo
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase
+)
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.core.database import (
+    StaleLeaseError,
+    document_cache,
+    _fence,
+    _invalidate,
+    _keyset_filter,
+    _keyset_sort,
+    _lease_key,
+    _set_update,
+    _split_page
+)
+from config.config import (
+    MONGODB_URI,
+    MONGODB_DB_NAME,
+    MONGODB_MAX_POOL_SIZE,
+    MONGODB_MIN_POOL_SIZE,
+    MONGODB_MAX_IDLE_TIME_MS,
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+    MONGODB_CONNECT_TIMEOUT_MS,
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+    MONGODB_SOCKET_TIMEOUT_MS,
+    MONGODB_COLLECTION_TRANSCRIPTS,
+    MONGODB_COLLECTION_SUMMARIES,
+    MONGODB_COLLECTION_POSTS,
+    MONGODB_COLLECTION_CHANNEL_STATE,
+    MONGODB_COLLECTION_TASK_LEASES,
+    MONGODB_COLLECTION_QUOTA_USAGE
+)
+
+class AsyncMongoDB:
+    """
+    Async MongoDB connection manager built on motor.
+    
+    A motor client is bound to the event loop it is first used on, so each
+    loop gets its own client. Clients of loops that have been closed (e.g.
+    by asyncio.run returning) are closed when the next client is created.
+    Like MongoDB, a forked process drops the clients it inherited without
+    closing them and builds its own.
+    """
+    
+    _clients: Dict[asyncio.AbstractEventLoop, AsyncIOMotorClient] = {}
+    _pid: Optional[int] = None
+    
+    @classmethod
+    def get_client(cls) -> AsyncIOMotorClient:
+        """Get motor client instance for the current process and event loop."""
+        if cls._clients and cls._pid != os.getpid():
+            cls.reset()
+        loop = asyncio.get_running_loop()
+        client = cls._clients.get(loop)
+        if client is None:
+            cls._close_stale()
+            client = AsyncIOMotorClient(
+                MONGODB_URI,
+                maxPoolSize=MONGODB_MAX_POOL_SIZE,
+                minPoolSize=MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+                connectTimeoutMS=MONGODB_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                socketTimeoutMS=MONGODB_SOCKET_TIMEOUT_MS,
+                io_loop=loop
+            )
+            cls._clients[loop] = client
+            cls._pid = os.getpid()
+        return client
+    
+    @classmethod
+    def _close_stale(cls) -> None:
+        """Close the clients of event loops that have been closed."""
+        for loop in [loop for loop in cls._clients if loop.is_closed()]:
+            cls._clients.pop(loop).close()
+    
+    @classmethod
+    def reset(cls) -> None:
+        """Forget clients inherited from a parent process without closing them (see MongoDB.reset)."""
+        cls._clients = {}
+        cls._pid = None
+    
+    @classmethod
+    def get_db(cls) -> AsyncIOMotorDatabase:
+        """Get motor database instance."""
+        return cls.get_client()[MONGODB_DB_NAME]
+    
+    @classmethod
+    def get_collection(cls, collection_name: str) -> AsyncIOMotorCollection:
+        """Get motor collection."""
+        return cls.get_db()[collection_name]
+    
+    @classmethod
+    def get_videos_collection(cls) -> AsyncIOMotorCollection:
+        """Get videos collection."""
+        return cls.get_collection("videos")
+    
+    @classmethod
+    def get_transcripts_collection(cls) -> AsyncIOMotorCollection:
+        """Get transcripts collection."""
+        return cls.get_collection(MONGODB_COLLECTION_TRANSCRIPTS)
+    
+    @classmethod
+    def get_summaries_collection(cls) -> AsyncIOMotorCollection:
+        """Get summaries collection."""
+        return cls.get_collection(MONGODB_COLLECTION_SUMMARIES)
+    
+    @classmethod
+    def get_posts_collection(cls) -> AsyncIOMotorCollection:
+        """Get LinkedIn posts collection."""
+        return cls.get_collection(MONGODB_COLLECTION_POSTS)
+    
+    @classmethod
+    def get_channel_state_collection(cls) -> AsyncIOMotorCollection:
+        """Get per-channel monitoring state collection."""
+        return cls.get_collection(MONGODB_COLLECTION_CHANNEL_STATE)
+    
+    @classmethod
+    def get_task_leases_collection(cls) -> AsyncIOMotorCollection:
+        """Get pipeline stage leases collection."""
+        return cls.get_collection(MONGODB_COLLECTION_TASK_LEASES)
+    
+    @classmethod
+    def get_quota_usage_collection(cls) -> AsyncIOMotorCollection:
+        """Get daily YouTube API quota usage collection."""
+        return cls.get_collection(MONGODB_COLLECTION_QUOTA_USAGE)
+    
+    @classmethod
+    def close(cls) -> None:
+        """Close the motor clients of this process."""
+        if cls._pid == os.getpid():
+            for client in cls._clients.values():
+                client.close()
+        cls.reset()
+
+async def _read_through(
+    namespace: str,
+    video_id: str,
+    projection: Optional[Dict[str, int]],
+    collection: AsyncIOMotorCollection
+) -> Optional[Dict[str, Any]]:
+    """Look a document up in the shared cache, falling back to find_one on a miss."""
+    if document_cache is None:
+        return await collection.find_one({"video_id": video_id}, projection)
+    
+    document = document_cache.get(namespace, video_id, projection)
+    if document is None:
+        # Taken before the read so a save racing it cannot be undone by set()
+        generation = document_cache.generation()
+        document = await collection.find_one({"video_id": video_id}, projection)
+        if document is not None:
+            document_cache.set(namespace, video_id, document, projection, generation)
+    return document
+
+async def _upsert_by_video_id(
+    collection: AsyncIOMotorCollection,
+    data: Dict[str, Any],
+    fence_token: Optional[int] = None
+) -> str:
+    """
+    Insert or update a document keyed by video_id in a single round trip.
+    
+    Raises:
+        StaleLeaseError: If fence_token is given and the document was written under a newer lease
+    """
+    query = {"video_id": data["video_id"]}
+    update = _set_update(data)
+    _fence(query, update, fence_token)
+    try:
+        result = await collection.find_one_and_update(
+            query,
+            update,
+            projection={"_id": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # A concurrent upsert inserted the document first; the retry matches it
+        result = await collection.find_one_and_update(
+            query,
+            update,
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if result is None:
+            # Only a fenced query misses here: a newer lease holder wrote it
+            raise StaleLeaseError(f"{collection.name} for video {data['video_id']} was written under a newer lease")
+    return str(result["_id"])
+
+async def _keyset_page(
+    collection: AsyncIOMotorCollection,
+    query: Dict[str, Any],
+    sort_field: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Fetch one page ordered by (sort_field, _id) descending; see database._keyset_page."""
+    documents = await (
+        collection.find(_keyset_filter(query, sort_field, cursor), projection)
+        .sort(_keyset_sort(sort_field))
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    return _split_page(documents, sort_field, limit)
+
+# Async repository implementation, mirroring app.core.database
+
+class AsyncVideoRepository:
+    """Async repository for video data."""
+    
+    @staticmethod
+    async def save_video(video_data: Dict[str, Any]) -> str:
+        """Save video to database."""
+        collection = AsyncMongoDB.get_videos_collection()
+        video_id = await _upsert_by_video_id(collection, video_data)
+        _invalidate("videos", video_data["video_id"])
+        return video_id
+    
+    @staticmethod
+    async def save_videos(videos_data: List[Dict[str, Any]]) -> List[str]:
+        """Save a batch of videos in a single bulk write; returns newly inserted video IDs."""
+        if not videos_data:
+            return []
+        
+        collection = AsyncMongoDB.get_videos_collection()
+        operations = [
+            UpdateOne({"video_id": video_data["video_id"]}, _set_update(video_data), upsert=True)
+            for video_data in videos_data
+        ]
+        result = await collection.bulk_write(operations, ordered=False)
+        for video_data in videos_data:
+            _invalidate("videos", video_data["video_id"])
+        return [videos_data[index]["video_id"] for index in sorted(result.upserted_ids)]
+    
+    @staticmethod
+    async def get_video(video_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Get video by ID, optionally limited to the fields in projection."""
+        collection = AsyncMongoDB.get_videos_collection()
+        return await _read_through("videos", video_id, projection, collection)
+    
+    @staticmethod
+    async def get_videos(
+        video_ids: List[str],
+        projection: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get videos by ID in one query, keyed by video_id (projection must keep video_id)."""
+        if not video_ids:
+            return {}
+        
+        collection = AsyncMongoDB.get_videos_collection()
+        cursor = collection.find({"video_id": {"$in": list(set(video_ids))}}, projection)
+        return {video["video_id"]: video async for video in cursor}
+    
+    @staticmethod
+    async def list_videos(
+        limit: int = 20,
+        processed: Optional[bool] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """List videos with optional filtering."""
+        collection = AsyncMongoDB.get_videos_collection()
+        query = {}
+        if processed is not None:
+            query["processed"] = processed
+        
+        cursor = collection.find(query, projection).sort("published_at", pymongo.DESCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
+    
+    @staticmethod
+    async def list_videos_page(
+        limit: int = 20,
+        processed: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of videos, newest first, with a cursor for the next page."""
+        collection = AsyncMongoDB.get_videos_collection()
+        query = {}
+        if processed is not None:
+            query["processed"] = processed
+        
+        return await _keyset_page(collection, query, "published_at", limit, cursor, projection)
+    
+    @staticmethod
+    async def get_publish_times(channel_id: str, limit: int = 20) -> List[datetime]:
+        """Get the publish times of a channel's most recent videos, newest first."""
+        collection = AsyncMongoDB.get_videos_collection()
+        cursor = collection.find(
+            {"channel_id": channel_id},
+            {"_id": 0, "published_at": 1}
+        ).sort("published_at", pymongo.DESCENDING).limit(limit)
+        return [doc["published_at"] async for doc in cursor if doc.get("published_at")]
+    
+    @staticmethod
+    async def list_deferred_videos(before: datetime, limit: int = 500) -> List[Dict[str, Any]]:
+        """List unprocessed videos whose deferral ended at or before `before`."""
+        collection = AsyncMongoDB.get_videos_collection()
+        query = {"processed": False, "deferred_until": {"$lte": before}}
+        cursor = collection.find(query).sort("deferred_until", pymongo.ASCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
+    
+    @staticmethod
+    async def filter_undispatched(video_ids: List[str]) -> List[str]:
+        """Return the given video IDs that have not been dispatched to the pipeline, in order."""
+        if not video_ids:
+            return []
+        
+        collection = AsyncMongoDB.get_videos_collection()
+        cursor = collection.find(
+            {"video_id": {"$in": list(set(video_ids))}, "dispatched_at": {"$ne": None}},
+            {"_id": 0, "video_id": 1}
+        )
+        dispatched = {video["video_id"] async for video in cursor}
+        return [video_id for video_id in video_ids if video_id not in dispatched]
+    
+    @staticmethod
+    async def mark_dispatched(video_ids: List[str]) -> int:
+        """Record that videos were handed to the processing pipeline."""
+        if not video_ids:
+            return 0
+        
+        collection = AsyncMongoDB.get_videos_collection()
+        result = await collection.update_many(
+            {"video_id": {"$in": video_ids}},
+            {"$set": {"dispatched_at": datetime.now()}}
+        )
+        for video_id in video_ids:
+            _invalidate("videos", video_id)
+        return result.modified_count
+    
+    @staticmethod
+    async def mark_processed(video_id: str) -> bool:
+        """Flag a video as processed without rewriting the whole document."""
+        collection = AsyncMongoDB.get_videos_collection()
+        result = await collection.update_one(
+            {"video_id": video_id},
+            {"$set": {"processed": True, "processed_at": datetime.now()}}
+        )
+        _invalidate("videos", video_id)
+        return result.matched_count > 0
+    
+    @staticmethod
+    async def record_task_error(video_id: str, stage: str, error: str, retrying: bool) -> bool:
+        """Record a failed attempt of a pipeline stage on the video (see VideoRepository.record_task_error)."""
+        update: Dict[str, Any] = {
+            "$set": {
+                "last_error": {
+                    "stage": stage,
+                    "error": error,
+                    "retrying": retrying,
+                    "at": datetime.now()
+                }
+            }
+        }
+        if retrying:
+            update["$inc"] = {f"retry_counts.{stage}": 1}
+        
+        collection = AsyncMongoDB.get_videos_collection()
+        result = await collection.update_one({"video_id": video_id}, update)
+        _invalidate("videos", video_id)
+        return result.matched_count > 0
+
+
+class AsyncTranscriptRepository:
+    """Async repository for transcript data."""
+    
+    @staticmethod
+    async def save_transcript(transcript_data: Dict[str, Any], fence_token: Optional[int] = None) -> str:
+        """Save transcript to database, fenced by the writer's lease token if given."""
+        collection = AsyncMongoDB.get_transcripts_collection()
+        return await _upsert_by_video_id(collection, transcript_data, fence_token)
+    
+    @staticmethod
+    async def get_transcript(video_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Get transcript by video ID, optionally limited to the fields in projection."""
+        collection = AsyncMongoDB.get_transcripts_collection()
+        return await collection.find_one({"video_id": video_id}, projection)
+
+
+class AsyncSummaryRepository:
+    """Async repository for summary data."""
+    
+    @staticmethod
+    async def save_summary(summary_data: Dict[str, Any], fence_token: Optional[int] = None) -> str:
+        """Save summary to database, fenced by the writer's lease token if given."""
+        collection = AsyncMongoDB.get_summaries_collection()
+        summary_id = await _upsert_by_video_id(collection, summary_data, fence_token)
+        _invalidate("summaries", summary_data["video_id"])
+        return summary_id
+    
+    @staticmethod
+    async def get_summary(video_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Get summary by video ID, optionally limited to the fields in projection."""
+        collection = AsyncMongoDB.get_summaries_collection()
+        return await _read_through("summaries", video_id, projection, collection)
+
+
+class AsyncLinkedInPostRepository:
+    """Async repository for LinkedIn post data."""
+    
+    @staticmethod
+    async def save_post(post_data: Dict[str, Any], fence_token: Optional[int] = None) -> str:
+        """Save LinkedIn post to database, fenced by the writer's lease token if given."""
+        collection = AsyncMongoDB.get_posts_collection()
+        post_id = await _upsert_by_video_id(collection, post_data, fence_token)
+        _invalidate("posts", post_data["video_id"])
+        return post_id
+    
+    @staticmethod
+    async def get_post(video_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Get LinkedIn post by video ID, optionally limited to the fields in projection."""
+        collection = AsyncMongoDB.get_posts_collection()
+        return await _read_through("posts", video_id, projection, collection)
+    
+    @staticmethod
+    async def list_posts(
+        limit: int = 20,
+        status: Optional[str] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """List LinkedIn posts with optional filtering."""
+        collection = AsyncMongoDB.get_posts_collection()
+        query = {}
+        if status:
+            query["status"] = status
+        
+        cursor = collection.find(query, projection).sort("created_at", pymongo.DESCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
+    
+    @staticmethod
+    async def list_posts_page(
+        limit: int = 20,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of LinkedIn posts, newest first, with a cursor for the next page."""
+        collection = AsyncMongoDB.get_posts_collection()
+        query = {}
+        if status:
+            query["status"] = status
+        
+        return await _keyset_page(collection, query, "created_at", limit, cursor, projection)
+    
+    @staticmethod
+    async def update_post_status(video_id: str, status: str, **kwargs) -> bool:
+        """Update LinkedIn post status."""
+        collection = AsyncMongoDB.get_posts_collection()
+        update_data = {"status": status, "updated_at": datetime.now(), **kwargs}
+        
+        result = await collection.update_one(
+            {"video_id": video_id},
+            {"$set": update_data}
+        )
+        _invalidate("posts", video_id)
+        
+        return result.modified_count > 0
+
+
+class AsyncChannelStateRepository:
+    """Async repository for the channel registry and per-channel monitoring state."""
+    
+    @staticmethod
+    async def register_channel(channel_id: str, enabled: bool = True, **fields) -> None:
+        """Add a channel to the registry (or update it)."""
+        collection = AsyncMongoDB.get_channel_state_collection()
+        await collection.update_one(
+            {"channel_id": channel_id},
+            {
+                "$set": {"enabled": enabled, **fields, "updated_at": datetime.now()},
+                "$setOnInsert": {"created_at": datetime.now()}
+            },
+            upsert=True
+        )
+    
+    @staticmethod
+    async def list_channels(enabled: Optional[bool] = True) -> List[Dict[str, Any]]:
+        """List registered channels, by default only the enabled ones."""
+        collection = AsyncMongoDB.get_channel_state_collection()
+        query = {}
+        if enabled is not None:
+            query["enabled"] = enabled
+        return await collection.find(query).to_list(length=None)
+    
+    @staticmethod
+    async def record_poll(channel_id: str, error: Optional[str] = None) -> None:
+        """Record the outcome of a poll; consecutive failures reset on success."""
+        collection = AsyncMongoDB.get_channel_state_collection()
+        now = datetime.now()
+        if error is None:
+            update = {"$set": {
+                "last_polled_at": now,
+                "last_success_at": now,
+                "last_error": None,
+                "consecutive_failures": 0
+            }}
+        else:
+            update = {
+                "$set": {"last_polled_at": now, "last_error": error},
+                "$inc": {"consecutive_failures": 1}
+            }
+        await collection.update_one({"channel_id": channel_id}, update, upsert=True)
+    
+    @staticmethod
+    async def get_state(channel_id: str) -> Optional[Dict[str, Any]]:
+        """Get monitoring state for a channel."""
+        collection = AsyncMongoDB.get_channel_state_collection()
+        return await collection.find_one({"channel_id": channel_id})
+    
+    @staticmethod
+    async def update_state(channel_id: str, **fields) -> None:
+        """Set monitoring state fields for a channel, creating the document if needed."""
+        collection = AsyncMongoDB.get_channel_state_collection()
+        await collection.update_one(
+            {"channel_id": channel_id},
+            {"$set": {**fields, "updated_at": datetime.now()}},
+            upsert=True
+        )
+    
+    @staticmethod
+    async def save_watermark(channel_id: str, video_id: str, published_at: datetime) -> None:
+        """Record the newest video seen on a channel, never moving the watermark backwards."""
+        collection = AsyncMongoDB.get_channel_state_collection()
+        await collection.update_one(
+            {
+                "channel_id": channel_id,
+                "$or": [
+                    {"last_published_at": {"$exists": False}},
+                    {"last_published_at": None},
+                    {"last_published_at": {"$lte": published_at}}
+                ]
+            },
+            {"$set": {
+                "last_video_id": video_id,
+                "last_published_at": published_at,
+                "updated_at": datetime.now()
+            }}
+        )
+
+
+class AsyncQuotaUsageRepository:
+    """Async repository for the YouTube API quota spent per quota day."""
+    
+    @staticmethod
+    async def add_units(day: str, units: int) -> int:
+        """Add units to a day's tally and return the day's new total."""
+        collection = AsyncMongoDB.get_quota_usage_collection()
+        document = await collection.find_one_and_update(
+            {"_id": day},
+            {"$inc": {"spent": units}, "$set": {"updated_at": datetime.now()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return document["spent"]
+    
+    @staticmethod
+    async def get_units(day: str) -> int:
+        """Get the units spent on a day."""
+        collection = AsyncMongoDB.get_quota_usage_collection()
+        document = await collection.find_one({"_id": day})
+        return document["spent"] if document else 0
+
+
+class AsyncTaskLeaseRepository:
+    """Async repository for leases on pipeline stages (see TaskLeaseRepository)."""
+    
+    @staticmethod
+    async def acquire(video_id: str, stage: str, owner: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """Take the lease if it is free or expired; None if it is held."""
+        collection = AsyncMongoDB.get_task_leases_collection()
+        now = datetime.now()
+        try:
+            return await collection.find_one_and_update(
+                {
+                    "_id": _lease_key(video_id, stage),
+                    "$or": [{"expires_at": None}, {"expires_at": {"$lte": now}}]
+                },
+                {
+                    "$set": {
+                        "video_id": video_id,
+                        "stage": stage,
+                        "owner": owner,
+                        "acquired_at": now,
+                        "expires_at": now + timedelta(seconds=ttl_seconds)
+                    },
+                    "$inc": {"token": 1}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The lease exists and has not expired, so the upsert tried to insert it
+            return None
+    
+    @staticmethod
+    async def get_lease(video_id: str, stage: str) -> Optional[Dict[str, Any]]:
+        """Get the lease on a stage of a video."""
+        collection = AsyncMongoDB.get_task_leases_collection()
+        return await collection.find_one({"_id": _lease_key(video_id, stage)})
+    
+    @staticmethod
+    async def mark_started(video_id: str, stage: str, token: int) -> bool:
+        """Record that the holder is about to run a side effect; False if the lease was taken over."""
+        collection = AsyncMongoDB.get_task_leases_collection()
+        result = await collection.update_one(
+            {"_id": _lease_key(video_id, stage), "token": token},
+            {"$set": {"started_at": datetime.now()}}
+        )
+        return result.matched_count > 0
+    
+    @staticmethod
+    async def release(video_id: str, stage: str, token: int, completed: bool = False) -> bool:
+        """Give the lease up, if it is still held with this token; False if it was taken over."""
+        update: Dict[str, Any] = {"owner": None, "expires_at": None}
+        if completed:
+            update["completed_at"] = datetime.now()
+        else:
+            update["started_at"] = None
+        
+        collection = AsyncMongoDB.get_task_leases_collection()
+        result = await collection.update_one(
+            {"_id": _lease_key(video_id, stage), "token": token},
+            {"$set": update}
+        )
+        return result.matched_count > 0
@@ -0,0 +1,141 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def projection_key(projection: Optional[Dict[str, int]]) -> Tuple:
+    """Turn a projection dict into a hashable cache key."""
+    if projection is None:
+        return ()
+    return tuple(sorted(projection.items()))
+
+
+class DocumentCache:
+    """
+    Per-process LRU cache for repository documents with a time-to-live.
+    
+    Entries are keyed by (namespace, video_id) and hold one document per
+    projection, so a save for a video drops every cached view of it at once.
+    Documents are deep-copied on the way in and out so callers can mutate
+    what they get back (nested lists and dicts included) without corrupting
+    the cache.
+    
+    A read that started before an invalidation must not put its (possibly
+    stale) document back afterwards: callers take generation() before
+    reading the database and pass it to set(), which drops the document
+    if the key was invalidated in between.
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[Hashable, Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Generation at which each key was last invalidated (bounded); keys
+        # pushed out of it are covered by the highest generation dropped
+        self._generation = 0
+        self._invalidated: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._invalidated_floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale_sets = 0
+    
+    def generation(self) -> int:
+        """Current invalidation generation; take it before reading the database."""
+        with self._lock:
+            return self._generation
+    
+    def get(
+        self,
+        namespace: str,
+        video_id: str,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached document, or None on a miss or expired entry."""
+        key = (namespace, video_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            
+            document = entry[1].get(projection_key(projection)) if entry else None
+            if document is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(document)
+    
+    def set(
+        self,
+        namespace: str,
+        video_id: str,
+        document: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None,
+        generation: Optional[int] = None
+    ) -> None:
+        """
+        Store a document under its namespace, video_id and projection.
+        
+        Args:
+            generation: Value of generation() taken before the document was
+                read; the document is dropped if the key was invalidated since
+        """
+        key = (namespace, video_id)
+        document = copy.deepcopy(document)
+        with self._lock:
+            if generation is not None and self._invalidated.get(key, self._invalidated_floor) > generation:
+                self.stale_sets += 1
+                return
+            
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                entry = (time.monotonic() + self.ttl_seconds, {})
+                self._entries[key] = entry
+            entry[1][projection_key(projection)] = document
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, namespace: str, video_id: str) -> None:
+        """Drop every cached view of a document."""
+        key = (namespace, video_id)
+        with self._lock:
+            self._generation += 1
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            while len(self._invalidated) > self.max_entries:
+                _, dropped = self._invalidated.popitem(last=False)
+                self._invalidated_floor = max(self._invalidated_floor, dropped)
+            
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+    
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_sets": self.stale_sets
+            }
@@ -1,36 +1,110 @@
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import base64
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 import pymongo
-from pymongo import MongoClient
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import MongoClient, ReturnDocument, UpdateOne
 from pymongo.collection import Collection
 from pymongo.database import Database
+from pymongo.errors import DuplicateKeyError
 
+from app.core.cache import DocumentCache
+from app.core.mongo_metrics import CommandMetricsListener, PoolMetricsListener
 from config.config import (
     MONGODB_URI,
     MONGODB_DB_NAME,
+    MONGODB_MAX_POOL_SIZE,
+    MONGODB_MIN_POOL_SIZE,
+    MONGODB_MAX_IDLE_TIME_MS,
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+    MONGODB_CONNECT_TIMEOUT_MS,
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+    MONGODB_SOCKET_TIMEOUT_MS,
     MONGODB_COLLECTION_TRANSCRIPTS,
     MONGODB_COLLECTION_SUMMARIES,
-    MONGODB_COLLECTION_POSTS
+    MONGODB_COLLECTION_POSTS,
+    MONGODB_COLLECTION_CHANNEL_STATE,
+    MONGODB_COLLECTION_TASK_LEASES,
+    MONGODB_COLLECTION_QUOTA_USAGE,
+    REPOSITORY_CACHE_ENABLED,
+    REPOSITORY_CACHE_MAX_ENTRIES,
+    REPOSITORY_CACHE_TTL_SECONDS
 )
 
 class MongoDB:
-    """MongoDB database connection manager."""
+    """
+    MongoDB database connection manager.
+    
+    The client is owned by the process that created it. MongoClient is not
+    fork-safe, so a child process (e.g. a Celery prefork worker) that
+    inherits one discards it and builds its own on first use.
+    """
     
     _client: Optional[MongoClient] = None
     _db: Optional[Database] = None
+    _pid: Optional[int] = None
+    _pool_metrics: Optional[PoolMetricsListener] = None
+    _command_metrics: Optional[CommandMetricsListener] = None
     
     @classmethod
     def get_client(cls) -> MongoClient:
-        """Get MongoDB client instance."""
+        """Get MongoDB client instance for the current process."""
+        if cls._client is not None and cls._pid != os.getpid():
+            cls.reset()
         if cls._client is None:
-            cls._client = MongoClient(MONGODB_URI)
+            cls._pool_metrics = PoolMetricsListener()
+            cls._command_metrics = CommandMetricsListener()
+            cls._client = MongoClient(
+                MONGODB_URI,
+                maxPoolSize=MONGODB_MAX_POOL_SIZE,
+                minPoolSize=MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+                connectTimeoutMS=MONGODB_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                socketTimeoutMS=MONGODB_SOCKET_TIMEOUT_MS,
+                event_listeners=[cls._pool_metrics, cls._command_metrics]
+            )
+            cls._pid = os.getpid()
         return cls._client
     
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Forget a client inherited from a parent process without closing it.
+        
+        Closing would tear down sockets the parent still uses, so the
+        inherited client is just dropped and a new one is created lazily.
+        """
+        cls._client = None
+        cls._db = None
+        cls._pid = None
+        cls._pool_metrics = None
+        cls._command_metrics = None
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Get pool settings, pool counters and per-command timings for this process."""
+        return {
+            "pid": cls._pid,
+            "pool_settings": {
+                "max_pool_size": MONGODB_MAX_POOL_SIZE,
+                "min_pool_size": MONGODB_MIN_POOL_SIZE,
+                "wait_queue_timeout_ms": MONGODB_WAIT_QUEUE_TIMEOUT_MS
+            },
+            "pool": cls._pool_metrics.stats() if cls._pool_metrics else {},
+            "commands": cls._command_metrics.stats() if cls._command_metrics else {}
+        }
+    
     @classmethod
     def get_db(cls) -> Database:
         """Get MongoDB database instance."""
+        client = cls.get_client()
         if cls._db is None:
-            cls._db = cls.get_client()[MONGODB_DB_NAME]
+            cls._db = client[MONGODB_DB_NAME]
         return cls._db
     
     @classmethod
@@ -58,13 +132,251 @@ class MongoDB:
         """Get LinkedIn posts collection."""
         return cls.get_collection(MONGODB_COLLECTION_POSTS)
     
+    @classmethod
+    def get_channel_state_collection(cls) -> Collection:
+        """Get per-channel monitoring state collection."""
+        return cls.get_collection(MONGODB_COLLECTION_CHANNEL_STATE)
+    
+    @classmethod
+    def get_task_leases_collection(cls) -> Collection:
+        """Get pipeline stage leases collection."""
+        return cls.get_collection(MONGODB_COLLECTION_TASK_LEASES)
+    
+    @classmethod
+    def get_quota_usage_collection(cls) -> Collection:
+        """Get daily YouTube API quota usage collection."""
+        return cls.get_collection(MONGODB_COLLECTION_QUOTA_USAGE)
+    
     @classmethod
     def close(cls) -> None:
         """Close MongoDB connection."""
-        if cls._client is not None:
+        if cls._client is not None and cls._pid == os.getpid():
             cls._client.close()
-            cls._client = None
-            cls._db = None
+        cls.reset()
+
+# Read-through cache for video, summary and post lookups (None when disabled).
+# Transcripts are not cached: they are large and read once per pipeline run.
+document_cache: Optional[DocumentCache] = (
+    DocumentCache(REPOSITORY_CACHE_MAX_ENTRIES, REPOSITORY_CACHE_TTL_SECONDS)
+    if REPOSITORY_CACHE_ENABLED else None
+)
+
+def _read_through(
+    namespace: str,
+    video_id: str,
+    projection: Optional[Dict[str, int]],
+    collection: Collection
+) -> Optional[Dict[str, Any]]:
+    """Look a document up in the cache, falling back to find_one on a miss."""
+    if document_cache is None:
+        return collection.find_one({"video_id": video_id}, projection)
+    
+    document = document_cache.get(namespace, video_id, projection)
+    if document is None:
+        # Taken before the read so a save racing it cannot be undone by set()
+        generation = document_cache.generation()
+        document = collection.find_one({"video_id": video_id}, projection)
+        if document is not None:
+            document_cache.set(namespace, video_id, document, projection, generation)
+    return document
+
+def _invalidate(namespace: str, video_id: str) -> None:
+    """Drop cached views of a document after it has been written."""
+    if document_cache is not None:
+        document_cache.invalidate(namespace, video_id)
+
+# Named projections ("views") for callers that only need part of a document
+
+# Just enough to check that a document exists and reference it
+ID_ONLY_FIELDS = {"_id": 1, "video_id": 1}
+
+# Video fields shown in page headers; Video.from_dict works on this view
+VIDEO_HEADER_FIELDS = {
+    "_id": 0,
+    "video_id": 1,
+    "title": 1,
+    "channel_id": 1,
+    "channel_title": 1,
+    "published_at": 1,
+    "thumbnail_url": 1,
+    "processed": 1,
+    "processed_at": 1
+}
+
+# Video fields carried through the processing pipeline
+VIDEO_PIPELINE_FIELDS = {
+    "_id": 0,
+    "video_id": 1,
+    "title": 1,
+    "channel_id": 1,
+    "channel_title": 1,
+    "published_at": 1,
+    "description": 1
+}
+
+# Post fields included in the notification email
+POST_CONTENT_FIELDS = {"_id": 0, "video_id": 1, "title": 1, "content": 1}
+
+# Transcript metadata without the segment data (legacy and columnar layouts)
+TRANSCRIPT_META_FIELDS = {
+    "segments": 0,
+    "text": 0,
+    "text_offsets": 0,
+    "starts": 0,
+    "durations": 0
+}
+
+# Summary fields used to write a LinkedIn post
+SUMMARY_CONTENT_FIELDS = {"_id": 0, "video_id": 1, "summary_text": 1, "key_points": 1, "key_point_times": 1}
+
+# Transcript without its text blob: enough for LazyTranscript's offset index
+TRANSCRIPT_INDEX_FIELDS = {"_id": 0, "text": 0}
+
+# Post fields shown on a row of the post list (keeps _id for paging)
+POST_CARD_FIELDS = {
+    "video_id": 1,
+    "title": 1,
+    "status": 1,
+    "created_at": 1
+}
+
+def encode_cursor(sort_value: datetime, document_id: ObjectId) -> str:
+    """Encode the (sort value, _id) of the last document on a page as an opaque token."""
+    payload = json.dumps([sort_value.isoformat(), str(document_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a token produced by encode_cursor; raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, document_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), ObjectId(document_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid page cursor: {cursor}") from e
+
+def _keyset_filter(query: Dict[str, Any], sort_field: str, cursor: Optional[str]) -> Dict[str, Any]:
+    """Restrict query to documents after the position pinned by cursor."""
+    if not cursor:
+        return query
+    
+    sort_value, document_id = decode_cursor(cursor)
+    return {
+        "$and": [
+            query,
+            {"$or": [
+                {sort_field: {"$lt": sort_value}},
+                {sort_field: sort_value, "_id": {"$lt": document_id}}
+            ]}
+        ]
+    }
+
+def _keyset_sort(sort_field: str) -> List[Tuple[str, int]]:
+    """Sort specification for keyset pages: (sort_field, _id), newest first."""
+    return [(sort_field, pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]
+
+def _split_page(
+    documents: List[Dict[str, Any]],
+    sort_field: str,
+    limit: int
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trim a limit + 1 fetch to one page and build the cursor for the next one."""
+    if len(documents) <= limit:
+        return documents, None
+    
+    documents = documents[:limit]
+    last = documents[-1]
+    return documents, encode_cursor(last[sort_field], last["_id"])
+
+def _keyset_page(
+    collection: Collection,
+    query: Dict[str, Any],
+    sort_field: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page ordered by (sort_field, _id) descending.
+    
+    Instead of skip(), the cursor pins the position of the last document
+    seen, so every page is a bounded index range scan.
+    
+    Args:
+        collection: Collection to page through
+        query: Filter applied to every page
+        sort_field: Date field to order by, newest first
+        limit: Page size
+        cursor: Token returned with the previous page, None for the first page
+        projection: Optional projection (must keep sort_field and _id)
+        
+    Returns:
+        Tuple of (documents, next_cursor); next_cursor is None on the last page
+    """
+    documents = list(
+        collection.find(_keyset_filter(query, sort_field, cursor), projection)
+        .sort(_keyset_sort(sort_field))
+        .limit(limit + 1)
+    )
+    return _split_page(documents, sort_field, limit)
+
+def _set_update(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a $set update from a document, leaving the immutable _id out."""
+    return {"$set": {key: value for key, value in data.items() if key != "_id"}}
+
+def _fence(query: Dict[str, Any], update: Dict[str, Any], fence_token: Optional[int]) -> None:
+    """Limit an upsert to documents not written under a newer lease, and stamp its token."""
+    if fence_token is not None:
+        query["$or"] = [{"fence_token": {"$exists": False}}, {"fence_token": {"$lte": fence_token}}]
+        update["$set"]["fence_token"] = fence_token
+
+def _lease_key(video_id: str, stage: str) -> str:
+    """_id of the lease document on a stage of a video."""
+    return f"{video_id}:{stage}"
+
+def _upsert_by_video_id(collection: Collection, data: Dict[str, Any], fence_token: Optional[int] = None) -> str:
+    """
+    Insert or update a document keyed by video_id in a single round trip.
+    
+    With a fence_token (see TaskLeaseRepository), the document is only
+    written if no holder of a newer lease has written it already.
+    
+    Args:
+        collection: Target collection (must have a unique video_id index)
+        data: Document fields to set
+        fence_token: Token of the lease the writer holds, if any
+        
+    Returns:
+        Document ID as a string
+    
+    Raises:
+        StaleLeaseError: If the document was written under a newer lease
+    """
+    query = {"video_id": data["video_id"]}
+    update = _set_update(data)
+    _fence(query, update, fence_token)
+    try:
+        result = collection.find_one_and_update(
+            query,
+            update,
+            projection={"_id": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # A concurrent upsert inserted the document first; the retry matches it
+        result = collection.find_one_and_update(
+            query,
+            update,
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if result is None:
+            # Only a fenced query misses here: a newer lease holder wrote it
+            raise StaleLeaseError(f"{collection.name} for video {data['video_id']} was written under a newer lease")
+    return str(result["_id"])
+
+class StaleLeaseError(Exception):
+    """Raised when a write is fenced off because a newer lease holder took over."""
 
 # Database repository implementation
 
@@ -75,133 +387,251 @@ class VideoRepository:
     def save_video(video_data: Dict[str, Any]) -> str:
         """Save video to database."""
         collection = MongoDB.get_videos_collection()
+        video_id = _upsert_by_video_id(collection, video_data)
+        _invalidate("videos", video_data["video_id"])
+        return video_id
+    
+    @staticmethod
+    def save_videos(videos_data: List[Dict[str, Any]]) -> List[str]:
+        """
+        Save a batch of videos in a single bulk write.
+        
+        Args:
+            videos_data: Video documents keyed by video_id
+            
+        Returns:
+            Video IDs that were inserted (as opposed to updated)
+        """
+        if not videos_data:
+            return []
         
-        # Check if video already exists
-        existing = collection.find_one({"video_id": video_data["video_id"]})
-        if existing:
-            # Update existing video
-            collection.update_one(
+        collection = MongoDB.get_videos_collection()
+        operations = [
+            UpdateOne(
                 {"video_id": video_data["video_id"]},
-                {"$set": video_data}
+                _set_update(video_data),
+                upsert=True
             )
-            return str(existing["_id"])
-        
-        # Insert new video
-        result = collection.insert_one(video_data)
-        return str(result.inserted_id)
+            for video_data in videos_data
+        ]
+        result = collection.bulk_write(operations, ordered=False)
+        for video_data in videos_data:
+            _invalidate("videos", video_data["video_id"])
+        return [videos_data[index]["video_id"] for index in sorted(result.upserted_ids)]
+    
+    @staticmethod
+    def get_video(video_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Get video by ID, optionally limited to the fields in projection."""
+        collection = MongoDB.get_videos_collection()
+        return _read_through("videos", video_id, projection, collection)
     
     @staticmethod
-    def get_video(video_id: str) -> Optional[Dict[str, Any]]:
-        """Get video by ID."""
+    def get_videos(
+        video_ids: List[str],
+        projection: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get videos by ID in one query, keyed by video_id (projection must keep video_id)."""
+        if not video_ids:
+            return {}
+        
         collection = MongoDB.get_videos_collection()
-        return collection.find_one({"video_id": video_id})
+        cursor = collection.find({"video_id": {"$in": list(set(video_ids))}}, projection)
+        return {video["video_id"]: video for video in cursor}
     
     @staticmethod
-    def list_videos(limit: int = 20, processed: Optional[bool] = None) -> List[Dict[str, Any]]:
+    def list_videos(
+        limit: int = 20,
+        processed: Optional[bool] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
         """List videos with optional filtering."""
         collection = MongoDB.get_videos_collection()
         query = {}
         if processed is not None:
             query["processed"] = processed
         
-        return list(collection.find(query).sort("published_at", pymongo.DESCENDING).limit(limit))
+        return list(collection.find(query, projection).sort("published_at", pymongo.DESCENDING).limit(limit))
+    
+    @staticmethod
+    def list_videos_page(
+        limit: int = 20,
+        processed: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of videos, newest first, with a cursor for the next page."""
+        collection = MongoDB.get_videos_collection()
+        query = {}
+        if processed is not None:
+            query["processed"] = processed
+        
+        return _keyset_page(collection, query, "published_at", limit, cursor, projection)
+    
+    @staticmethod
+    def get_publish_times(channel_id: str, limit: int = 20) -> List[datetime]:
+        """Get the publish times of a channel's most recent videos, newest first."""
+        collection = MongoDB.get_videos_collection()
+        cursor = collection.find(
+            {"channel_id": channel_id},
+            {"_id": 0, "published_at": 1}
+        ).sort("published_at", pymongo.DESCENDING).limit(limit)
+        return [doc["published_at"] for doc in cursor if doc.get("published_at")]
+    
+    @staticmethod
+    def list_deferred_videos(before: datetime, limit: int = 500) -> List[Dict[str, Any]]:
+        """List unprocessed videos whose deferral ended at or before `before`."""
+        collection = MongoDB.get_videos_collection()
+        query = {"processed": False, "deferred_until": {"$lte": before}}
+        return list(collection.find(query).sort("deferred_until", pymongo.ASCENDING).limit(limit))
+    
+    @staticmethod
+    def filter_undispatched(video_ids: List[str]) -> List[str]:
+        """Return the given video IDs that have not been dispatched to the pipeline, in order."""
+        if not video_ids:
+            return []
+        
+        collection = MongoDB.get_videos_collection()
+        dispatched = {
+            video["video_id"]
+            for video in collection.find(
+                {"video_id": {"$in": list(set(video_ids))}, "dispatched_at": {"$ne": None}},
+                {"_id": 0, "video_id": 1}
+            )
+        }
+        return [video_id for video_id in video_ids if video_id not in dispatched]
+    
+    @staticmethod
+    def mark_dispatched(video_ids: List[str]) -> int:
+        """Record that videos were handed to the processing pipeline."""
+        if not video_ids:
+            return 0
+        
+        collection = MongoDB.get_videos_collection()
+        result = collection.update_many(
+            {"video_id": {"$in": video_ids}},
+            {"$set": {"dispatched_at": datetime.now()}}
+        )
+        for video_id in video_ids:
+            _invalidate("videos", video_id)
+        return result.modified_count
+    
+    @staticmethod
+    def mark_processed(video_id: str) -> bool:
+        """Flag a video as processed without rewriting the whole document."""
+        collection = MongoDB.get_videos_collection()
+        result = collection.update_one(
+            {"video_id": video_id},
+            {"$set": {"processed": True, "processed_at": datetime.now()}}
+        )
+        _invalidate("videos", video_id)
+        return result.matched_count > 0
+    
+    @staticmethod
+    def record_task_error(video_id: str, stage: str, error: str, retrying: bool) -> bool:
+        """
+        Record a failed attempt of a pipeline stage on the video.
+        
+        A retry increments retry_counts.<stage>; every error replaces
+        last_error, so a video that stopped retrying shows why.
+        """
+        update: Dict[str, Any] = {
+            "$set": {
+                "last_error": {
+                    "stage": stage,
+                    "error": error,
+                    "retrying": retrying,
+                    "at": datetime.now()
+                }
+            }
+        }
+        if retrying:
+            update["$inc"] = {f"retry_counts.{stage}": 1}
+        
+        collection = MongoDB.get_videos_collection()
+        result = collection.update_one({"video_id": video_id}, update)
+        _invalidate("videos", video_id)
+        return result.matched_count > 0
 
 
 class TranscriptRepository:
     """Repository for transcript data."""
     
     @staticmethod
-    def save_transcript(transcript_data: Dict[str, Any]) -> str:
-        """Save transcript to database."""
+    def save_transcript(transcript_data: Dict[str, Any], fence_token: Optional[int] = None) -> str:
+        """Save transcript to database, fenced by the writer's lease token if given."""
         collection = MongoDB.get_transcripts_collection()
-        
-        # Check if transcript already exists
-        existing = collection.find_one({"video_id": transcript_data["video_id"]})
-        if existing:
-            # Update existing transcript
-            collection.update_one(
-                {"video_id": transcript_data["video_id"]},
-                {"$set": transcript_data}
-            )
-            return str(existing["_id"])
-        
-        # Insert new transcript
-        result = collection.insert_one(transcript_data)
-        return str(result.inserted_id)
+        return _upsert_by_video_id(collection, transcript_data, fence_token)
     
     @staticmethod
-    def get_transcript(video_id: str) -> Optional[Dict[str, Any]]:
-        """Get transcript by video ID."""
+    def get_transcript(video_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Get transcript by video ID, optionally limited to the fields in projection."""
         collection = MongoDB.get_transcripts_collection()
-        return collection.find_one({"video_id": video_id})
+        return collection.find_one({"video_id": video_id}, projection)
 
 
 class SummaryRepository:
     """Repository for summary data."""
     
     @staticmethod
-    def save_summary(summary_data: Dict[str, Any]) -> str:
-        """Save summary to database."""
+    def save_summary(summary_data: Dict[str, Any], fence_token: Optional[int] = None) -> str:
+        """Save summary to database, fenced by the writer's lease token if given."""
         collection = MongoDB.get_summaries_collection()
-        
-        # Check if summary already exists
-        existing = collection.find_one({"video_id": summary_data["video_id"]})
-        if existing:
-            # Update existing summary
-            collection.update_one(
-                {"video_id": summary_data["video_id"]},
-                {"$set": summary_data}
-            )
-            return str(existing["_id"])
-        
-        # Insert new summary
-        result = collection.insert_one(summary_data)
-        return str(result.inserted_id)
+        summary_id = _upsert_by_video_id(collection, summary_data, fence_token)
+        _invalidate("summaries", summary_data["video_id"])
+        return summary_id
     
     @staticmethod
-    def get_summary(video_id: str) -> Optional[Dict[str, Any]]:
-        """Get summary by video ID."""
+    def get_summary(video_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Get summary by video ID, optionally limited to the fields in projection."""
         collection = MongoDB.get_summaries_collection()
-        return collection.find_one({"video_id": video_id})
+        return _read_through("summaries", video_id, projection, collection)
 
 
 class LinkedInPostRepository:
     """Repository for LinkedIn post data."""
     
     @staticmethod
-    def save_post(post_data: Dict[str, Any]) -> str:
-        """Save LinkedIn post to database."""
+    def save_post(post_data: Dict[str, Any], fence_token: Optional[int] = None) -> str:
+        """Save LinkedIn post to database, fenced by the writer's lease token if given."""
         collection = MongoDB.get_posts_collection()
-        
-        # Check if post already exists
-        existing = collection.find_one({"video_id": post_data["video_id"]})
-        if existing:
-            # Update existing post
-            collection.update_one(
-                {"video_id": post_data["video_id"]},
-                {"$set": post_data}
-            )
-            return str(existing["_id"])
-        
-        # Insert new post
-        result = collection.insert_one(post_data)
-        return str(result.inserted_id)
+        post_id = _upsert_by_video_id(collection, post_data, fence_token)
+        _invalidate("posts", post_data["video_id"])
+        return post_id
     
     @staticmethod
-    def get_post(video_id: str) -> Optional[Dict[str, Any]]:
-        """Get LinkedIn post by video ID."""
+    def get_post(video_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Get LinkedIn post by video ID, optionally limited to the fields in projection."""
         collection = MongoDB.get_posts_collection()
-        return collection.find_one({"video_id": video_id})
+        return _read_through("posts", video_id, projection, collection)
     
     @staticmethod
-    def list_posts(limit: int = 20, status: Optional[str] = None) -> List[Dict[str, Any]]:
+    def list_posts(
+        limit: int = 20,
+        status: Optional[str] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> List[Dict[str, Any]]:
         """List LinkedIn posts with optional filtering."""
         collection = MongoDB.get_posts_collection()
         query = {}
         if status:
             query["status"] = status
         
-        return list(collection.find(query).sort("created_at", pymongo.DESCENDING).limit(limit))
+        return list(collection.find(query, projection).sort("created_at", pymongo.DESCENDING).limit(limit))
+    
+    @staticmethod
+    def list_posts_page(
+        limit: int = 20,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        projection: Optional[Dict[str, int]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of LinkedIn posts, newest first, with a cursor for the next page."""
+        collection = MongoDB.get_posts_collection()
+        query = {}
+        if status:
+            query["status"] = status
+        
+        return _keyset_page(collection, query, "created_at", limit, cursor, projection)
     
     @staticmethod
     def update_post_status(video_id: str, status: str, **kwargs) -> bool:
@@ -213,5 +643,222 @@ class LinkedInPostRepository:
             {"video_id": video_id},
             {"$set": update_data}
         )
+        _invalidate("posts", video_id)
+        
+        return result.modified_count > 0
+
+
+class ChannelStateRepository:
+    """
+    Repository for the channel registry and per-channel monitoring state.
+    
+    One document per followed channel holds whether it is enabled, its
+    uploads playlist, the discovery watermark and recent poll outcomes.
+    """
+    
+    @staticmethod
+    def register_channel(channel_id: str, enabled: bool = True, **fields) -> None:
+        """Add a channel to the registry (or update it)."""
+        collection = MongoDB.get_channel_state_collection()
+        collection.update_one(
+            {"channel_id": channel_id},
+            {
+                "$set": {"enabled": enabled, **fields, "updated_at": datetime.now()},
+                "$setOnInsert": {"created_at": datetime.now()}
+            },
+            upsert=True
+        )
+    
+    @staticmethod
+    def list_channels(enabled: Optional[bool] = True) -> List[Dict[str, Any]]:
+        """List registered channels, by default only the enabled ones."""
+        collection = MongoDB.get_channel_state_collection()
+        query = {}
+        if enabled is not None:
+            query["enabled"] = enabled
+        return list(collection.find(query))
+    
+    @staticmethod
+    def record_poll(channel_id: str, error: Optional[str] = None) -> None:
+        """Record the outcome of a poll; consecutive failures reset on success."""
+        collection = MongoDB.get_channel_state_collection()
+        now = datetime.now()
+        if error is None:
+            update = {"$set": {
+                "last_polled_at": now,
+                "last_success_at": now,
+                "last_error": None,
+                "consecutive_failures": 0
+            }}
+        else:
+            update = {
+                "$set": {"last_polled_at": now, "last_error": error},
+                "$inc": {"consecutive_failures": 1}
+            }
+        collection.update_one({"channel_id": channel_id}, update, upsert=True)
+    
+    @staticmethod
+    def get_state(channel_id: str) -> Optional[Dict[str, Any]]:
+        """Get monitoring state for a channel."""
+        collection = MongoDB.get_channel_state_collection()
+        return collection.find_one({"channel_id": channel_id})
+    
+    @staticmethod
+    def update_state(channel_id: str, **fields) -> None:
+        """Set monitoring state fields for a channel, creating the document if needed."""
+        collection = MongoDB.get_channel_state_collection()
+        collection.update_one(
+            {"channel_id": channel_id},
+            {"$set": {**fields, "updated_at": datetime.now()}},
+            upsert=True
+        )
+    
+    @staticmethod
+    def save_watermark(channel_id: str, video_id: str, published_at: datetime) -> None:
+        """Record the newest video seen on a channel, never moving the watermark backwards."""
+        collection = MongoDB.get_channel_state_collection()
+        collection.update_one(
+            {
+                "channel_id": channel_id,
+                "$or": [
+                    {"last_published_at": {"$exists": False}},
+                    {"last_published_at": None},
+                    {"last_published_at": {"$lte": published_at}}
+                ]
+            },
+            {"$set": {
+                "last_video_id": video_id,
+                "last_published_at": published_at,
+                "updated_at": datetime.now()
+            }}
+        )
+
+
+class QuotaUsageRepository:
+    """
+    Repository for the YouTube API quota spent per quota day.
+    
+    One document per day, keyed by its date in the quota timezone, is
+    shared by every process that calls the API (the monitor, the web app's
+    WebSub receiver, backfills), so they all draw on one daily budget.
+    """
+    
+    @staticmethod
+    def add_units(day: str, units: int) -> int:
+        """Add units to a day's tally and return the day's new total."""
+        collection = MongoDB.get_quota_usage_collection()
+        document = collection.find_one_and_update(
+            {"_id": day},
+            {"$inc": {"spent": units}, "$set": {"updated_at": datetime.now()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return document["spent"]
+    
+    @staticmethod
+    def get_units(day: str) -> int:
+        """Get the units spent on a day."""
+        collection = MongoDB.get_quota_usage_collection()
+        document = collection.find_one({"_id": day})
+        return document["spent"] if document else 0
+
+
+class TaskLeaseRepository:
+    """
+    Repository for leases on pipeline stages, one per (video_id, stage).
+    
+    A lease lets one worker at a time run a stage for a video; it expires
+    on its own if the worker dies. Each acquisition increments the lease's
+    token, and outputs are saved with it (fence_token), so a worker whose
+    lease expired and was taken over cannot overwrite the newer result.
+    Lease documents are never deleted: the token must keep increasing.
+    """
+    
+    @staticmethod
+    def acquire(video_id: str, stage: str, owner: str, ttl_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Take the lease if it is free or expired.
+        
+        Args:
+            video_id: YouTube video ID
+            stage: Pipeline stage
+            owner: Who holds the lease (for diagnostics)
+            ttl_seconds: Seconds until the lease expires unless released
+        
+        Returns:
+            The lease document (token, completed_at, ...), or None if it is held
+        """
+        collection = MongoDB.get_task_leases_collection()
+        now = datetime.now()
+        try:
+            return collection.find_one_and_update(
+                {
+                    "_id": _lease_key(video_id, stage),
+                    "$or": [{"expires_at": None}, {"expires_at": {"$lte": now}}]
+                },
+                {
+                    "$set": {
+                        "video_id": video_id,
+                        "stage": stage,
+                        "owner": owner,
+                        "acquired_at": now,
+                        "expires_at": now + timedelta(seconds=ttl_seconds)
+                    },
+                    "$inc": {"token": 1}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The lease exists and has not expired, so the upsert tried to insert it
+            return None
+    
+    @staticmethod
+    def get_lease(video_id: str, stage: str) -> Optional[Dict[str, Any]]:
+        """Get the lease on a stage of a video."""
+        collection = MongoDB.get_task_leases_collection()
+        return collection.find_one({"_id": _lease_key(video_id, stage)})
+    
+    @staticmethod
+    def mark_started(video_id: str, stage: str, token: int) -> bool:
+        """
+        Record that the holder is about to run a side effect that cannot be
+        undone (started_at), if the lease is still held with this token.
         
-        return result.modified_count > 0 
\ No newline at end of file
+        Returns:
+            False if the lease had already been taken over
+        """
+        collection = MongoDB.get_task_leases_collection()
+        result = collection.update_one(
+            {"_id": _lease_key(video_id, stage), "token": token},
+            {"$set": {"started_at": datetime.now()}}
+        )
+        return result.matched_count > 0
+    
+    @staticmethod
+    def release(video_id: str, stage: str, token: int, completed: bool = False) -> bool:
+        """
+        Give the lease up, if it is still held with this token.
+        
+        Args:
+            video_id: YouTube video ID
+            stage: Pipeline stage
+            token: Token returned by acquire
+            completed: Also record that the stage finished (completed_at);
+                otherwise the stage did not run and started_at is cleared
+        
+        Returns:
+            False if the lease had already been taken over
+        """
+        update: Dict[str, Any] = {"owner": None, "expires_at": None}
+        if completed:
+            update["completed_at"] = datetime.now()
+        else:
+            update["started_at"] = None
+        
+        collection = MongoDB.get_task_leases_collection()
+        result = collection.update_one(
+            {"_id": _lease_key(video_id, stage), "token": token},
+            {"$set": update}
+        )
+        return result.matched_count > 0
@@ -0,0 +1,77 @@
+import logging
+
+import pymongo
+
+from app.core.database import MongoDB
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_indexes() -> None:
+    """
+    Create the indexes the repositories rely on.
+    
+    Unique video_id indexes back the upsert-based save path and turn
+    lookups by video_id into index scans. The remaining indexes cover the
+    sort orders used by list_videos and list_posts; the trailing _id keys
+    serve the keyset pagination in list_videos_page and list_posts_page,
+    channel_id_published_at serves the poll scheduler's cadence history,
+    and the partial deferred_until index covers only deferred videos.
+    create_index is idempotent, so this is safe to call on every startup.
+    """
+    collections = [
+        MongoDB.get_videos_collection(),
+        MongoDB.get_transcripts_collection(),
+        MongoDB.get_summaries_collection(),
+        MongoDB.get_posts_collection(),
+    ]
+    for collection in collections:
+        collection.create_index("video_id", unique=True, name="video_id_unique")
+    
+    videos = MongoDB.get_videos_collection()
+    videos.create_index(
+        [("published_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)],
+        name="published_at_id_desc"
+    )
+    videos.create_index(
+        [
+            ("processed", pymongo.ASCENDING),
+            ("published_at", pymongo.DESCENDING),
+            ("_id", pymongo.DESCENDING)
+        ],
+        name="processed_published_at_id"
+    )
+    videos.create_index(
+        [("channel_id", pymongo.ASCENDING), ("published_at", pymongo.DESCENDING)],
+        name="channel_id_published_at"
+    )
+    videos.create_index(
+        "deferred_until",
+        name="deferred_until",
+        partialFilterExpression={"deferred_until": {"$type": "date"}}
+    )
+    
+    posts = MongoDB.get_posts_collection()
+    posts.create_index(
+        [("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)],
+        name="created_at_id_desc"
+    )
+    posts.create_index(
+        [
+            ("status", pymongo.ASCENDING),
+            ("created_at", pymongo.DESCENDING),
+            ("_id", pymongo.DESCENDING)
+        ],
+        name="status_created_at_id"
+    )
+    
+    channel_state = MongoDB.get_channel_state_collection()
+    channel_state.create_index("channel_id", unique=True, name="channel_id_unique")
+    channel_state.create_index("enabled", name="enabled")
+    
+    logger.info("MongoDB indexes ensured")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ensure_indexes()
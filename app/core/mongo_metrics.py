@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener that tracks pool occupancy and checkout latency.
+    
+    Checkouts happen on the calling thread, so the start time of a pending
+    checkout is kept in a thread-local and matched on checked_out/failed.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.connections_open = 0
+        self.connections_in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_timeouts = 0
+        self.checkout_time_total_ms = 0.0
+        self.checkout_time_max_ms = 0.0
+        self.pool_clears = 0
+    
+    def _elapsed_ms(self) -> float:
+        started = getattr(self._local, "checkout_started", None)
+        self._local.checkout_started = None
+        return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open -= 1
+    
+    def connection_check_out_started(self, event):
+        self._local.checkout_started = time.perf_counter()
+    
+    def connection_check_out_failed(self, event):
+        elapsed = self._elapsed_ms()
+        with self._lock:
+            self.checkout_failures += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.checkout_timeouts += 1
+            self.checkout_time_total_ms += elapsed
+    
+    def connection_checked_out(self, event):
+        elapsed = self._elapsed_ms()
+        with self._lock:
+            self.checkouts += 1
+            self.connections_in_use += 1
+            self.checkout_time_total_ms += elapsed
+            self.checkout_time_max_ms = max(self.checkout_time_max_ms, elapsed)
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.connections_in_use -= 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the pool counters."""
+        with self._lock:
+            attempts = self.checkouts + self.checkout_failures
+            return {
+                "connections_open": self.connections_open,
+                "connections_in_use": self.connections_in_use,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_avg_ms": self.checkout_time_total_ms / attempts if attempts else 0.0,
+                "checkout_max_ms": self.checkout_time_max_ms,
+                "pool_clears": self.pool_clears
+            }
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Command listener that aggregates count, failures and latency per command."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._commands: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+    
+    def _record(self, event, failed: bool) -> None:
+        elapsed = event.duration_micros / 1000
+        with self._lock:
+            command = self._commands[event.command_name]
+            command["count"] += 1
+            command["total_ms"] += elapsed
+            command["max_ms"] = max(command["max_ms"], elapsed)
+            if failed:
+                command["failures"] += 1
+    
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        self._record(event, failed=False)
+    
+    def failed(self, event):
+        self._record(event, failed=True)
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-command counters with average latency."""
+        with self._lock:
+            return {
+                name: {
+                    **command,
+                    "avg_ms": command["total_ms"] / command["count"] if command["count"] else 0.0
+                }
+                for name, command in self._commands.items()
+            }
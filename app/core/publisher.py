@@ -0,0 +1,291 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pika
+from pika.exceptions import AMQPConnectionError, AMQPError
+
+from config.config import (
+    RABBITMQ_HOST,
+    RABBITMQ_PORT,
+    RABBITMQ_USER,
+    RABBITMQ_PASSWORD,
+    RABBITMQ_VHOST,
+    RABBITMQ_HEARTBEAT_SECONDS,
+    RABBITMQ_PUBLISH_TIMEOUT_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Delay before reconnecting after the connection was lost, doubled up to the maximum
+RECONNECT_DELAY_SECONDS = 1
+MAX_RECONNECT_DELAY_SECONDS = 30
+
+
+class PublishError(AMQPError):
+    """Raised when the broker did not confirm every message of a batch."""
+
+
+def rabbitmq_parameters() -> pika.ConnectionParameters:
+    """Connection parameters for the configured RabbitMQ broker."""
+    return pika.ConnectionParameters(
+        host=RABBITMQ_HOST,
+        port=RABBITMQ_PORT,
+        virtual_host=RABBITMQ_VHOST,
+        credentials=pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASSWORD),
+        heartbeat=RABBITMQ_HEARTBEAT_SECONDS,
+        blocked_connection_timeout=RABBITMQ_PUBLISH_TIMEOUT_SECONDS
+    )
+
+
+class ConfirmedPublisher:
+    """
+    RabbitMQ publisher with publisher confirms and automatic reconnection.
+    
+    The connection lives on a dedicated I/O thread running a
+    SelectConnection, so heartbeats are answered however long the calling
+    thread sleeps, and a lost connection is re-established in the
+    background. publish_batch() sends a whole batch before waiting for the
+    broker's confirms (which arrive cumulatively), instead of one round
+    trip per message as a BlockingChannel in confirm mode does.
+    
+    Batches interrupted by a lost connection are published again once, so
+    delivery is at-least-once; consumers deduplicate.
+    """
+    
+    def __init__(
+        self,
+        queues: Sequence[str],
+        parameters: Optional[pika.ConnectionParameters] = None,
+        connection_factory=pika.SelectConnection
+    ):
+        """
+        Args:
+            queues: Durable queues declared on every (re)connect
+            parameters: Connection parameters; defaults to rabbitmq_parameters()
+            connection_factory: SelectConnection-compatible class
+        """
+        self.queues = list(queues)
+        self._parameters = parameters or rabbitmq_parameters()
+        self._connection_factory = connection_factory
+        self._connection = None
+        self._channel = None
+        self._ready = threading.Event()
+        self._was_ready = False
+        self._closing = False
+        self._thread = None
+        self._lock = threading.Lock()
+        
+        # Owned by the I/O thread
+        self._pending: Dict[int, Future] = {}
+        self._delivery_tag = 0
+        
+        self.published = 0
+        self.batches = 0
+        self.nacked = 0
+        self.reconnects = 0
+        self._latency_total_ms = 0.0
+        self._latency_max_ms = 0.0
+    
+    def start(self, timeout: float = RABBITMQ_PUBLISH_TIMEOUT_SECONDS) -> 'ConfirmedPublisher':
+        """Start the I/O thread and wait until the channel is ready."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="rabbitmq-publisher", daemon=True)
+            self._thread.start()
+        if not self._ready.wait(timeout):
+            raise AMQPConnectionError(f"RabbitMQ not ready after {timeout}s")
+        return self
+    
+    def close(self) -> None:
+        """Close the connection and stop the I/O thread."""
+        self._closing = True
+        connection = self._connection
+        if connection is not None:
+            connection.ioloop.add_callback_threadsafe(self._close_connection)
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+    
+    def publish_batch(
+        self,
+        messages: List[Tuple[str, bytes, pika.BasicProperties]],
+        timeout: float = RABBITMQ_PUBLISH_TIMEOUT_SECONDS
+    ) -> None:
+        """
+        Publish persistent messages and wait until the broker confirms all of them.
+        
+        Args:
+            messages: (queue, body, properties) tuples
+            timeout: Seconds to wait for the connection and the confirms
+        
+        Raises:
+            PublishError: If a message was nacked or confirms timed out
+        """
+        if not messages:
+            return
+        
+        with self._lock:
+            for attempt in range(2):
+                started = time.perf_counter()
+                try:
+                    self._publish_once(messages, timeout)
+                    break
+                except AMQPConnectionError as e:
+                    if attempt:
+                        raise
+                    logger.warning(f"RabbitMQ connection lost during publish ({str(e)}), retrying batch")
+            
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.published += len(messages)
+            self.batches += 1
+            self._latency_total_ms += latency_ms
+            self._latency_max_ms = max(self._latency_max_ms, latency_ms)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return publish counters and confirmed batch latency."""
+        return {
+            "connected": self._ready.is_set(),
+            "published": self.published,
+            "batches": self.batches,
+            "nacked": self.nacked,
+            "reconnects": self.reconnects,
+            "avg_batch_ms": self._latency_total_ms / self.batches if self.batches else 0.0,
+            "max_batch_ms": self._latency_max_ms,
+            "avg_message_ms": self._latency_total_ms / self.published if self.published else 0.0
+        }
+    
+    def queue_depth(self, queue: str, timeout: float = RABBITMQ_PUBLISH_TIMEOUT_SECONDS) -> int:
+        """Number of ready messages in a queue (passive declare)."""
+        if not self._ready.wait(timeout):
+            raise AMQPConnectionError(f"RabbitMQ not ready after {timeout}s")
+        result = Future()
+        
+        def declare():
+            self._channel.queue_declare(
+                queue,
+                passive=True,
+                callback=lambda frame: result.set_result(frame.method.message_count)
+            )
+        
+        self._connection.ioloop.add_callback_threadsafe(declare)
+        return result.result(timeout)
+    
+    def _publish_once(self, messages, timeout: float) -> None:
+        if not self._ready.wait(timeout):
+            raise AMQPConnectionError(f"RabbitMQ not ready after {timeout}s")
+        
+        sent = Future()
+        futures: List[Future] = []
+        
+        def send():
+            try:
+                for queue, body, properties in messages:
+                    self._channel.basic_publish(exchange="", routing_key=queue, body=body, properties=properties)
+                    self._delivery_tag += 1
+                    future = Future()
+                    self._pending[self._delivery_tag] = future
+                    futures.append(future)
+                sent.set_result(None)
+            except Exception as e:
+                sent.set_exception(AMQPConnectionError(str(e)))
+        
+        self._connection.ioloop.add_callback_threadsafe(send)
+        try:
+            sent.result(timeout)
+        except FutureTimeoutError:
+            raise AMQPConnectionError(f"RabbitMQ I/O loop did not send within {timeout}s")
+        
+        done, not_done = wait(futures, timeout)
+        if not_done:
+            raise PublishError(f"{len(not_done)} of {len(futures)} messages not confirmed within {timeout}s")
+        nacked = sum(1 for future in done if future.result() is False)
+        if nacked:
+            self.nacked += nacked
+            raise PublishError(f"Broker rejected {nacked} of {len(futures)} messages")
+    
+    # I/O thread
+    
+    def _run(self) -> None:
+        delay = RECONNECT_DELAY_SECONDS
+        while not self._closing:
+            self._connection = self._connection_factory(
+                self._parameters,
+                on_open_callback=self._on_connection_open,
+                on_open_error_callback=self._on_connection_error,
+                on_close_callback=self._on_connection_closed
+            )
+            self._connection.ioloop.start()
+            
+            if self._closing:
+                break
+            if self._was_ready:
+                delay = RECONNECT_DELAY_SECONDS
+                self._was_ready = False
+            self.reconnects += 1
+            logger.warning(f"RabbitMQ connection lost, reconnecting in {delay}s")
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+    
+    def _on_connection_open(self, connection) -> None:
+        connection.channel(on_open_callback=self._on_channel_open)
+    
+    def _on_connection_error(self, connection, error) -> None:
+        logger.error(f"RabbitMQ connection failed: {str(error)}")
+        connection.ioloop.stop()
+    
+    def _on_connection_closed(self, connection, reason) -> None:
+        self._ready.clear()
+        self._channel = None
+        self._fail_pending(AMQPConnectionError(str(reason)))
+        connection.ioloop.stop()
+    
+    def _on_channel_open(self, channel) -> None:
+        self._channel = channel
+        self._delivery_tag = 0
+        channel.add_on_close_callback(self._on_channel_closed)
+        self._declare_queues(list(self.queues))
+    
+    def _on_channel_closed(self, channel, reason) -> None:
+        logger.warning(f"RabbitMQ channel closed: {str(reason)}")
+        self._ready.clear()
+        if not self._closing and self._connection.is_open:
+            self._connection.close()
+    
+    def _declare_queues(self, queues: List[str]) -> None:
+        if not queues:
+            self._channel.confirm_delivery(self._on_delivery_confirmation, callback=self._on_confirm_ok)
+            return
+        self._channel.queue_declare(
+            queues[0],
+            durable=True,
+            callback=lambda frame: self._declare_queues(queues[1:])
+        )
+    
+    def _on_confirm_ok(self, frame) -> None:
+        logger.info(f"Connected to RabbitMQ with publisher confirms, queues: {', '.join(self.queues)}")
+        self._was_ready = True
+        self._ready.set()
+    
+    def _on_delivery_confirmation(self, frame) -> None:
+        method = frame.method
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        tags = [method.delivery_tag]
+        if method.multiple:
+            tags = [tag for tag in self._pending if tag <= method.delivery_tag]
+        for tag in tags:
+            future = self._pending.pop(tag, None)
+            if future is not None:
+                future.set_result(acked)
+    
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+    
+    def _close_connection(self) -> None:
+        if self._connection is not None and self._connection.is_open:
+            self._connection.close()
+        else:
+            self._connection.ioloop.stop()
@@ -0,0 +1,116 @@
+import inspect
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Marker for fields that must be present in a stored document
+REQUIRED = object()
+
+
+class Field:
+    """Description of one model attribute as stored in MongoDB."""
+    
+    __slots__ = ("name", "default", "init", "encode", "decode")
+    
+    def __init__(
+        self,
+        name: str,
+        default: Any = None,
+        init: bool = True,
+        encode: Optional[Callable[[Any], Any]] = None,
+        decode: Optional[Callable[[Any], Any]] = None
+    ):
+        """
+        Args:
+            name: Attribute and document key
+            default: Value used when the key is missing, or REQUIRED
+            init: Whether the constructor takes this field; if not, from_dict
+                  assigns it after construction
+            encode: Converts the attribute before storage (e.g. Enum -> value)
+            decode: Converts the stored value back (e.g. value -> Enum)
+        """
+        self.name = name
+        self.default = default
+        self.init = init
+        self.encode = encode
+        self.decode = decode
+
+
+def model_codec(*fields: Field) -> Callable[[type], type]:
+    """
+    Class decorator that generates to_dict and from_dict for a slotted model.
+    
+    The methods are compiled from source once per class, so they run as a
+    single dict literal / constructor call with no per-field loop or
+    getattr at runtime. from_dict goes through the constructor, so defaults
+    computed in __init__ (e.g. created_at) behave exactly as before.
+    """
+    def decorate(cls: type) -> type:
+        cls.codec_fields = fields
+        cls.to_dict = _build_to_dict(cls, fields)
+        cls.from_dict = classmethod(_build_from_dict(cls, fields))
+        return cls
+    return decorate
+
+
+def _value_expr(field: Field, namespace: Dict[str, Any]) -> str:
+    """Source expression that reads a field from the `data` document."""
+    if field.default is REQUIRED:
+        expr = f"data[{field.name!r}]"
+    elif field.default is None:
+        expr = f"data.get({field.name!r})"
+    else:
+        namespace[f"_default_{field.name}"] = field.default
+        expr = f"data.get({field.name!r}, _default_{field.name})"
+    
+    if field.decode is not None:
+        namespace[f"_decode_{field.name}"] = field.decode
+        expr = f"_decode_{field.name}({expr})"
+    return expr
+
+
+def _build_to_dict(cls: type, fields: Sequence[Field]) -> Callable:
+    namespace: Dict[str, Any] = {}
+    items = []
+    for field in fields:
+        expr = f"self.{field.name}"
+        if field.encode is not None:
+            namespace[f"_encode_{field.name}"] = field.encode
+            expr = f"_encode_{field.name}({expr})"
+        items.append(f"{field.name!r}: {expr}")
+    
+    source = "def to_dict(self):\n    return {" + ", ".join(items) + "}\n"
+    exec(compile(source, f"<{cls.__name__}.to_dict>", "exec"), namespace)
+    
+    to_dict = namespace["to_dict"]
+    to_dict.__doc__ = f"Convert {cls.__name__} to dictionary for MongoDB storage."
+    to_dict.__qualname__ = f"{cls.__name__}.to_dict"
+    return to_dict
+
+
+def _build_from_dict(cls: type, fields: Sequence[Field]) -> Callable:
+    namespace: Dict[str, Any] = {}
+    values = {field.name: _value_expr(field, namespace) for field in fields if field.init}
+    
+    # Arguments are passed positionally, in the constructor's order, as far
+    # as the fields allow; CPython binds those without matching keyword names
+    arguments = []
+    parameters = list(inspect.signature(cls.__init__).parameters.values())[1:]
+    for parameter in parameters:
+        if parameter.name not in values or parameter.kind is not parameter.POSITIONAL_OR_KEYWORD:
+            break
+        arguments.append(values.pop(parameter.name))
+    arguments += [f"{name}={expr}" for name, expr in values.items()]
+    
+    lines = ["def from_dict(cls, data):", f"    obj = cls({', '.join(arguments)})"]
+    lines += [
+        f"    obj.{field.name} = {_value_expr(field, namespace)}"
+        for field in fields if not field.init
+    ]
+    lines.append("    return obj")
+    
+    source = "\n".join(lines) + "\n"
+    exec(compile(source, f"<{cls.__name__}.from_dict>", "exec"), namespace)
+    
+    from_dict = namespace["from_dict"]
+    from_dict.__doc__ = f"Create {cls.__name__} from dictionary (from MongoDB)."
+    from_dict.__qualname__ = f"{cls.__name__}.from_dict"
+    return from_dict
@@ -1,6 +1,9 @@
 from datetime import datetime
 from enum import Enum
-from typing import Dict, Optional
+from operator import attrgetter
+from typing import Optional
+
+from app.models.codec import REQUIRED, Field, model_codec
 
 class PostStatus(Enum):
     """Enum for LinkedIn post status."""
@@ -10,9 +13,38 @@ class PostStatus(Enum):
     FAILED = "failed"
 
 
+@model_codec(
+    Field("video_id", REQUIRED),
+    Field("content", REQUIRED),
+    Field("title"),
+    Field("status", "draft", encode=attrgetter("value"), decode=PostStatus),
+    Field("created_at"),
+    Field("updated_at"),
+    Field("published_at"),
+    Field("reviewed_at"),
+    Field("reviewed_by"),
+    Field("published_url"),
+    Field("video_title"),
+    Field("video_url")
+)
 class LinkedInPost:
     """Model representing a LinkedIn post."""
     
+    __slots__ = (
+        "video_id",
+        "content",
+        "title",
+        "status",
+        "created_at",
+        "updated_at",
+        "published_at",
+        "reviewed_at",
+        "reviewed_by",
+        "published_url",
+        "video_title",
+        "video_url"
+    )
+    
     def __init__(
         self,
         video_id: str,
@@ -41,41 +73,6 @@ class LinkedInPost:
         self.video_title = video_title
         self.video_url = video_url
     
-    def to_dict(self) -> Dict:
-        """Convert LinkedInPost to dictionary for MongoDB storage."""
-        return {
-            "video_id": self.video_id,
-            "content": self.content,
-            "title": self.title,
-            "status": self.status.value,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at,
-            "published_at": self.published_at,
-            "reviewed_at": self.reviewed_at,
-            "reviewed_by": self.reviewed_by,
-            "published_url": self.published_url,
-            "video_title": self.video_title,
-            "video_url": self.video_url
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'LinkedInPost':
-        """Create LinkedInPost from dictionary (from MongoDB)."""
-        return cls(
-            video_id=data["video_id"],
-            content=data["content"],
-            title=data.get("title"),
-            status=PostStatus(data.get("status", "draft")),
-            created_at=data.get("created_at"),
-            updated_at=data.get("updated_at"),
-            published_at=data.get("published_at"),
-            reviewed_at=data.get("reviewed_at"),
-            reviewed_by=data.get("reviewed_by"),
-            published_url=data.get("published_url"),
-            video_title=data.get("video_title"),
-            video_url=data.get("video_url")
-        )
-    
     def mark_as_reviewed(self, reviewer: str = "admin") -> None:
         """Mark the post as reviewed."""
         self.status = PostStatus.REVIEWED
@@ -0,0 +1,137 @@
+"""
+Memory and codec throughput of the slotted models.
+
+Each model is compared with an unslotted copy of itself (same __init__ and
+the same generated to_dict/from_dict, but with a per-instance __dict__), so
+the difference is what __slots__ costs or saves. Memory is what tracemalloc
+attributes to building --instances objects, divided per instance; the
+attribute values are shared and not counted. Throughput is the best of
+--repeat timing runs, taken in turn across layouts and methods.
+    
+    python -m app.models.model_benchmark --instances 10000
+"""
+import argparse
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from app.models.codec import model_codec
+from app.models.linkedin_post import LinkedInPost, PostStatus
+from app.models.summary import Summary
+from app.models.transcript import TranscriptSegment
+from app.models.video import Video
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def samples() -> List[Tuple[type, Callable[[type], object]]]:
+    """Each model with a factory that builds a representative instance of a given class."""
+    def video(cls: type) -> object:
+        video = cls(
+            video_id="dQw4w9WgXcQ",
+            title="Building a data pipeline",
+            channel_id="UC_x5XG1OV2P6uZZ5FSM9Ttw",
+            channel_title="Example Channel",
+            published_at=NOW,
+            description="A walk through the pipeline.",
+            thumbnail_url="https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg"
+        )
+        video.duration_seconds = 754
+        video.has_captions = True
+        video.live_status = "none"
+        return video
+    
+    def segment(cls: type) -> object:
+        return cls(text="we will see how this works", start=12.5, duration=2.75)
+    
+    def summary(cls: type) -> object:
+        return cls(
+            video_id="dQw4w9WgXcQ",
+            summary_text="The video walks through a data pipeline.",
+            key_points=["Ingest", "Transform", "Serve"],
+            created_at=NOW,
+            model_used="gpt-4o-mini"
+        )
+    
+    def post(cls: type) -> object:
+        return cls(
+            video_id="dQw4w9WgXcQ",
+            content="Three things I learned about data pipelines...",
+            title="Data pipelines",
+            status=PostStatus.DRAFT,
+            created_at=NOW,
+            video_title="Building a data pipeline",
+            video_url="https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        )
+    
+    return [(Video, video), (TranscriptSegment, segment), (Summary, summary), (LinkedInPost, post)]
+
+
+def unslotted(cls: type) -> type:
+    """A copy of a model with a per-instance __dict__ instead of __slots__."""
+    plain = type(cls.__name__, (), {"__init__": cls.__init__, "__doc__": cls.__doc__})
+    return model_codec(*cls.codec_fields)(plain)
+
+
+def bytes_per_instance(factory: Callable[[], object], instances: int) -> float:
+    """Memory allocated per instance while building `instances` of them."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(instances)]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # The list holding them is not part of the instances
+    allocated -= objects.__sizeof__()
+    return allocated / instances
+
+
+def best_rates(calls: Dict[str, Callable[[], object]], repeat: int, number: int = 2000) -> Dict[str, float]:
+    """
+    Best-of-repeat calls per second of each callable.
+    
+    The callables are timed in turn within every run, so a slow spell on a
+    shared machine hits all of them rather than skewing one.
+    """
+    best = dict.fromkeys(calls, float("inf"))
+    for _ in range(repeat):
+        for name, call in calls.items():
+            best[name] = min(best[name], timeit.timeit(call, number=number))
+    return {name: number / seconds for name, seconds in best.items()}
+
+
+def measure(model: type, factory: Callable[[type], object], instances: int, repeat: int) -> Dict[str, Dict]:
+    """Bytes per instance and to_dict/from_dict throughput, per layout of one model."""
+    results = {}
+    calls = {}
+    for layout, cls in (("dict", unslotted(model)), ("slots", model)):
+        obj = factory(cls)
+        document = obj.to_dict()
+        if cls.from_dict(document).to_dict() != document:
+            raise RuntimeError(f"{model.__name__} ({layout}) did not round-trip")
+        results[layout] = {"bytes": bytes_per_instance(lambda: factory(cls), instances)}
+        calls[(layout, "to_dict")] = obj.to_dict
+        calls[(layout, "from_dict")] = lambda cls=cls, document=document: cls.from_dict(document)
+    
+    for (layout, method), rate in best_rates(calls, repeat).items():
+        results[layout][method] = rate / 1000
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare slotted models with unslotted copies")
+    parser.add_argument("--instances", type=int, default=10000, help="Instances built for the memory measurement")
+    parser.add_argument("--repeat", type=int, default=50, help="Timing runs per method (best is reported)")
+    args = parser.parse_args()
+    
+    print(f"{'model':<19}{'layout':<10}{'bytes/obj':>10}{'to_dict k/s':>13}{'from_dict k/s':>15}")
+    for model, factory in samples():
+        for layout, result in measure(model, factory, args.instances, args.repeat).items():
+            print(
+                f"{model.__name__:<19}{layout:<10}{result['bytes']:>10.0f}"
+                f"{result['to_dict']:>13.0f}{result['from_dict']:>15.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
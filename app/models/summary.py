@@ -1,8 +1,26 @@
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import List, Optional
 
+from app.models.codec import REQUIRED, Field, model_codec
+
+@model_codec(
+    Field("video_id", REQUIRED),
+    Field("summary_text", REQUIRED),
+    Field("key_points", REQUIRED),
+    Field("created_at", REQUIRED),
+    Field("model_used"),
+    Field("key_point_times")
+)
 class Summary:
-    """Model representing a video summary."""
+    """
+    Model representing a video summary.
+    
+    key_point_times holds, for each key point, the second of the video it
+    is quoted from (None where the transcript does not contain it), for
+    &t= deep links.
+    """
+    
+    __slots__ = ("video_id", "summary_text", "key_points", "created_at", "model_used", "key_point_times")
     
     def __init__(
         self,
@@ -10,31 +28,12 @@ class Summary:
         summary_text: str,
         key_points: List[str],
         created_at: Optional[datetime] = None,
-        model_used: Optional[str] = None
+        model_used: Optional[str] = None,
+        key_point_times: Optional[List[Optional[float]]] = None
     ):
         self.video_id = video_id
         self.summary_text = summary_text
         self.key_points = key_points
         self.created_at = created_at or datetime.now()
         self.model_used = model_used
-    
-    def to_dict(self) -> Dict:
-        """Convert Summary to dictionary for MongoDB storage."""
-        return {
-            "video_id": self.video_id,
-            "summary_text": self.summary_text,
-            "key_points": self.key_points,
-            "created_at": self.created_at,
-            "model_used": self.model_used
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'Summary':
-        """Create Summary from dictionary (from MongoDB)."""
-        return cls(
-            video_id=data["video_id"],
-            summary_text=data["summary_text"],
-            key_points=data["key_points"],
-            created_at=data["created_at"],
-            model_used=data.get("model_used")
-        ) 
\ No newline at end of file
+        self.key_point_times = key_point_times
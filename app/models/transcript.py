@@ -1,9 +1,75 @@
+import re
+from bisect import bisect_right
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence
 
+from app.models.codec import REQUIRED, Field, model_codec
+from app.models.transcript_codec import (
+    OFFSET_TYPECODE,
+    TEXT_SEPARATOR,
+    TIME_TYPECODE,
+    decode_segments,
+    decode_text,
+    encode_segments,
+    is_columnar,
+    segment_offsets,
+    split_texts,
+    unpack_column
+)
+
+
+class TranscriptOffsetIndex:
+    """
+    Maps character offsets in a transcript's full text to segment timestamps.
+    
+    offsets[i] is where segment i starts in the full text and starts[i] is
+    its start time, so a lookup is a single bisect over offsets.
+    """
+    
+    __slots__ = ("offsets", "starts")
+    
+    def __init__(self, offsets: Sequence[int], starts: Sequence[float]):
+        self.offsets = offsets
+        self.starts = starts
+    
+    def segment_at(self, char_offset: int) -> int:
+        """Index of the segment containing char_offset, in O(log n)."""
+        if not self.offsets:
+            raise IndexError("transcript has no segments")
+        return max(bisect_right(self.offsets, char_offset) - 1, 0)
+    
+    def timestamp_at(self, char_offset: int) -> float:
+        """Start time (seconds) of the segment containing char_offset."""
+        return self.starts[self.segment_at(char_offset)]
+    
+    def timestamp_of(self, full_text: str, snippet: str) -> Optional[float]:
+        """
+        Start time of the first occurrence of snippet in full_text.
+        
+        full_text may also be a leading part of the transcript's text, whose
+        offsets are the same. Matching ignores case and differences in
+        whitespace and runs on full_text itself, so the match position is an
+        offset into it; returns None when the snippet does not appear (e.g.
+        for paraphrased key points).
+        """
+        words = snippet.split()
+        if not words or not self.offsets:
+            return None
+        match = re.search(r"\s+".join(re.escape(word) for word in words), full_text, re.IGNORECASE)
+        if match is None:
+            return None
+        return self.timestamp_at(match.start())
+
+@model_codec(
+    Field("text", REQUIRED),
+    Field("start", REQUIRED),
+    Field("duration", REQUIRED)
+)
 class TranscriptSegment:
     """Model representing a segment of a transcript."""
     
+    __slots__ = ("text", "start", "duration")
+    
     def __init__(
         self,
         text: str,
@@ -13,28 +79,13 @@ class TranscriptSegment:
         self.text = text
         self.start = start
         self.duration = duration
-    
-    def to_dict(self) -> Dict:
-        """Convert TranscriptSegment to dictionary for MongoDB storage."""
-        return {
-            "text": self.text,
-            "start": self.start,
-            "duration": self.duration
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'TranscriptSegment':
-        """Create TranscriptSegment from dictionary (from MongoDB)."""
-        return cls(
-            text=data["text"],
-            start=data["start"],
-            duration=data["duration"]
-        )
 
 
 class Transcript:
     """Model representing a complete video transcript."""
     
+    __slots__ = ("video_id", "segments", "language", "created_at", "_offset_index")
+    
     def __init__(
         self,
         video_id: str,
@@ -46,22 +97,42 @@ class Transcript:
         self.segments = segments
         self.language = language
         self.created_at = created_at or datetime.now()
+        self._offset_index: Optional[TranscriptOffsetIndex] = None
     
-    def to_dict(self) -> Dict:
-        """Convert Transcript to dictionary for MongoDB storage."""
+    def to_dict(self, compress: bool = True) -> Dict:
+        """
+        Convert Transcript to dictionary for MongoDB storage.
+        
+        Segments are stored column-wise (see transcript_codec) rather than
+        as one subdocument per segment.
+        """
         return {
             "video_id": self.video_id,
-            "segments": [segment.to_dict() for segment in self.segments],
             "language": self.language,
-            "created_at": self.created_at
+            "created_at": self.created_at,
+            **encode_segments(
+                [segment.text for segment in self.segments],
+                [segment.start for segment in self.segments],
+                [segment.duration for segment in self.segments],
+                compress=compress
+            )
         }
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'Transcript':
-        """Create Transcript from dictionary (from MongoDB)."""
+        """Create Transcript from dictionary (from MongoDB), in either storage layout."""
+        if is_columnar(data):
+            blob, offsets, starts, durations = decode_segments(data)
+            segments = [
+                TranscriptSegment(text=text, start=start, duration=duration)
+                for text, start, duration in zip(split_texts(blob, offsets), starts, durations)
+            ]
+        else:
+            segments = [TranscriptSegment.from_dict(segment) for segment in data["segments"]]
+        
         return cls(
             video_id=data["video_id"],
-            segments=[TranscriptSegment.from_dict(segment) for segment in data["segments"]],
+            segments=segments,
             language=data["language"],
             created_at=data["created_at"]
         )
@@ -85,4 +156,178 @@ class Transcript:
     
     def get_full_text(self) -> str:
         """Get the complete transcript text."""
-        return " ".join(segment.text for segment in self.segments) 
\ No newline at end of file
+        return " ".join(segment.text for segment in self.segments) 
+    
+    def get_offset_index(self) -> TranscriptOffsetIndex:
+        """Get the character offset -> timestamp index, built once from the segments."""
+        if self._offset_index is None:
+            self._offset_index = TranscriptOffsetIndex(
+                segment_offsets([segment.text for segment in self.segments]),
+                [segment.start for segment in self.segments]
+            )
+        return self._offset_index
+    
+    def timestamp_at(self, char_offset: int) -> float:
+        """Start time of the segment containing a full-text character offset."""
+        return self.get_offset_index().timestamp_at(char_offset)
+    
+    def timestamp_of(self, snippet: str) -> Optional[float]:
+        """Start time of the first occurrence of snippet (ignoring case), or None."""
+        return self.get_offset_index().timestamp_of(self.get_full_text(), snippet)
+
+
+class LazyTranscript:
+    """
+    Read-only view of a stored transcript that builds segments on access.
+    
+    Nothing is decoded up front: the text blob is decompressed and joined
+    at most once (get_full_text), and TranscriptSegment objects are only
+    created for the segments a caller actually iterates over or indexes.
+    Works with both the columnar and the legacy storage layouts.
+    """
+    
+    __slots__ = (
+        "video_id",
+        "language",
+        "created_at",
+        "_data",
+        "_columnar",
+        "_full_text",
+        "_offsets",
+        "_starts",
+        "_durations",
+        "_offset_index"
+    )
+    
+    def __init__(self, data: Dict):
+        self.video_id = data["video_id"]
+        self.language = data.get("language", "en")
+        self.created_at = data.get("created_at")
+        self._data = data
+        self._columnar = is_columnar(data)
+        self._full_text: Optional[str] = None
+        self._offsets: Optional[Sequence[int]] = None
+        self._starts: Optional[Sequence[float]] = None
+        self._durations: Optional[Sequence[float]] = None
+        self._offset_index: Optional[TranscriptOffsetIndex] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LazyTranscript':
+        """Wrap a transcript document (from MongoDB) without decoding it."""
+        return cls(data)
+    
+    def __len__(self) -> int:
+        if self._columnar:
+            return self._data["segment_count"]
+        return len(self._data["segments"])
+    
+    def __getitem__(self, index: int) -> TranscriptSegment:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transcript segment index out of range")
+        return TranscriptSegment(
+            text=self._text(index),
+            start=self.starts[index],
+            duration=self.durations[index]
+        )
+    
+    def __iter__(self) -> Iterator[TranscriptSegment]:
+        return self.iter_segments()
+    
+    @property
+    def starts(self) -> Sequence[float]:
+        """Segment start times, decoded once."""
+        if self._starts is None:
+            if self._columnar:
+                self._starts = unpack_column(TIME_TYPECODE, self._data["starts"])
+            else:
+                self._starts = [segment["start"] for segment in self._data["segments"]]
+        return self._starts
+    
+    @property
+    def durations(self) -> Sequence[float]:
+        """Segment durations, decoded once."""
+        if self._durations is None:
+            if self._columnar:
+                self._durations = unpack_column(TIME_TYPECODE, self._data["durations"])
+            else:
+                self._durations = [segment["duration"] for segment in self._data["segments"]]
+        return self._durations
+    
+    @property
+    def offsets(self) -> Sequence[int]:
+        """Character offset of each segment in the full text, decoded once."""
+        if self._offsets is None:
+            if self._columnar:
+                self._offsets = unpack_column(OFFSET_TYPECODE, self._data["text_offsets"])
+            else:
+                self._offsets = segment_offsets(
+                    [segment["text"] for segment in self._data["segments"]]
+                )
+        return self._offsets
+    
+    def get_offset_index(self) -> TranscriptOffsetIndex:
+        """Get the character offset -> timestamp index (stored with columnar transcripts)."""
+        if self._offset_index is None:
+            self._offset_index = TranscriptOffsetIndex(self.offsets, self.starts)
+        return self._offset_index
+    
+    def timestamp_at(self, char_offset: int) -> float:
+        """Start time of the segment containing a full-text character offset."""
+        return self.get_offset_index().timestamp_at(char_offset)
+    
+    def timestamp_of(self, snippet: str) -> Optional[float]:
+        """Start time of the first occurrence of snippet (ignoring case), or None."""
+        return self.get_offset_index().timestamp_of(self.get_full_text(), snippet)
+    
+    def _text(self, index: int) -> str:
+        """Text of one segment without building the others."""
+        if not self._columnar:
+            return self._data["segments"][index]["text"]
+        
+        offsets = self.offsets
+        full_text = self.get_full_text()
+        start = offsets[index]
+        if index + 1 < len(offsets):
+            end = offsets[index + 1] - len(TEXT_SEPARATOR)
+        else:
+            end = len(full_text)
+        return full_text[start:end]
+    
+    def get_full_text(self) -> str:
+        """Get the complete transcript text, computed once and cached."""
+        if self._full_text is None:
+            if self._columnar:
+                self._full_text = decode_text(self._data)
+            else:
+                self._full_text = TEXT_SEPARATOR.join(
+                    segment["text"] for segment in self._data["segments"]
+                )
+        return self._full_text
+    
+    def iter_segments(self, start_index: int = 0, end_index: Optional[int] = None) -> Iterator[TranscriptSegment]:
+        """Yield segments one at a time, building each only when requested."""
+        end_index = len(self) if end_index is None else min(end_index, len(self))
+        for index in range(start_index, end_index):
+            yield self[index]
+    
+    def iter_window(self, start_seconds: float, end_seconds: float) -> Iterator[TranscriptSegment]:
+        """
+        Yield the segments that overlap the time window [start_seconds, end_seconds).
+        
+        The first segment is located with a binary search over start times,
+        so a window costs O(log n) plus the segments it contains.
+        """
+        starts = self.starts
+        index = max(bisect_right(starts, start_seconds) - 1, 0)
+        if index < len(self) and starts[index] + self.durations[index] <= start_seconds:
+            index += 1
+        while index < len(self) and starts[index] < end_seconds:
+            yield self[index]
+            index += 1
+    
+    def to_transcript(self) -> Transcript:
+        """Materialize a full Transcript."""
+        return Transcript.from_dict(self._data)
+
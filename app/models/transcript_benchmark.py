@@ -0,0 +1,77 @@
+"""
+Size and decode time of transcript documents, per storage layout.
+
+Compares the legacy layout (one subdocument per segment) with the columnar
+layout of transcript_codec, with and without zlib, on synthetic transcripts
+of 5-10 words per segment. Size is the BSON-encoded document; decode time
+covers bson.decode plus Transcript.from_dict, as a repository read would.
+    
+    python -m app.models.transcript_benchmark --segments 3000,12000
+"""
+import argparse
+import random
+import timeit
+from typing import Dict
+
+import bson
+
+from app.models.transcript import Transcript, TranscriptSegment
+
+WORDS = ("the", "model", "video", "data", "we", "will", "see", "how", "this", "works",
+         "pipeline", "summary", "and", "then", "next", "step", "is", "to", "train", "it")
+
+
+def synthetic_transcript(segment_count: int, seed: int = 0) -> Transcript:
+    """Transcript of segment_count segments of 5-10 words, about 2.5s each."""
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    for _ in range(segment_count):
+        duration = round(rng.uniform(1.5, 4.0), 3)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 10)))
+        segments.append(TranscriptSegment(text=text, start=round(start, 3), duration=duration))
+        start += duration
+    return Transcript(video_id="benchmark", segments=segments)
+
+
+def layouts(transcript: Transcript) -> Dict[str, Dict]:
+    """The same transcript as a document in each storage layout."""
+    legacy = {
+        "video_id": transcript.video_id,
+        "language": transcript.language,
+        "created_at": transcript.created_at,
+        "segments": [segment.to_dict() for segment in transcript.segments]
+    }
+    return {
+        "legacy": legacy,
+        "columnar": transcript.to_dict(compress=False),
+        "columnar+zlib": transcript.to_dict(compress=True)
+    }
+
+
+def measure(document: Dict, repeat: int) -> Dict:
+    """BSON size and best-of-repeat decode time of a document."""
+    encoded = bson.encode(document)
+    seconds = min(timeit.repeat(lambda: Transcript.from_dict(bson.decode(encoded)), number=1, repeat=repeat))
+    return {"bson_kib": len(encoded) / 1024, "decode_ms": seconds * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare transcript storage layouts")
+    parser.add_argument("--segments", default="3000,12000", help="Comma-separated segment counts")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing runs per layout (best is reported)")
+    args = parser.parse_args()
+    
+    print(f"{'segments':>9}  {'layout':<15}{'BSON KiB':>10}{'decode ms':>11}")
+    for segment_count in [int(value) for value in args.segments.split(",")]:
+        transcript = synthetic_transcript(segment_count)
+        for layout, document in layouts(transcript).items():
+            decoded = Transcript.from_dict(bson.decode(bson.encode(document)))
+            if decoded.get_full_text() != transcript.get_full_text():
+                raise RuntimeError(f"{layout} layout did not round-trip")
+            result = measure(document, args.repeat)
+            print(f"{segment_count:>9}  {layout:<15}{result['bson_kib']:>10.1f}{result['decode_ms']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import sys
+import zlib
+from array import array
+from typing import Dict, List, Tuple
+
+# Storage format tag written on columnar transcript documents
+COLUMNAR_FORMAT = "columnar-v1"
+
+# Text blobs at least this long are zlib-compressed when compression is enabled
+COMPRESS_MIN_CHARS = 4096
+
+# Separator placed between segment texts; the blob is then the full transcript text
+TEXT_SEPARATOR = " "
+
+
+def _typecode_of_width(candidates: str, width: int) -> str:
+    """Pick the array typecode with the given item size on this platform."""
+    for typecode in candidates:
+        if array(typecode).itemsize == width:
+            return typecode
+    raise ImportError(f"No array typecode among {candidates!r} is {width} bytes wide on this platform")
+
+
+# Stored columns are fixed-width little-endian: uint32 offsets and float64
+# times. array typecode sizes vary by platform, so pick them by width.
+OFFSET_TYPECODE = _typecode_of_width("IL", 4)
+TIME_TYPECODE = _typecode_of_width("d", 8)
+
+
+def pack_column(typecode: str, values) -> bytes:
+    """Pack numbers into little-endian bytes for a storage column."""
+    packed = array(typecode, values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_column(typecode: str, data: bytes) -> array:
+    """Unpack a storage column written by pack_column."""
+    unpacked = array(typecode)
+    if len(data) % unpacked.itemsize:
+        raise ValueError(f"Column of {len(data)} bytes is not a whole number of {unpacked.itemsize}-byte items")
+    unpacked.frombytes(data)
+    if sys.byteorder != "little":
+        unpacked.byteswap()
+    return unpacked
+
+
+def segment_offsets(texts: List[str]) -> List[int]:
+    """Character offset of each segment within the separator-joined full text."""
+    offsets = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text) + len(TEXT_SEPARATOR)
+    return offsets
+
+
+def encode_segments(
+    texts: List[str],
+    starts: List[float],
+    durations: List[float],
+    compress: bool = True
+) -> Dict:
+    """
+    Encode transcript segments column-wise for MongoDB storage.
+    
+    Segment texts are joined into one blob (which doubles as the full
+    transcript text) with a packed uint32 array of where each segment
+    starts; starts and durations are packed float64 arrays. Together,
+    text_offsets and starts form the character offset -> timestamp index
+    used by TranscriptOffsetIndex.
+    
+    Args:
+        texts: Segment texts
+        starts: Segment start times in seconds
+        durations: Segment durations in seconds
+        compress: zlib-compress the text blob if it is long enough
+    
+    Returns:
+        Dictionary of storage fields to merge into the transcript document
+    """
+    offsets = segment_offsets(texts)
+    blob = TEXT_SEPARATOR.join(texts)
+    compressed = compress and len(blob) >= COMPRESS_MIN_CHARS
+    
+    return {
+        "format": COLUMNAR_FORMAT,
+        "segment_count": len(texts),
+        "text": zlib.compress(blob.encode("utf-8")) if compressed else blob,
+        "text_compression": "zlib" if compressed else None,
+        "text_offsets": pack_column(OFFSET_TYPECODE, offsets),
+        "starts": pack_column(TIME_TYPECODE, starts),
+        "durations": pack_column(TIME_TYPECODE, durations)
+    }
+
+
+def decode_text(data: Dict) -> str:
+    """Return the full text blob of a columnar transcript document."""
+    text = data["text"]
+    if data.get("text_compression") == "zlib":
+        return zlib.decompress(text).decode("utf-8")
+    return text
+
+
+def decode_segments(data: Dict) -> Tuple[str, array, array, array]:
+    """
+    Decode the columns of a columnar transcript document.
+    
+    Returns:
+        Tuple of (text blob, segment start offsets, starts, durations)
+    """
+    return (
+        decode_text(data),
+        unpack_column(OFFSET_TYPECODE, data["text_offsets"]),
+        unpack_column(TIME_TYPECODE, data["starts"]),
+        unpack_column(TIME_TYPECODE, data["durations"])
+    )
+
+
+def split_texts(blob: str, offsets: array) -> List[str]:
+    """Cut a text blob back into segment texts using its offsets."""
+    ends = list(offsets[1:])
+    ends = [end - len(TEXT_SEPARATOR) for end in ends] + [len(blob)]
+    return [blob[start:end] for start, end in zip(offsets, ends)]
+
+
+def is_columnar(data: Dict) -> bool:
+    """Check whether a transcript document uses the columnar layout."""
+    return data.get("format") == COLUMNAR_FORMAT
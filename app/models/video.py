@@ -1,9 +1,62 @@
+import re
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 
+from app.models.codec import REQUIRED, Field, model_codec
+
+# ISO 8601 durations as returned in videos.list contentDetails (e.g. PT1H2M3S, P0D)
+_DURATION_PATTERN = re.compile(
+    r"^P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+def parse_duration(value: Optional[str]) -> Optional[int]:
+    """Convert an ISO 8601 video duration to seconds; None if missing or unparseable."""
+    match = _DURATION_PATTERN.match(value or "")
+    if not value or not match:
+        return None
+    parts = {key: int(number or 0) for key, number in match.groupdict().items()}
+    return ((parts["days"] * 24 + parts["hours"]) * 60 + parts["minutes"]) * 60 + parts["seconds"]
+
+
+@model_codec(
+    Field("video_id", REQUIRED),
+    Field("title", REQUIRED),
+    Field("channel_id", REQUIRED),
+    Field("channel_title", REQUIRED),
+    Field("published_at", REQUIRED),
+    Field("description"),
+    Field("thumbnail_url"),
+    Field("processed", False, init=False),
+    Field("processed_at", init=False),
+    Field("duration_seconds", init=False),
+    Field("has_captions", init=False),
+    Field("live_status", init=False),
+    Field("deferred_until", init=False),
+    Field("skip_reason", init=False),
+    Field("queue", init=False)
+)
 class Video:
     """Model representing a YouTube video."""
     
+    __slots__ = (
+        "video_id",
+        "title",
+        "channel_id",
+        "channel_title",
+        "published_at",
+        "description",
+        "thumbnail_url",
+        "processed",
+        "processed_at",
+        "duration_seconds",
+        "has_captions",
+        "live_status",
+        "deferred_until",
+        "skip_reason",
+        "queue"
+    )
+    
     def __init__(
         self,
         video_id: str,
@@ -23,36 +76,14 @@ class Video:
         self.thumbnail_url = thumbnail_url
         self.processed = False
         self.processed_at = None
-    
-    def to_dict(self) -> Dict:
-        """Convert Video object to dictionary for MongoDB storage."""
-        return {
-            "video_id": self.video_id,
-            "title": self.title,
-            "channel_id": self.channel_id,
-            "channel_title": self.channel_title,
-            "published_at": self.published_at,
-            "description": self.description,
-            "thumbnail_url": self.thumbnail_url,
-            "processed": self.processed,
-            "processed_at": self.processed_at
-        }
-    
-    @classmethod
-    def from_dict(cls, data: Dict) -> 'Video':
-        """Create Video object from dictionary (from MongoDB)."""
-        video = cls(
-            video_id=data["video_id"],
-            title=data["title"],
-            channel_id=data["channel_id"],
-            channel_title=data["channel_title"],
-            published_at=data["published_at"],
-            description=data.get("description"),
-            thumbnail_url=data.get("thumbnail_url")
-        )
-        video.processed = data.get("processed", False)
-        video.processed_at = data.get("processed_at")
-        return video
+        # Filled from videos.list by the monitor's enrichment stage
+        self.duration_seconds = None
+        self.has_captions = None
+        self.live_status = None
+        self.deferred_until = None
+        self.skip_reason = None
+        # RabbitMQ queue (fresh or backfill lane) the video is published to
+        self.queue = None
     
     @classmethod
     def from_youtube_api_response(cls, item: Dict) -> 'Video':
@@ -68,4 +99,51 @@ class Video:
                          if snippet.get("publishedAt") else datetime.now(),
             description=snippet.get("description", ""),
             thumbnail_url=snippet.get("thumbnails", {}).get("high", {}).get("url", "")
-        ) 
\ No newline at end of file
+        )
+    
+    @classmethod
+    def from_playlist_item(cls, item: Dict) -> 'Video':
+        """Create Video object from a playlistItems.list (uploads playlist) item."""
+        snippet = item.get("snippet", {})
+        content_details = item.get("contentDetails", {})
+        published_at = content_details.get("videoPublishedAt") or snippet.get("publishedAt")
+        
+        return cls(
+            video_id=content_details.get("videoId") or snippet.get("resourceId", {}).get("videoId"),
+            title=snippet.get("title", ""),
+            channel_id=snippet.get("videoOwnerChannelId") or snippet.get("channelId", ""),
+            channel_title=snippet.get("videoOwnerChannelTitle") or snippet.get("channelTitle", ""),
+            published_at=datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+                         if published_at else datetime.now(),
+            description=snippet.get("description", ""),
+            thumbnail_url=snippet.get("thumbnails", {}).get("high", {}).get("url", "")
+        )
+    
+    def apply_details(self, item: Dict) -> None:
+        """
+        Fill duration, caption and live status from a videos.list item.
+        
+        The channel is taken from the item as well, since it is
+        authoritative where the source of the video (e.g. a push
+        notification) may not be. has_captions reflects uploaded caption
+        tracks only; YouTube does not report auto-generated captions here.
+        """
+        snippet = item.get("snippet", {})
+        content_details = item.get("contentDetails", {})
+        live_details = item.get("liveStreamingDetails")
+        
+        self.channel_id = snippet.get("channelId") or self.channel_id
+        self.channel_title = snippet.get("channelTitle") or self.channel_title
+        self.duration_seconds = parse_duration(content_details.get("duration"))
+        if "caption" in content_details:
+            self.has_captions = content_details["caption"] == "true"
+        
+        live_status = snippet.get("liveBroadcastContent")
+        if live_status is None and live_details:
+            if live_details.get("actualEndTime"):
+                live_status = "none"
+            elif live_details.get("actualStartTime"):
+                live_status = "live"
+            else:
+                live_status = "upcoming"
+        self.live_status = live_status or "none"
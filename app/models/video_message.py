@@ -0,0 +1,113 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.models.codec import REQUIRED, Field, model_codec
+from app.models.video import Video
+
+# Version written on every message; bump it on incompatible changes
+MESSAGE_SCHEMA_VERSION = 1
+
+# Versions this code can read
+SUPPORTED_SCHEMA_VERSIONS = (1,)
+
+MESSAGE_TYPE = "video.discovered"
+CONTENT_TYPE = "application/json"
+
+
+def _encode_datetime(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _decode_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+@model_codec(
+    Field("message_id", REQUIRED),
+    Field("video_id", REQUIRED),
+    Field("channel_id"),
+    Field("title"),
+    Field("published_at", encode=_encode_datetime, decode=_decode_datetime),
+    Field("source", "poll"),
+    Field("discovered_at", REQUIRED, encode=_encode_datetime, decode=_decode_datetime)
+)
+class VideoMessage:
+    """
+    Message announcing a discovered video on the RabbitMQ video queues.
+    
+    Serialized as a JSON object carrying schema_version and type next to
+    the fields below; readers reject versions they do not support.
+    """
+    
+    __slots__ = (
+        "message_id",
+        "video_id",
+        "channel_id",
+        "title",
+        "published_at",
+        "source",
+        "discovered_at"
+    )
+    
+    def __init__(
+        self,
+        video_id: str,
+        channel_id: Optional[str] = None,
+        title: Optional[str] = None,
+        published_at: Optional[datetime] = None,
+        source: str = "poll",
+        discovered_at: Optional[datetime] = None,
+        message_id: Optional[str] = None
+    ):
+        self.message_id = message_id or uuid.uuid4().hex
+        self.video_id = video_id
+        self.channel_id = channel_id
+        self.title = title
+        self.published_at = published_at
+        self.source = source
+        self.discovered_at = discovered_at or datetime.now(timezone.utc)
+    
+    @classmethod
+    def from_video(cls, video: Video, source: str = "poll") -> 'VideoMessage':
+        """Create the message for a discovered video (source: poll, push or backfill)."""
+        return cls(
+            video_id=video.video_id,
+            channel_id=video.channel_id,
+            title=video.title,
+            published_at=video.published_at,
+            source=source
+        )
+    
+    def to_json(self) -> bytes:
+        """Serialize to the versioned JSON wire format."""
+        document = {"schema_version": MESSAGE_SCHEMA_VERSION, "type": MESSAGE_TYPE, **self.to_dict()}
+        return json.dumps(document, separators=(",", ":")).encode("utf-8")
+    
+    @classmethod
+    def from_json(cls, body: bytes) -> 'VideoMessage':
+        """
+        Parse a message body.
+        
+        Raises:
+            ValueError: If the body is not a supported video message
+        """
+        try:
+            document = json.loads(body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Message body is not JSON: {str(e)}")
+        if not isinstance(document, dict):
+            raise ValueError("Message body is not a JSON object")
+        if document.get("schema_version") not in SUPPORTED_SCHEMA_VERSIONS:
+            raise ValueError(f"Unsupported message schema version: {document.get('schema_version')}")
+        if document.get("type") != MESSAGE_TYPE:
+            raise ValueError(f"Unexpected message type: {document.get('type')}")
+        try:
+            return cls.from_dict(document)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid video message: {str(e)}")
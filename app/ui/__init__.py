@@ -1,4 +1,5 @@
-from app.ui.views import ui_bp
-
 def register_blueprints(app):
+    # Imported here so importing app.ui.app does not pull in the blueprint views
+    from app.ui.views import ui_bp
+    
     app.register_blueprint(ui_bp, url_prefix='/')
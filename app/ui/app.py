@@ -1,11 +1,20 @@
 import logging
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 from flask_bootstrap import Bootstrap5
-from datetime import datetime
+from xml.etree.ElementTree import ParseError
+from defusedxml import DefusedXmlException
 
+from app.api.websub import MAX_NOTIFICATION_BYTES, WebSubReceiver, verify_intent
 from app.models.video import Video
 from app.models.linkedin_post import LinkedInPost, PostStatus
-from app.core.database import VideoRepository, LinkedInPostRepository
+from app.core import database
+from app.core.database import (
+    VideoRepository,
+    LinkedInPostRepository,
+    POST_CARD_FIELDS,
+    VIDEO_HEADER_FIELDS
+)
+from config.config import WEBSUB_ENABLED
 
 # Configure logging
 logging.basicConfig(
@@ -30,24 +39,41 @@ app.config['BOOTSTRAP_BOOTSWATCH_THEME'] = 'flatly'
 # Initialize extensions
 bootstrap = Bootstrap5(app)
 
+# Feeds WebSub pushes into the monitor's save-and-enqueue path; refuses to start without WEBSUB_SECRET
+websub_receiver = WebSubReceiver() if WEBSUB_ENABLED else None
+
 # Routes
 
 @app.route('/')
 def index():
     """Landing page with list of posts."""
-    # Get all posts, sorted by creation date
-    posts = LinkedInPostRepository.list_posts(limit=50)
+    cursor = request.args.get('cursor')
+    
+    # Get one page of post cards, sorted by creation date
+    try:
+        posts, next_cursor = LinkedInPostRepository.list_posts_page(
+            limit=50,
+            cursor=cursor,
+            projection=POST_CARD_FIELDS
+        )
+    except ValueError:
+        flash('Invalid page link', 'warning')
+        return redirect(url_for('index'))
     
-    # Get video details for each post
-    for post in posts:
-        video_data = VideoRepository.get_video(post['video_id'])
-        if video_data:
-            post['video_title'] = video_data.get('title', 'Unknown Video')
-            post['video_thumbnail'] = video_data.get('thumbnail_url', '')
-            post['channel_title'] = video_data.get('channel_title', 'Unknown Channel')
-            post['published_at'] = video_data.get('published_at', datetime.now())
+    # Get video headers for all posts in one query
+    videos = VideoRepository.get_videos(
+        [post['video_id'] for post in posts],
+        projection=VIDEO_HEADER_FIELDS
+    )
     
-    return render_template('index.html', posts=posts)
+    # Pair each post with its video
+    items = [
+        {'post': post, 'video': videos[post['video_id']]}
+        for post in posts
+        if post['video_id'] in videos
+    ]
+    
+    return render_template('index.html', posts=items, cursor=cursor, next_cursor=next_cursor)
 
 @app.route('/posts/<video_id>/view')
 def view_post(video_id):
@@ -59,7 +85,7 @@ def view_post(video_id):
         return redirect(url_for('index'))
     
     # Get video data
-    video_data = VideoRepository.get_video(video_id)
+    video_data = VideoRepository.get_video(video_id, projection=VIDEO_HEADER_FIELDS)
     if not video_data:
         flash('Video not found', 'danger')
         return redirect(url_for('index'))
@@ -80,7 +106,7 @@ def edit_post(video_id):
         return redirect(url_for('index'))
     
     # Get video data
-    video_data = VideoRepository.get_video(video_id)
+    video_data = VideoRepository.get_video(video_id, projection=VIDEO_HEADER_FIELDS)
     if not video_data:
         flash('Video not found', 'danger')
         return redirect(url_for('index'))
@@ -202,5 +228,46 @@ def api_send_email():
         "status": "started"
     })
 
+# WebSub callback for YouTube upload notifications
+
+@app.route('/websub/youtube', methods=['GET'])
+def websub_verify():
+    """Answer the hub's verification of a (un)subscription request."""
+    challenge = verify_intent(request.args)
+    if challenge is None:
+        return "Unknown subscription", 404
+    return challenge, 200, {'Content-Type': 'text/plain'}
+
+@app.route('/websub/youtube', methods=['POST'])
+def websub_notify():
+    """Receive an Atom push notification for a channel's uploads."""
+    if websub_receiver is None:
+        return "WebSub is disabled", 404
+    if (request.content_length or 0) > MAX_NOTIFICATION_BYTES:
+        return "Notification too large", 413
+    
+    # The hub retries on errors, so only failures worth retrying return 5xx
+    try:
+        websub_receiver.handle(request.get_data(), request.headers.get('X-Hub-Signature'))
+    except (ParseError, DefusedXmlException) as e:
+        logger.warning(f"Ignoring malformed WebSub notification: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error while handling WebSub notification: {str(e)}")
+        return "Error", 500
+    return "", 204
+
+@app.route('/api/cache/stats')
+def api_cache_stats():
+    """API endpoint exposing the repository cache counters for this process."""
+    if database.document_cache is None:
+        return jsonify({"enabled": False})
+    
+    return jsonify({"enabled": True, **database.document_cache.stats()})
+
+@app.route('/api/db/stats')
+def api_db_stats():
+    """API endpoint exposing MongoDB pool and command timings for this process."""
+    return jsonify(database.MongoDB.get_stats())
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8000, debug=True) 
\ No newline at end of file
@@ -1,7 +1,9 @@
 import logging
 from celery import Celery
+from kombu import Queue
+from celery.signals import worker_init, worker_process_init
 
-from config.config import CELERY_BROKER_URL, CELERY_RESULT_BACKEND
+from config.config import CELERY_BROKER_URL, CELERY_RESULT_BACKEND, MONGODB_MAX_POOL_SIZE
 
 # Configure logging
 logging.basicConfig(
@@ -15,6 +17,22 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# One queue per pipeline stage, so a backlog of slow LLM calls never holds
+# up transcript extraction or email delivery; each is served by its own
+# worker pool (see docker-compose.yml)
+STAGE_QUEUES = {
+    'transcript': 'pipeline.transcript',
+    'summary': 'pipeline.summary',
+    'post': 'pipeline.post',
+    'email': 'pipeline.email'
+}
+
+# Backfilled videos run on a queue of their own at each stage, so a backfill
+# burst never lines up in front of fresh uploads: a worker consuming both
+# takes from them in turn, and the video consumer stops feeding the backfill
+# queues while they hold BACKFILL_MAX_PIPELINE_DEPTH tasks
+BACKFILL_STAGE_QUEUES = {stage: f'{queue}.backfill' for stage, queue in STAGE_QUEUES.items()}
+
 # Create Celery app
 app = Celery(
     'youtube_linkedin_pipeline',
@@ -37,8 +55,71 @@ app.conf.update(
     enable_utc=True,
     task_acks_late=True,
     task_reject_on_worker_lost=True,
-    worker_prefetch_multiplier=1
+    worker_prefetch_multiplier=1,
+    # A worker started without -Q serves every stage (e.g. make run-worker)
+    task_queues=[
+        Queue(queue, durable=True)
+        for queue in (*STAGE_QUEUES.values(), *BACKFILL_STAGE_QUEUES.values())
+    ],
+    task_default_queue=STAGE_QUEUES['transcript'],
+    task_routes={
+        'app.workers.tasks.transcript.extract_transcript': {'queue': STAGE_QUEUES['transcript']},
+        'app.workers.tasks.summarize.generate_summary': {'queue': STAGE_QUEUES['summary']},
+        'app.workers.tasks.linkedin_post.generate_linkedin_post': {'queue': STAGE_QUEUES['post']},
+        'app.workers.tasks.email.send_post_notification': {'queue': STAGE_QUEUES['email']}
+    },
+    # Wait for the broker to confirm each task message, so the video
+    # consumer acks queue messages only for tasks that were really sent
+    broker_transport_options={'confirm_publish': True}
 )
 
+@worker_init.connect
+def _ensure_indexes(**kwargs):
+    """Make sure the unique video_id indexes exist before tasks upsert."""
+    from app.core.indexes import ensure_indexes
+    ensure_indexes()
+
+@worker_init.connect
+def _check_green_pool(sender=None, **kwargs):
+    """
+    Refuse to start a gevent/eventlet pool on an unpatched standard library.
+    
+    The celery command monkey-patches when started with -P gevent (or
+    eventlet); without it every MongoDB, OpenAI and SMTP call would block
+    the whole worker instead of yielding to the other green threads.
+    
+    All green threads share the process's one MongoDB pool, so a pool
+    smaller than the concurrency is logged: the excess wait up to
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS for a connection and then fail.
+    """
+    pool = getattr(sender, 'pool_cls', None)
+    name = pool if isinstance(pool, str) else getattr(pool, '__module__', '')
+    if 'gevent' in name:
+        from gevent import monkey
+        patched = monkey.is_module_patched('socket')
+    elif 'eventlet' in name:
+        from eventlet import patcher
+        patched = patcher.is_monkey_patched('socket')
+    else:
+        return
+    if not patched:
+        raise RuntimeError(f"Worker pool {name} needs a monkey-patched socket module; start it with celery -P")
+    logger.info(f"Worker running on green pool {name}")
+    
+    concurrency = getattr(sender, 'concurrency', None) or 0
+    if concurrency > MONGODB_MAX_POOL_SIZE:
+        logger.warning(
+            f"{concurrency} green threads share {MONGODB_MAX_POOL_SIZE} MongoDB connections; "
+            f"set MONGODB_MAX_POOL_SIZE to at least the concurrency"
+        )
+
+@worker_process_init.connect
+def _reset_mongo_client(**kwargs):
+    """Drop the MongoDB client inherited from the parent; each child builds its own."""
+    from app.core.database import MongoDB, document_cache
+    MongoDB.reset()
+    if document_cache is not None:
+        document_cache.clear()
+
 if __name__ == '__main__':
     app.start() 
\ No newline at end of file
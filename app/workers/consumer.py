@@ -0,0 +1,330 @@
+import ast
+import functools
+import logging
+import signal
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+
+import pika
+from kombu import Queue
+from pika.exceptions import AMQPConnectionError
+
+from app.core.database import VideoRepository
+from app.core.publisher import MAX_RECONNECT_DELAY_SECONDS, RECONNECT_DELAY_SECONDS, rabbitmq_parameters
+from app.models.video_message import VideoMessage
+from app.workers.celery_app import BACKFILL_STAGE_QUEUES, app as celery_app
+from app.workers.pipeline import start_pipeline
+from config.config import (
+    RABBITMQ_QUEUE,
+    RABBITMQ_BACKFILL_QUEUE,
+    BACKFILL_MAX_PIPELINE_DEPTH,
+    VIDEO_CONSUMER_PREFETCH,
+    VIDEO_CONSUMER_BACKFILL_PREFETCH,
+    VIDEO_CONSUMER_BATCH_SIZE,
+    VIDEO_CONSUMER_FLUSH_SECONDS,
+    VIDEO_CONSUMER_DEDUPE_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Delivery(NamedTuple):
+    """A decoded message awaiting dispatch and ack."""
+    queue: str
+    delivery_tag: int
+    message: VideoMessage
+
+
+def decode_message(body: bytes) -> VideoMessage:
+    """
+    Parse a video queue message.
+    
+    Messages published before the JSON schema were the str() of a dict
+    with video_id and title; they are still accepted so queues holding
+    them drain after an upgrade.
+    
+    Raises:
+        ValueError: If the body is not a video message
+    """
+    try:
+        return VideoMessage.from_json(body)
+    except ValueError as error:
+        if not body.lstrip().startswith(b"{'"):
+            raise
+        try:
+            legacy = ast.literal_eval(body.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError, SyntaxError):
+            raise error
+        if not isinstance(legacy, dict) or not legacy.get("video_id"):
+            raise error
+        return VideoMessage(video_id=legacy["video_id"], title=legacy.get("title"), source="legacy")
+
+
+def dispatch_pipelines(video_ids: List[str], backfill: bool = False) -> None:
+    """
+    Start the processing pipeline for a batch of videos over one producer connection.
+    
+    Args:
+        video_ids: YouTube video IDs
+        backfill: Run the pipelines on the backfill stage queues
+    """
+    with celery_app.producer_or_acquire() as producer:
+        for video_id in video_ids:
+            start_pipeline(video_id, backfill=backfill, producer=producer)
+
+
+def pipeline_backfill_depth() -> int:
+    """Number of tasks waiting in the backfill stage queues of the Celery broker."""
+    with celery_app.pool.acquire(block=True) as connection:
+        channel = connection.default_channel
+        return sum(
+            Queue(queue, durable=True).bind(channel).queue_declare().message_count
+            for queue in BACKFILL_STAGE_QUEUES.values()
+        )
+
+
+class VideoConsumer:
+    """
+    Feeds the video queues filled by the YouTube monitor into the Celery pipeline.
+    
+    Fresh uploads (RABBITMQ_QUEUE) are consumed with a prefetch of
+    VIDEO_CONSUMER_PREFETCH and the backfill lane with the smaller
+    VIDEO_CONSUMER_BACKFILL_PREFETCH, so backfilled videos never take over
+    the unacked window. Deliveries are buffered and dispatched to the
+    processing pipeline in batches of up to VIDEO_CONSUMER_BATCH_SIZE, at
+    least every VIDEO_CONSUMER_FLUSH_SECONDS, fresh uploads first.
+    
+    The lanes stay apart in the pipeline: backfilled videos run on the
+    backfill stage queues (BACKFILL_STAGE_QUEUES). Once those hold
+    BACKFILL_MAX_PIPELINE_DEPTH tasks the consumer stops consuming the
+    backfill lane until they drain, so the backlog waits in
+    RABBITMQ_BACKFILL_QUEUE, where the monitor's BACKFILL_MAX_QUEUE_DEPTH
+    in turn pauses the backfill.
+    
+    Messages are acked only once their batch was dispatched: a crash
+    redelivers at most the prefetch window, and when Celery's broker
+    stalls the consumer stops taking messages instead of buffering them.
+    Duplicates (publishing is at-least-once, and a crash redelivers) are
+    dropped by video_id, against the IDs dispatched recently and then
+    against dispatched_at on the video document.
+    """
+    
+    def __init__(
+        self,
+        dispatch=dispatch_pipelines,
+        parameters: Optional[pika.ConnectionParameters] = None,
+        backfill_depth=pipeline_backfill_depth
+    ):
+        """
+        Args:
+            dispatch: Callable taking a list of video IDs and backfill=, to start their pipelines
+            parameters: Connection parameters; defaults to rabbitmq_parameters()
+            backfill_depth: Callable returning the number of tasks in the backfill stage queues
+        """
+        self._dispatch = dispatch
+        self._backfill_depth = backfill_depth
+        self._backfill_tag: Optional[str] = None
+        self._parameters = parameters or rabbitmq_parameters()
+        self.connection = None
+        self.channel = None
+        self._buffer: List[Delivery] = []
+        self._buffer_started = 0.0
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._dispatch_delay = RECONNECT_DELAY_SECONDS
+        self._stopping = False
+        
+        self.dispatched = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.batches = 0
+        self.backfill_pauses = 0
+    
+    def _connect(self) -> None:
+        """Open the connection and start consuming both queues."""
+        self.connection = pika.BlockingConnection(self._parameters)
+        self.channel = self.connection.channel()
+        self._buffer.clear()
+        
+        self._backfill_tag = None
+        
+        for queue in (RABBITMQ_QUEUE, RABBITMQ_BACKFILL_QUEUE):
+            self.channel.queue_declare(queue=queue, durable=True)
+        # A non-global limit applies to each consumer started after it
+        self.channel.basic_qos(prefetch_count=VIDEO_CONSUMER_PREFETCH)
+        self.channel.basic_consume(
+            queue=RABBITMQ_QUEUE,
+            on_message_callback=functools.partial(self._on_message, RABBITMQ_QUEUE)
+        )
+        logger.info(f"Consuming {RABBITMQ_QUEUE} (prefetch {VIDEO_CONSUMER_PREFETCH})")
+        self._pace_backfill()
+    
+    def _pace_backfill(self) -> None:
+        """Consume the backfill lane only while the backfill stage queues have room."""
+        try:
+            depth = self._backfill_depth()
+        except Exception as e:
+            # Keep the lane as it is; the next flush checks again
+            logger.warning(f"Could not read the backfill stage queue depth: {str(e)}")
+            return
+        
+        if depth >= BACKFILL_MAX_PIPELINE_DEPTH and self._backfill_tag is not None:
+            # Deliveries not handed to _on_message yet are requeued by the cancel
+            self.channel.basic_cancel(self._backfill_tag)
+            self._backfill_tag = None
+            self.backfill_pauses += 1
+            logger.info(f"Pausing {RABBITMQ_BACKFILL_QUEUE}: {depth} tasks in the backfill stage queues")
+        elif depth < BACKFILL_MAX_PIPELINE_DEPTH and self._backfill_tag is None:
+            self.channel.basic_qos(prefetch_count=VIDEO_CONSUMER_BACKFILL_PREFETCH)
+            self._backfill_tag = self.channel.basic_consume(
+                queue=RABBITMQ_BACKFILL_QUEUE,
+                on_message_callback=functools.partial(self._on_message, RABBITMQ_BACKFILL_QUEUE)
+            )
+            logger.info(f"Consuming {RABBITMQ_BACKFILL_QUEUE} (prefetch {VIDEO_CONSUMER_BACKFILL_PREFETCH}, "
+                        f"{depth} tasks in the backfill stage queues)")
+    
+    def _on_message(self, queue: str, channel, method, properties, body: bytes) -> None:
+        try:
+            message = decode_message(body)
+        except ValueError as e:
+            # Redelivering a malformed message would only fail again
+            logger.error(f"Rejecting malformed message from {queue}: {str(e)}")
+            channel.basic_reject(delivery_tag=method.delivery_tag, requeue=False)
+            self.rejected += 1
+            return
+        
+        if not self._buffer:
+            self._buffer_started = time.monotonic()
+        self._buffer.append(Delivery(queue, method.delivery_tag, message))
+    
+    def _flush_due(self) -> bool:
+        if not self._buffer:
+            return False
+        return (
+            len(self._buffer) >= VIDEO_CONSUMER_BATCH_SIZE
+            or time.monotonic() - self._buffer_started >= VIDEO_CONSUMER_FLUSH_SECONDS
+        )
+    
+    def _remember(self, video_id: str) -> None:
+        self._recent[video_id] = None
+        self._recent.move_to_end(video_id)
+        while len(self._recent) > VIDEO_CONSUMER_DEDUPE_SIZE:
+            self._recent.popitem(last=False)
+    
+    def _dispatch_batch(self, batch: List[Delivery]) -> None:
+        """Dispatch the videos of a batch that were not dispatched before, each on its lane."""
+        lanes: Dict[str, str] = {}
+        for delivery in batch:
+            video_id = delivery.message.video_id
+            if video_id not in self._recent and video_id not in lanes:
+                lanes[video_id] = delivery.queue
+        video_ids = list(lanes)
+        
+        new_ids = VideoRepository.filter_undispatched(video_ids)
+        if new_ids:
+            fresh_ids = [video_id for video_id in new_ids if lanes[video_id] != RABBITMQ_BACKFILL_QUEUE]
+            backfill_ids = [video_id for video_id in new_ids if lanes[video_id] == RABBITMQ_BACKFILL_QUEUE]
+            if fresh_ids:
+                self._dispatch(fresh_ids, backfill=False)
+            if backfill_ids:
+                self._dispatch(backfill_ids, backfill=True)
+            VideoRepository.mark_dispatched(new_ids)
+        for video_id in video_ids:
+            self._remember(video_id)
+        
+        self.duplicates += len(batch) - len(new_ids)
+        self.dispatched += len(new_ids)
+        self.batches += 1
+        logger.info(f"Dispatched {len(new_ids)} of {len(batch)} videos to the pipeline "
+                    f"({len(batch) - len(new_ids)} duplicates)")
+    
+    def flush(self) -> int:
+        """
+        Dispatch everything buffered, fresh uploads first, and ack it.
+        
+        If dispatching fails, the deliveries already dispatched are acked,
+        the rest are requeued and the next flush waits with backoff.
+        
+        Returns:
+            Number of deliveries acked
+        """
+        deliveries, self._buffer = self._buffer, []
+        if not deliveries:
+            return 0
+        deliveries.sort(key=lambda delivery: delivery.queue != RABBITMQ_QUEUE)
+        
+        done: List[int] = []
+        try:
+            for start in range(0, len(deliveries), VIDEO_CONSUMER_BATCH_SIZE):
+                batch = deliveries[start:start + VIDEO_CONSUMER_BATCH_SIZE]
+                self._dispatch_batch(batch)
+                done.extend(delivery.delivery_tag for delivery in batch)
+        except Exception as e:
+            logger.error(f"Dispatching to the pipeline failed, requeueing {len(deliveries) - len(done)} "
+                         f"messages and retrying in {self._dispatch_delay}s: {str(e)}")
+            for delivery_tag in done:
+                self.channel.basic_ack(delivery_tag=delivery_tag)
+            for delivery in deliveries[len(done):]:
+                self.channel.basic_nack(delivery_tag=delivery.delivery_tag, requeue=True)
+            # connection.sleep keeps heartbeats flowing while backing off
+            self.connection.sleep(self._dispatch_delay)
+            self._dispatch_delay = min(self._dispatch_delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+            return len(done)
+        
+        # Every unacked delivery is in this flush, so one cumulative ack covers them
+        self.channel.basic_ack(delivery_tag=max(done), multiple=True)
+        self._dispatch_delay = RECONNECT_DELAY_SECONDS
+        self._pace_backfill()
+        return len(done)
+    
+    def _consume(self) -> None:
+        while not self._stopping:
+            time_limit = VIDEO_CONSUMER_FLUSH_SECONDS
+            if self._buffer:
+                time_limit = max(0.0, self._buffer_started + VIDEO_CONSUMER_FLUSH_SECONDS - time.monotonic())
+            self.connection.process_data_events(time_limit=time_limit)
+            if self._flush_due():
+                self.flush()
+            elif self._backfill_tag is None and not self._buffer:
+                # Paused and idle: see whether the backfill stage queues drained
+                self._pace_backfill()
+        self.flush()
+    
+    def stop(self, *args) -> None:
+        """Stop consuming after the current batch (usable as a signal handler)."""
+        logger.info("Stopping video consumer")
+        self._stopping = True
+    
+    def run(self) -> None:
+        """Consume until stopped, reconnecting with backoff when the connection drops."""
+        delay = RECONNECT_DELAY_SECONDS
+        try:
+            while not self._stopping:
+                try:
+                    self._connect()
+                    delay = RECONNECT_DELAY_SECONDS
+                    self._consume()
+                except AMQPConnectionError as e:
+                    # The broker requeues whatever was delivered but not acked
+                    logger.error(f"RabbitMQ connection lost, reconnecting in {delay}s: {str(e)}")
+                    time.sleep(delay)
+                    delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+        finally:
+            if self.connection and self.connection.is_open:
+                self.connection.close()
+            logger.info(f"Video consumer stopped: {self.dispatched} dispatched, "
+                        f"{self.duplicates} duplicates, {self.rejected} rejected, "
+                        f"backfill paused {self.backfill_pauses} times")
+
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    consumer = VideoConsumer()
+    signal.signal(signal.SIGTERM, consumer.stop)
+    signal.signal(signal.SIGINT, consumer.stop)
+    consumer.run()
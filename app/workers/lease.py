@@ -0,0 +1,111 @@
+import logging
+import os
+import socket
+from datetime import datetime
+from typing import Optional
+
+from pymongo.errors import PyMongoError
+
+from app.core.database import StaleLeaseError, TaskLeaseRepository
+from config.config import TASK_LEASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseHeldError(Exception):
+    """Raised when another worker holds the lease on a stage of a video."""
+    
+    def __init__(self, video_id: str, stage: str, expires_at: Optional[datetime]):
+        super().__init__(f"{stage} of video {video_id} is leased until {expires_at}")
+        self.expires_at = expires_at
+    
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the lease expires, when a dead holder's lease can be taken over."""
+        if self.expires_at is None:
+            return 0.0
+        return max(0.0, (self.expires_at - datetime.now()).total_seconds())
+
+
+class StageLease:
+    """
+    A worker's lease on one stage of one video (see TaskLeaseRepository).
+    
+    While it is held, a duplicate delivery of the same stage fails fast
+    with LeaseHeldError instead of repeating the work, and the task skips
+    it (see retry.skip_duplicate); only a delivery redelivered after a
+    worker was lost runs again, once the lease expires. Outputs are saved with the lease's token so a holder
+    that overran its lease cannot overwrite a newer result.
+    """
+    
+    def __init__(
+        self,
+        video_id: str,
+        stage: str,
+        token: int,
+        completed_at: Optional[datetime] = None,
+        started_at: Optional[datetime] = None
+    ):
+        self.video_id = video_id
+        self.stage = stage
+        self.token = token
+        self.completed_at = completed_at
+        self.started_at = started_at
+        self._released = False
+    
+    @classmethod
+    def acquire(cls, video_id: str, stage: str, ttl_seconds: float = TASK_LEASE_SECONDS) -> "StageLease":
+        """
+        Take the lease on a stage of a video.
+        
+        Raises:
+            LeaseHeldError: If another worker holds it
+        """
+        owner = f"{socket.gethostname()}:{os.getpid()}"
+        lease = TaskLeaseRepository.acquire(video_id, stage, owner, ttl_seconds)
+        if lease is None:
+            held = TaskLeaseRepository.get_lease(video_id, stage)
+            raise LeaseHeldError(video_id, stage, held.get("expires_at") if held else None)
+        return cls(video_id, stage, lease["token"], lease.get("completed_at"), lease.get("started_at"))
+    
+    @property
+    def finished(self) -> bool:
+        """
+        Whether the stage already ran under an earlier lease.
+        
+        A stage that was started but never released (e.g. the worker died,
+        or lost MongoDB, between sending the email and recording it) counts
+        as finished: it may have taken effect, and repeating it is worse
+        than missing it.
+        """
+        return bool(self.completed_at or self.started_at)
+    
+    def mark_started(self) -> None:
+        """
+        Record that the stage's side effect is about to run, before running it.
+        
+        Raises:
+            StaleLeaseError: If the lease was taken over, so the side effect must not run
+        """
+        if not TaskLeaseRepository.mark_started(self.video_id, self.stage, self.token):
+            raise StaleLeaseError(f"Lease on {self.stage} of video ID {self.video_id} was taken over")
+        self.started_at = datetime.now()
+    
+    def release(self, completed: bool = False) -> None:
+        """
+        Give the lease up (once; later calls do nothing).
+        
+        Args:
+            completed: Record that the stage finished, for stages whose
+                output is not stored (the notification email). Without it,
+                a mark_started is withdrawn so the stage can run again.
+        """
+        if self._released:
+            return
+        self._released = True
+        try:
+            if not TaskLeaseRepository.release(self.video_id, self.stage, self.token, completed):
+                logger.warning(f"Lease on {self.stage} of video ID {self.video_id} was taken over before release")
+        except PyMongoError as e:
+            # Called while unwinding from errors; the lease expires on its own
+            logger.warning(f"Could not release lease on {self.stage} of video ID {self.video_id}: {str(e)}")
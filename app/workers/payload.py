@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+from app.models.video import Video
+
+# Video fields carried through the pipeline (enough for Video.from_dict)
+PAYLOAD_VIDEO_FIELDS = ("video_id", "title", "channel_id", "channel_title", "published_at", "description")
+
+# Leading transcript characters the summary prompt uses; the payload carries no more
+SUMMARY_TRANSCRIPT_CHARS = 4000
+
+
+def new_payload(video_id: str, regenerate: bool = False) -> Dict[str, Any]:
+    """
+    Create the payload a pipeline starts with.
+    
+    Each stage adds what it produced and passes the payload on:
+        video           - video fields (pack_video), from the transcript stage
+        transcript_text - first SUMMARY_TRANSCRIPT_CHARS characters of the
+                          transcript, consumed by the summary stage
+        summary         - {"summary_text", "key_points", "key_point_times"}
+        post            - {"title", "content"}
+        halted          - reason the pipeline stopped early, if it did
+    
+    Args:
+        video_id: YouTube video ID
+        regenerate: Recreate outputs that already exist instead of reusing them
+    """
+    return {"video_id": video_id, "regenerate": regenerate}
+
+
+def as_payload(value: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Accept a bare video ID (a stage called on its own) or a previous stage's payload."""
+    if isinstance(value, str):
+        return new_payload(value)
+    return value
+
+
+def halt(payload: Dict[str, Any], reason: str) -> Dict[str, Any]:
+    """Mark the payload so the remaining stages pass it through untouched."""
+    payload["halted"] = reason
+    return payload
+
+
+def pack_video(video_data: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe copy of the video fields the later stages need."""
+    video = {field: video_data.get(field) for field in PAYLOAD_VIDEO_FIELDS}
+    if isinstance(video["published_at"], datetime):
+        video["published_at"] = video["published_at"].isoformat()
+    return video
+
+
+def unpack_video(video: Optional[Dict[str, Any]]) -> Optional[Video]:
+    """Rebuild the Video carried in a payload."""
+    if not video:
+        return None
+    data = dict(video)
+    if isinstance(data["published_at"], str):
+        data["published_at"] = datetime.fromisoformat(data["published_at"])
+    return Video.from_dict(data)
@@ -0,0 +1,111 @@
+import logging
+
+from celery import chain
+from celery.result import AsyncResult
+
+from app.workers.celery_app import BACKFILL_STAGE_QUEUES
+from app.workers.payload import new_payload
+from app.workers.tasks.transcript import extract_transcript
+from app.workers.tasks.summarize import generate_summary
+from app.workers.tasks.linkedin_post import generate_linkedin_post
+from app.workers.tasks.email import send_post_notification
+
+logger = logging.getLogger(__name__)
+
+# Processing stages of a video, in order
+STAGES = ("transcript", "summary", "post", "email")
+
+STAGE_TASKS = {
+    "transcript": extract_transcript,
+    "summary": generate_summary,
+    "post": generate_linkedin_post,
+    "email": send_post_notification
+}
+
+
+def build_pipeline(
+    video_id: str,
+    start: str = "transcript",
+    end: str = "email",
+    regenerate: bool = False,
+    backfill: bool = False
+) -> chain:
+    """
+    Build the chain of stage tasks for a video.
+    
+    Each stage receives the payload returned by the previous one (see
+    app.workers.payload), so it does not re-read what that stage just
+    wrote. A stage that cannot continue halts the payload and the rest of
+    the chain passes it through.
+    
+    Args:
+        video_id: YouTube video ID
+        start: First stage to run
+        end: Last stage to run
+        regenerate: Recreate outputs that already exist, e.g. start="summary"
+            to rewrite the summary and post of a video
+        backfill: Run every stage on its backfill queue (BACKFILL_STAGE_QUEUES);
+            retries stay on the queue their task came from
+    
+    Returns:
+        Celery chain; call apply_async() to run it
+    
+    Raises:
+        ValueError: For an unknown stage or an end before the start
+    """
+    for stage in (start, end):
+        if stage not in STAGE_TASKS:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+    stages = STAGES[STAGES.index(start):STAGES.index(end) + 1]
+    if not stages:
+        raise ValueError(f"Pipeline stage {end} comes before {start}")
+    
+    first, *rest = stages
+    signatures = [STAGE_TASKS[first].s(new_payload(video_id, regenerate))]
+    signatures += [STAGE_TASKS[stage].s() for stage in rest]
+    if backfill:
+        for stage, signature in zip(stages, signatures):
+            signature.set(queue=BACKFILL_STAGE_QUEUES[stage])
+    return chain(*signatures)
+
+
+def start_pipeline(
+    video_id: str,
+    start: str = "transcript",
+    end: str = "email",
+    regenerate: bool = False,
+    backfill: bool = False,
+    **options
+) -> AsyncResult:
+    """
+    Run the pipeline (or the stages from start to end) for a video.
+    
+    Args:
+        video_id: YouTube video ID
+        start: First stage to run
+        end: Last stage to run
+        regenerate: Recreate outputs that already exist
+        backfill: Run on the backfill stage queues
+        **options: Passed to apply_async (e.g. producer)
+    
+    Returns:
+        Result of the last stage
+    """
+    logger.info(f"Starting pipeline {start} -> {end} for video ID: {video_id}")
+    return build_pipeline(video_id, start, end, regenerate, backfill).apply_async(**options)
+
+
+if __name__ == "__main__":
+    # Rerun part of the pipeline: python -m app.workers.pipeline VIDEO_ID --start summary --regenerate
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Start the processing pipeline for a video")
+    parser.add_argument("video_id", help="YouTube video ID")
+    parser.add_argument("--start", choices=STAGES, default="transcript", help="First stage to run")
+    parser.add_argument("--end", choices=STAGES, default="email", help="Last stage to run")
+    parser.add_argument("--regenerate", action="store_true", help="Recreate outputs that already exist")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    result = start_pipeline(args.video_id, args.start, args.end, args.regenerate)
+    print(f"Started pipeline {args.start} -> {args.end} for {args.video_id}: {result.id}")
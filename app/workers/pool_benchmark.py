@@ -0,0 +1,182 @@
+"""
+Memory cost of keeping I/O-bound tasks in flight, per worker pool type.
+
+Each run holds `concurrency` simulated LLM calls in flight against a local
+HTTP server that answers after a fixed latency, the way generate_summary
+waits on the OpenAI API. The pipeline task modules are imported first so
+every process carries a real worker's footprint. Memory is the summed PSS
+of the worker processes (Linux /proc), so pages shared after fork are
+counted once.
+    
+    python -m app.workers.pool_benchmark --pools prefork,gevent --concurrency 8,100
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Modules a pipeline worker imports (AI client, PyMongo, Celery app)
+WORKER_MODULES = ("app.workers.pipeline",)
+
+
+def _serve(port: int, latency: float) -> None:
+    """Stand-in for the LLM API: answers every POST after `latency` seconds."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = json.dumps({"choices": [{"message": {"content": "Summary: ok"}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    class Server(ThreadingHTTPServer):
+        # Set on the class: the constructor already listens with this backlog
+        daemon_threads = True
+        request_queue_size = 1024
+    
+    Server(("127.0.0.1", port), Handler).serve_forever()
+
+
+def _pss_mb(pids: List[int]) -> float:
+    """Summed proportional set size of processes, in MB."""
+    total_kb = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            for line in smaps:
+                if line.startswith("Pss:"):
+                    total_kb += int(line.split()[1])
+    return total_kb / 1024
+
+
+def _call(url: str) -> None:
+    # Imported on use so green pools patch ssl/socket before requests loads them
+    import requests
+    requests.post(url, json={"messages": [{"role": "user", "content": "x" * 4000}]}, timeout=60).raise_for_status()
+
+
+def _run_pool(pool: str, concurrency: int, tasks: int, url: str) -> Dict:
+    """Run `tasks` calls with `concurrency` in flight (in a fresh process per pool)."""
+    if pool == "gevent":
+        # Patch first, as `celery worker -P gevent` does
+        from gevent import monkey
+        monkey.patch_all()
+    elif pool == "eventlet":
+        import eventlet
+        eventlet.monkey_patch()
+    
+    import importlib
+    import threading
+    for module in WORKER_MODULES:
+        importlib.import_module(module)
+    
+    pids = [os.getpid()]
+    samples = [0.0]
+    stop = threading.Event()
+    
+    def sample():
+        # A thread, or a greenlet once patched
+        while not stop.is_set():
+            try:
+                samples.append(_pss_mb(pids))
+            except FileNotFoundError:
+                pass
+            stop.wait(0.1)
+    
+    started = time.perf_counter()
+    if pool == "prefork":
+        # One task at a time per child process, like the prefork pool
+        for index in range(concurrency):
+            pid = os.fork()
+            if pid == 0:
+                for _ in range(tasks // concurrency + (index < tasks % concurrency)):
+                    _call(url)
+                os._exit(0)
+            pids.append(pid)
+        threading.Thread(target=sample, daemon=True).start()
+        failed = sum(os.waitpid(pid, 0)[1] != 0 for pid in pids[1:])
+        if failed:
+            raise RuntimeError(f"{failed} child processes failed")
+    else:
+        threading.Thread(target=sample, daemon=True).start()
+        urls = [url] * tasks
+        if pool == "gevent":
+            from gevent.pool import Pool
+            Pool(concurrency).map(_call, urls)
+        elif pool == "eventlet":
+            from eventlet import GreenPool
+            list(GreenPool(concurrency).imap(_call, urls))
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(concurrency) as executor:
+                list(executor.map(_call, urls))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    
+    peak_mb = max(samples)
+    return {
+        "pool": pool,
+        "concurrency": concurrency,
+        "tasks": tasks,
+        "seconds": round(elapsed, 2),
+        "tasks_per_second": round(tasks / elapsed, 1),
+        "peak_pss_mb": round(peak_mb, 1),
+        "in_flight_per_gb": round(concurrency / (peak_mb / 1024), 1) if peak_mb else None
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare worker pools for I/O-bound tasks")
+    parser.add_argument("--pools", default="prefork,gevent", help="Comma-separated: prefork, threads, gevent, eventlet")
+    parser.add_argument("--concurrency", default="8,100", help="Tasks in flight, one value per pool or one for all")
+    parser.add_argument("--tasks-per-slot", type=int, default=5, help="Calls per unit of concurrency")
+    parser.add_argument("--latency", type=float, default=2.0, help="Seconds the stand-in API takes to answer")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    url = f"http://127.0.0.1:{args.port}/v1/chat/completions"
+    
+    if args.serve:
+        _serve(args.port, args.latency)
+        return
+    if args.run:
+        pool, concurrency = args.run.split(":")
+        concurrency = int(concurrency)
+        print(json.dumps(_run_pool(pool, concurrency, concurrency * args.tasks_per_slot, url)))
+        return
+    
+    pools = args.pools.split(",")
+    levels = [int(value) for value in args.concurrency.split(",")]
+    levels = levels * len(pools) if len(levels) == 1 else levels
+    
+    server = subprocess.Popen([sys.executable, "-m", __spec__.name, "--serve",
+                               "--port", str(args.port), "--latency", str(args.latency)])
+    try:
+        time.sleep(1)
+        print(f"{'pool':<10}{'in flight':>10}{'tasks/s':>10}{'PSS MB':>10}{'in flight/GB':>14}")
+        for pool, concurrency in zip(pools, levels):
+            output = subprocess.run(
+                [sys.executable, "-m", __spec__.name, "--run", f"{pool}:{concurrency}",
+                 "--port", str(args.port), "--tasks-per-slot", str(args.tasks_per_slot)],
+                check=True, stdout=subprocess.PIPE, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{pool:<10}{concurrency:>10}{result['tasks_per_second']:>10}"
+                  f"{result['peak_pss_mb']:>10}{result['in_flight_per_gb']:>14}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
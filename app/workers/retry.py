@@ -0,0 +1,205 @@
+import logging
+import random
+import smtplib
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import openai
+from celery.exceptions import Ignore
+from pymongo.errors import AutoReconnect, ConnectionFailure, ExecutionTimeout, PyMongoError, WTimeoutError
+from youtube_transcript_api import CouldNotRetrieveTranscript, TooManyRequests, YouTubeRequestFailed
+
+from app.core.database import VideoRepository
+from app.workers.lease import LeaseHeldError
+from app.workers.payload import halt
+from config.config import TASK_RETRY_BASE_SECONDS, TASK_RETRY_MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; other 4xx mean the request itself is wrong
+RETRYABLE_HTTP_STATUSES = {408, 409, 429}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Decide whether a failed stage may succeed if run again.
+    
+    Rate limits, timeouts, dropped connections and server-side errors are
+    retryable. Errors that will fail the same way every time (bad
+    credentials, an invalid request, an unavailable video, a rejected
+    recipient) are fatal. Exceptions outside the known families keep the
+    previous behaviour and are retried.
+    """
+    if isinstance(exc, openai.APIConnectionError):
+        # Includes APITimeoutError
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        if getattr(exc, "code", None) == "insufficient_quota":
+            # Reported as a 429, but only billing clears it
+            return False
+        return exc.status_code in RETRYABLE_HTTP_STATUSES or exc.status_code >= 500
+    if isinstance(exc, openai.APIError):
+        return False
+    
+    if isinstance(exc, (TooManyRequests, YouTubeRequestFailed)):
+        return True
+    if isinstance(exc, CouldNotRetrieveTranscript):
+        # Unavailable or invalid video, transcripts disabled, bad cookies
+        return False
+    
+    if isinstance(exc, (AutoReconnect, ConnectionFailure, ExecutionTimeout, WTimeoutError)):
+        return True
+    if isinstance(exc, PyMongoError):
+        return exc.has_error_label("RetryableWriteError") or exc.has_error_label("TransientTransactionError")
+    
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        # 4xx replies are temporary (e.g. 421 busy, 454 auth unavailable)
+        return 400 <= exc.smtp_code < 500 or exc.smtp_code < 0
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPException):
+        return False
+    
+    # Network errors (resets, DNS, socket timeouts) and anything unknown
+    return True
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Seconds the server asked to wait before retrying, if it said.
+    
+    Read from the Retry-After (or retry-after-ms) header of the HTTP
+    response an exception carries, e.g. an OpenAI rate limit.
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+    except ValueError:
+        pass
+    
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(retries: int, hint: Optional[float] = None) -> float:
+    """
+    Countdown before the next attempt.
+    
+    Doubles from TASK_RETRY_BASE_SECONDS up to TASK_RETRY_MAX_SECONDS, with
+    half of it randomized so tasks that failed together do not all retry
+    at the same moment. A Retry-After hint is a lower bound.
+    
+    Args:
+        retries: Retries already made (task.request.retries)
+        hint: Seconds the server asked to wait, if any
+    """
+    ceiling = min(TASK_RETRY_MAX_SECONDS, TASK_RETRY_BASE_SECONDS * 2 ** retries)
+    delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+    if hint is not None:
+        delay = max(delay, hint)
+    return delay
+
+
+def retry_or_fail(task, exc: Exception, video_id: str, stage: str) -> Exception:
+    """
+    Schedule a retry of a failed stage, or give up on it.
+    
+    Retryable errors are retried after backoff_delay() until the task's
+    max_retries is used up; fatal errors fail the task at once instead of
+    holding a worker slot for retries that cannot succeed. Either way the
+    attempt is recorded on the video (retry_counts, last_error).
+    
+    Usage, in a bound task:
+        except Exception as e:
+            raise retry_or_fail(self, e, video_id, "summary")
+    
+    Args:
+        task: The bound Celery task
+        exc: The error the stage failed with
+        video_id: YouTube video ID
+        stage: Pipeline stage name (see app.workers.pipeline.STAGES)
+    
+    Returns:
+        The exception to raise: celery's Retry, or exc itself
+    """
+    retries = task.request.retries
+    retryable = is_retryable(exc)
+    retrying = retryable and (task.max_retries is None or retries < task.max_retries)
+    
+    try:
+        VideoRepository.record_task_error(video_id, stage, f"{type(exc).__name__}: {exc}", retrying)
+    except PyMongoError as e:
+        # The database may be why the stage failed; never mask the original error
+        logger.warning(f"Could not record {stage} error for video ID: {video_id}. Error: {str(e)}")
+    
+    if not retrying:
+        reason = "retries exhausted" if retryable else "fatal error"
+        logger.error(f"Giving up on {stage} for video ID: {video_id} ({reason})")
+        return exc
+    
+    countdown = backoff_delay(retries, retry_after(exc))
+    logger.warning(f"Retrying {stage} for video ID: {video_id} in {countdown:.0f}s "
+                   f"(retry {retries + 1} of {task.max_retries})")
+    return task.retry(exc=exc, countdown=countdown, throw=False)
+
+
+def skip_duplicate(task, exc: LeaseHeldError, payload: Dict[str, Any], stage: str) -> Dict[str, Any]:
+    """
+    Handle a delivery of a stage whose lease another worker holds.
+    
+    A duplicate (the stage queued twice) returns at once with the payload
+    halted: the lease holder does the work and carries the pipeline on.
+    It is not a failure, so no retry is used up and no error is recorded.
+    
+    The exception is a message the broker redelivered because the worker
+    running it was lost: that worker died holding the lease, and nobody
+    else will finish the stage. It is sent again, as the same attempt
+    (request.retries unchanged) and with the rest of its chain, to run
+    once the lease expires and can be taken over.
+    
+    Usage, in a bound task:
+        except LeaseHeldError as e:
+            return skip_duplicate(self, e, payload, "summary")
+    
+    Args:
+        task: The bound Celery task
+        exc: The LeaseHeldError from StageLease.acquire
+        payload: The stage's payload
+        stage: Pipeline stage name
+    
+    Returns:
+        The halted payload
+    
+    Raises:
+        Ignore: After sending a redelivered stage again, to end this run
+            without passing anything down the chain
+    """
+    video_id = payload["video_id"]
+    delivery_info = task.request.delivery_info or {}
+    if not delivery_info.get("redelivered"):
+        logger.info(f"Skipping duplicate delivery of {stage} for video ID: {video_id} ({exc})")
+        return halt(payload, "duplicate delivery")
+    
+    countdown = exc.retry_after
+    logger.warning(f"{stage} for video ID: {video_id} was redelivered while leased; "
+                   f"running it again in {countdown:.0f}s, when the lease expires")
+    task.signature_from_request(countdown=countdown).apply_async()
+    raise Ignore()
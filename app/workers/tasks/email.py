@@ -2,12 +2,21 @@ import logging
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Dict, Optional, List
+from typing import Any, Dict, Union
 
 from app.workers.celery_app import app
 from app.models.video import Video
 from app.models.linkedin_post import LinkedInPost
-from app.core.database import VideoRepository, LinkedInPostRepository
+from app.core.database import (
+    VideoRepository,
+    LinkedInPostRepository,
+    StaleLeaseError,
+    POST_CONTENT_FIELDS,
+    VIDEO_HEADER_FIELDS
+)
+from app.workers.lease import LeaseHeldError, StageLease
+from app.workers.payload import as_payload, pack_video, unpack_video
+from app.workers.retry import is_retryable, retry_or_fail, skip_duplicate
 from config.config import (
     EMAIL_HOST,
     EMAIL_PORT,
@@ -15,42 +24,69 @@ from config.config import (
     EMAIL_HOST_PASSWORD,
     EMAIL_USE_TLS,
     EMAIL_RECIPIENT,
+    EMAIL_TIMEOUT_SECONDS,
+    TASK_MAX_RETRIES,
     WEB_UI_BASE_URL
 )
 
 logger = logging.getLogger(__name__)
 
-@app.task(bind=True, max_retries=3)
-def send_post_notification(self, video_id: str) -> bool:
+@app.task(bind=True, max_retries=TASK_MAX_RETRIES)
+def send_post_notification(self, payload: Union[str, Dict[str, Any]]) -> bool:
     """
     Send notification email with LinkedIn post draft.
     
+    Last stage of the pipeline: uses the video and post passed on by the
+    earlier stages, reading them only when called on its own. A video is
+    notified at most once: the lease records that the email is being sent
+    before handing it to the SMTP server, so a duplicate delivery does
+    not send it again (unless the payload asks to regenerate), even if
+    the worker died before recording that it was sent.
+    
     Args:
-        video_id: YouTube video ID
+        payload: YouTube video ID, or the payload of a pipeline
         
     Returns:
         True if email sent successfully, False otherwise
     """
+    payload = as_payload(payload)
+    if payload.get("halted"):
+        logger.info(f"Pipeline for video ID {payload['video_id']} stopped early: {payload['halted']}")
+        return False
+    video_id = payload["video_id"]
     logger.info(f"Sending LinkedIn post notification for video ID: {video_id}")
     
+    lease = None
     try:
+        # The email is not stored, so the lease also records that it was sent
+        lease = StageLease.acquire(video_id, "email")
+        if lease.finished and not payload.get("regenerate"):
+            logger.info(f"LinkedIn post notification already sent for video ID: {video_id}")
+            return True
+        
         # Get video data
-        video_data = VideoRepository.get_video(video_id)
-        if not video_data:
-            logger.error(f"Video not found for video ID: {video_id}")
-            return False
+        video_data = payload.get("video")
+        if video_data is None:
+            video_data = VideoRepository.get_video(video_id, projection=VIDEO_HEADER_FIELDS)
+            if not video_data:
+                logger.error(f"Video not found for video ID: {video_id}")
+                return False
+            video_data = pack_video(video_data)
         
         # Get LinkedIn post data
-        post_data = LinkedInPostRepository.get_post(video_id)
-        if not post_data:
-            logger.error(f"LinkedIn post not found for video ID: {video_id}")
-            return False
+        post_data = payload.get("post")
+        if post_data is None:
+            post_data = LinkedInPostRepository.get_post(video_id, projection=POST_CONTENT_FIELDS)
+            if not post_data:
+                logger.error(f"LinkedIn post not found for video ID: {video_id}")
+                return False
         
         # Create objects
-        video = Video.from_dict(video_data)
-        post = LinkedInPost.from_dict(post_data)
+        video = unpack_video(video_data)
+        post = LinkedInPost(video_id=video_id, content=post_data.get("content", ""), title=post_data.get("title"))
         
-        # Send email
+        # Send email; a failed send withdraws the mark when the lease is released
+        lease.mark_started()
         result = _send_email(
             recipient=EMAIL_RECIPIENT,
             subject=f"LinkedIn Post Draft for: {video.title}",
@@ -58,16 +94,27 @@ def send_post_notification(self, video_id: str) -> bool:
         )
         
         if result:
+            # Never raises: if recording fails, the mark above still stops a resend
+            lease.release(completed=True)
             logger.info(f"LinkedIn post notification sent for video ID: {video_id}")
         else:
             logger.error(f"Failed to send LinkedIn post notification for video ID: {video_id}")
         
         return result
         
+    except LeaseHeldError as e:
+        skip_duplicate(self, e, payload, "email")
+        return False
+    except StaleLeaseError as e:
+        # Our lease expired and a newer run of the stage sends the email
+        logger.warning(f"LinkedIn post notification for video ID {video_id} was superseded: {str(e)}")
+        return False
     except Exception as e:
         logger.error(f"Error sending post notification for video ID: {video_id}. Error: {str(e)}")
-        self.retry(exc=e, countdown=60 * 5)  # Retry after 5 minutes
-        return False
+        raise retry_or_fail(self, e, video_id, "email")
+    finally:
+        if lease:
+            lease.release()
 
 def _generate_email_content(video: Video, post: LinkedInPost) -> str:
     """
@@ -142,7 +189,10 @@ def _send_email(recipient: str, subject: str, html_content: str) -> bool:
         html_content: HTML email content
         
     Returns:
-        True if successful, False otherwise
+        True if successful, False if the server refused it for good
+    
+    Raises:
+        Temporary SMTP and network errors, for the task to retry
     """
     # Create message container
     msg = MIMEMultipart('alternative')
@@ -157,10 +207,10 @@ def _send_email(recipient: str, subject: str, html_content: str) -> bool:
     try:
         # Create SMTP server connection
         if EMAIL_USE_TLS:
-            server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT)
+            server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT, timeout=EMAIL_TIMEOUT_SECONDS)
             server.starttls()
         else:
-            server = smtplib.SMTP_SSL(EMAIL_HOST, EMAIL_PORT)
+            server = smtplib.SMTP_SSL(EMAIL_HOST, EMAIL_PORT, timeout=EMAIL_TIMEOUT_SECONDS)
         
         # Login to server
         server.login(EMAIL_HOST_USER, EMAIL_HOST_PASSWORD)
@@ -168,12 +218,17 @@ def _send_email(recipient: str, subject: str, html_content: str) -> bool:
         # Send email
         server.sendmail(EMAIL_HOST_USER, recipient, msg.as_string())
         
-        # Close connection
-        server.quit()
+        # Close connection; the message is already accepted, so a failure here is not a failed send
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError) as e:
+            logger.warning(f"Failed to close SMTP connection: {str(e)}")
         
         logger.info(f"Email sent successfully to {recipient}")
         return True
         
     except Exception as e:
         logger.error(f"Failed to send email: {str(e)}")
+        if isinstance(e, OSError) and is_retryable(e):
+            raise
         return False 
\ No newline at end of file
@@ -1,67 +1,87 @@
 import logging
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from openai import OpenAI
 
 from app.workers.celery_app import app
 from app.models.linkedin_post import LinkedInPost
-from app.models.video import Video
 from app.core.database import (
     VideoRepository, 
     SummaryRepository, 
-    LinkedInPostRepository
+    LinkedInPostRepository,
+    StaleLeaseError,
+    POST_CONTENT_FIELDS,
+    SUMMARY_CONTENT_FIELDS,
+    VIDEO_PIPELINE_FIELDS
 )
+from app.workers.lease import LeaseHeldError, StageLease
+from app.workers.payload import as_payload, halt, pack_video, unpack_video
+from app.workers.retry import retry_or_fail, skip_duplicate
 from config.config import (
     AI_API_KEY, 
     AI_MODEL_NAME, 
-    AI_MODEL_TYPE
+    AI_MODEL_TYPE,
+    AI_REQUEST_TIMEOUT_SECONDS,
+    TASK_MAX_RETRIES
 )
 
 logger = logging.getLogger(__name__)
 
-# Initialize AI client
+# Initialize AI client; the timeout bounds how long a call can hold a worker slot
 if AI_MODEL_TYPE == 'openai':
-    ai_client = OpenAI(api_key=AI_API_KEY)
+    ai_client = OpenAI(api_key=AI_API_KEY, timeout=AI_REQUEST_TIMEOUT_SECONDS)
 
-@app.task(bind=True, max_retries=3)
-def generate_linkedin_post(self, video_id: str) -> Optional[str]:
+@app.task(bind=True, max_retries=TASK_MAX_RETRIES)
+def generate_linkedin_post(self, payload: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
     """
     Generate LinkedIn post draft from video summary.
     
+    Uses the video and summary passed on by the earlier stages, reading
+    them from the database only when the pipeline starts here.
+    
     Args:
-        video_id: YouTube video ID
+        payload: YouTube video ID, or the payload of a pipeline
         
     Returns:
-        LinkedIn post ID if successful, None otherwise
+        Payload with post, or halted
     """
+    payload = as_payload(payload)
+    if payload.get("halted"):
+        return payload
+    video_id = payload["video_id"]
     logger.info(f"Generating LinkedIn post for video ID: {video_id}")
     
+    lease = None
     try:
+        # One worker at a time per stage of a video; a duplicate delivery is skipped
+        lease = StageLease.acquire(video_id, "post")
+        
         # Check if video exists
-        video_data = VideoRepository.get_video(video_id)
-        if not video_data:
-            logger.error(f"Video not found for video ID: {video_id}")
-            return None
+        if payload.get("video") is None:
+            video_data = VideoRepository.get_video(video_id, projection=VIDEO_PIPELINE_FIELDS)
+            if not video_data:
+                logger.error(f"Video not found for video ID: {video_id}")
+                return halt(payload, "video not found")
+            payload["video"] = pack_video(video_data)
+        
+        # Check if post already exists
+        if not payload.get("regenerate"):
+            existing_post = LinkedInPostRepository.get_post(video_id, projection=POST_CONTENT_FIELDS)
+            if existing_post:
+                logger.info(f"LinkedIn post already exists for video ID: {video_id}")
+                payload["post"] = _post_payload(existing_post)
+                return payload
         
         # Check if summary exists
-        summary_data = SummaryRepository.get_summary(video_id)
+        summary_data = payload.get("summary")
+        if summary_data is None:
+            summary_data = SummaryRepository.get_summary(video_id, projection=SUMMARY_CONTENT_FIELDS)
         if not summary_data:
             logger.warning(f"Summary not found for video ID: {video_id}")
             # We'll try to generate a post anyway, but it won't be as good
         
-        # Check if post already exists
-        existing_post = LinkedInPostRepository.get_post(video_id)
-        if existing_post:
-            logger.info(f"LinkedIn post already exists for video ID: {video_id}")
-            
-            # Trigger email notification
-            from app.workers.tasks.email import send_post_notification
-            send_post_notification.delay(video_id)
-            
-            return str(existing_post.get("_id"))
-        
         # Create Video object
-        video = Video.from_dict(video_data)
+        video = unpack_video(payload["video"])
         
         # Generate LinkedIn post content
         post_content, post_title = _generate_linkedin_post_content(
@@ -69,7 +89,11 @@ def generate_linkedin_post(self, video_id: str) -> Optional[str]:
             video_title=video.title,
             video_description=video.description or "",
             summary=summary_data.get("summary_text", "") if summary_data else "",
-            key_points=summary_data.get("key_points", []) if summary_data else []
+            key_points=_link_key_points(
+                video_id,
+                summary_data.get("key_points", []) if summary_data else [],
+                summary_data.get("key_point_times") if summary_data else None
+            )
         )
         
         # Generate video URL
@@ -85,20 +109,56 @@ def generate_linkedin_post(self, video_id: str) -> Optional[str]:
         )
         
         # Save LinkedIn post to database
-        post_id = LinkedInPostRepository.save_post(linkedin_post.to_dict())
+        LinkedInPostRepository.save_post(linkedin_post.to_dict(), fence_token=lease.token)
         
         logger.info(f"LinkedIn post generated and saved for video ID: {video_id}")
         
-        # Trigger email notification
-        from app.workers.tasks.email import send_post_notification
-        send_post_notification.delay(video_id)
-        
-        return post_id
+        payload["post"] = _post_payload(linkedin_post.to_dict())
+        return payload
         
+    except LeaseHeldError as e:
+        return skip_duplicate(self, e, payload, "post")
+    except StaleLeaseError as e:
+        # Our lease expired and a newer run of the stage owns the result
+        logger.warning(f"LinkedIn post generation for video ID {video_id} was superseded: {str(e)}")
+        return halt(payload, "superseded")
     except Exception as e:
         logger.error(f"Error generating LinkedIn post for video ID: {video_id}. Error: {str(e)}")
-        self.retry(exc=e, countdown=60 * 5)  # Retry after 5 minutes
-        return None
+        raise retry_or_fail(self, e, video_id, "post")
+    finally:
+        if lease:
+            lease.release()
+
+def _post_payload(post_data: Dict) -> Dict[str, Any]:
+    """Post fields passed on to the notification stage."""
+    return {"title": post_data.get("title"), "content": post_data.get("content", "")}
+
+def _link_key_points(
+    video_id: str,
+    key_points: List[str],
+    key_point_times: Optional[List[Optional[float]]]
+) -> List[str]:
+    """
+    Append a link to the moment of the video each key point is quoted from.
+    
+    Args:
+        video_id: YouTube video ID
+        key_points: Key points from the video
+        key_point_times: Start time per key point (None where unknown), if located
+        
+    Returns:
+        Key points, with a &t= deep link where the time is known
+    """
+    if not key_point_times:
+        return key_points
+    
+    linked = []
+    for point, seconds in zip(key_points, key_point_times):
+        if seconds is None:
+            linked.append(point)
+        else:
+            linked.append(f"{point} (https://www.youtube.com/watch?v={video_id}&t={int(seconds)}s)")
+    return linked
 
 def _generate_linkedin_post_content(
     video_id: str,
@@ -149,6 +209,9 @@ def _generate_openai_linkedin_post(
         
     Returns:
         Tuple of (post_content, post_title)
+    
+    Raises:
+        Any error from the API, for the task to retry or fail
     """
     # Combine available data
     key_points_text = "\n".join([f"- {point}" for point in key_points])
@@ -176,6 +239,7 @@ def _generate_openai_linkedin_post(
        - Uses professional language suitable for LinkedIn
        - Includes 2-3 relevant hashtags at the end
        - Includes the video link
+       - Keeps the timestamped links given with key points next to the insights they support
        - Has an engaging call-to-action
     
     Format your response with the Title on the first line, followed by the LinkedIn post content.
@@ -215,10 +279,9 @@ def _generate_openai_linkedin_post(
         return post_content, post_title
         
     except Exception as e:
+        # The task retries or fails the stage (retry_or_fail) rather than posting the template
         logger.error(f"Error calling OpenAI API for LinkedIn post: {str(e)}")
-        return _generate_template_linkedin_post(
-            video_id, video_title, video_description, summary, key_points
-        )
+        raise
 
 def _generate_template_linkedin_post(
     video_id: str,
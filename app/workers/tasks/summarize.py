@@ -1,88 +1,156 @@
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import openai
 from openai import OpenAI
 
 from app.workers.celery_app import app
 from app.models.summary import Summary
-from app.models.transcript import Transcript
-from app.core.database import TranscriptRepository, SummaryRepository
-from config.config import AI_API_KEY, AI_MODEL_NAME, AI_MODEL_TYPE
+from app.models.transcript import LazyTranscript
+from app.core.database import (
+    TranscriptRepository,
+    SummaryRepository,
+    StaleLeaseError,
+    SUMMARY_CONTENT_FIELDS,
+    TRANSCRIPT_INDEX_FIELDS
+)
+from app.workers.lease import LeaseHeldError, StageLease
+from app.workers.payload import SUMMARY_TRANSCRIPT_CHARS, as_payload, halt
+from app.workers.retry import retry_or_fail, skip_duplicate
+from config.config import AI_API_KEY, AI_MODEL_NAME, AI_MODEL_TYPE, AI_REQUEST_TIMEOUT_SECONDS, TASK_MAX_RETRIES
 
 logger = logging.getLogger(__name__)
 
-# Initialize AI client
+# Initialize AI client; the timeout bounds how long a call can hold a worker slot
 if AI_MODEL_TYPE == 'openai':
-    ai_client = OpenAI(api_key=AI_API_KEY)
+    ai_client = OpenAI(api_key=AI_API_KEY, timeout=AI_REQUEST_TIMEOUT_SECONDS)
 
-@app.task(bind=True, max_retries=3)
-def generate_summary(self, video_id: str) -> Optional[str]:
+@app.task(bind=True, max_retries=TASK_MAX_RETRIES)
+def generate_summary(self, payload: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
     """
     Generate summary of video transcript.
     
+    Uses the transcript text passed on by the transcript stage, reading
+    it from the database only when the pipeline starts here.
+    
     Args:
-        video_id: YouTube video ID
+        payload: YouTube video ID, or the payload of a pipeline
         
     Returns:
-        Summary ID if successful, None otherwise
+        Payload with summary (transcript_text is dropped), or halted
     """
+    payload = as_payload(payload)
+    if payload.get("halted"):
+        return payload
+    video_id = payload["video_id"]
     logger.info(f"Generating summary for video ID: {video_id}")
     
+    lease = None
     try:
-        # Check if transcript exists
-        transcript_data = TranscriptRepository.get_transcript(video_id)
-        if not transcript_data:
-            logger.error(f"Transcript not found for video ID: {video_id}")
-            return None
+        # Held until the summary is saved, so a duplicate delivery cannot pay
+        # for a second LLM call
+        lease = StageLease.acquire(video_id, "summary")
         
         # Check if summary already exists
-        existing_summary = SummaryRepository.get_summary(video_id)
-        if existing_summary:
-            logger.info(f"Summary already exists for video ID: {video_id}")
+        if not payload.get("regenerate"):
+            existing_summary = SummaryRepository.get_summary(video_id, projection=SUMMARY_CONTENT_FIELDS)
+            if existing_summary:
+                logger.info(f"Summary already exists for video ID: {video_id}")
+                payload.pop("transcript_text", None)
+                payload["summary"] = _summary_payload(existing_summary)
+                return payload
+        
+        transcript = None
+        transcript_text = payload.get("transcript_text")
+        if transcript_text is None:
+            # Check if transcript exists
+            transcript_data = TranscriptRepository.get_transcript(video_id)
+            if not transcript_data:
+                logger.error(f"Transcript not found for video ID: {video_id}")
+                return halt(payload, "transcript not found")
             
-            # Trigger LinkedIn post generation
-            from app.workers.tasks.linkedin_post import generate_linkedin_post
-            generate_linkedin_post.delay(video_id)
-            
-            return str(existing_summary.get("_id"))
-        
-        # Create Transcript object from data
-        transcript = Transcript.from_dict(transcript_data)
+            # Wrap the stored transcript; only the full text is decoded
+            transcript = LazyTranscript.from_dict(transcript_data)
+            transcript_text = transcript.get_full_text()[:SUMMARY_TRANSCRIPT_CHARS]
         
         # Generate summary using AI
-        summary_text, key_points = _generate_ai_summary(transcript.get_full_text())
+        summary_text, key_points = _generate_ai_summary(transcript_text)
+        key_point_times = _locate_key_points(video_id, transcript_text, key_points, transcript)
         
         # Create Summary object
         summary = Summary(
             video_id=video_id,
             summary_text=summary_text,
             key_points=key_points,
-            model_used=AI_MODEL_NAME
+            model_used=AI_MODEL_NAME,
+            key_point_times=key_point_times
         )
         
         # Save summary to database
-        summary_id = SummaryRepository.save_summary(summary.to_dict())
+        SummaryRepository.save_summary(summary.to_dict(), fence_token=lease.token)
         
         logger.info(f"Summary generated and saved for video ID: {video_id}")
         
-        # Trigger LinkedIn post generation
-        from app.workers.tasks.linkedin_post import generate_linkedin_post
-        generate_linkedin_post.delay(video_id)
-        
-        return summary_id
-        
+        # Later stages only need the summary, not the transcript
+        payload.pop("transcript_text", None)
+        payload["summary"] = _summary_payload(summary.to_dict())
+        return payload
+        
+    except LeaseHeldError as e:
+        return skip_duplicate(self, e, payload, "summary")
+    except StaleLeaseError as e:
+        # Our lease expired and a newer run of the stage owns the result
+        logger.warning(f"Summary generation for video ID {video_id} was superseded: {str(e)}")
+        return halt(payload, "superseded")
     except Exception as e:
         logger.error(f"Error generating summary for video ID: {video_id}. Error: {str(e)}")
-        self.retry(exc=e, countdown=60 * 5)  # Retry after 5 minutes
-        return None
+        raise retry_or_fail(self, e, video_id, "summary")
+    finally:
+        if lease:
+            lease.release()
+
+def _summary_payload(summary_data: Dict) -> Dict[str, Any]:
+    """Summary fields passed on to the post stage."""
+    return {
+        "summary_text": summary_data.get("summary_text", ""),
+        "key_points": summary_data.get("key_points", []),
+        "key_point_times": summary_data.get("key_point_times")
+    }
+
+def _locate_key_points(
+    video_id: str,
+    transcript_text: str,
+    key_points: List[str],
+    transcript: Optional[LazyTranscript] = None
+) -> List[Optional[float]]:
+    """
+    Find the second of the video each key point is quoted from.
+    
+    Args:
+        video_id: YouTube video ID
+        transcript_text: Text the summary was generated from
+        key_points: Key points of the summary
+        transcript: The stored transcript, if already loaded
+        
+    Returns:
+        Start time per key point, None where it is not quoted verbatim
+    """
+    if transcript is None:
+        # The text came with the payload; only the offsets and start times are needed
+        transcript_data = TranscriptRepository.get_transcript(video_id, projection=TRANSCRIPT_INDEX_FIELDS)
+        if not transcript_data:
+            return [None] * len(key_points)
+        transcript = LazyTranscript.from_dict(transcript_data)
+    
+    offset_index = transcript.get_offset_index()
+    return [offset_index.timestamp_of(transcript_text, point) for point in key_points]
 
 def _generate_ai_summary(transcript_text: str) -> Tuple[str, List[str]]:
     """
     Generate summary and key points from transcript text using AI.
     
     Args:
-        transcript_text: Full transcript text
+        transcript_text: Transcript text; only the first SUMMARY_TRANSCRIPT_CHARS are used
         
     Returns:
         Tuple of (summary_text, key_points)
@@ -101,6 +169,9 @@ def _generate_openai_summary(transcript_text: str) -> Tuple[str, List[str]]:
         
     Returns:
         Tuple of (summary_text, key_points)
+    
+    Raises:
+        Any error from the API, for the task to retry or fail
     """
     # Prepare prompt
     prompt = f"""
@@ -109,7 +180,7 @@ def _generate_openai_summary(transcript_text: str) -> Tuple[str, List[str]]:
     2. A list of 5-7 key points or takeaways from the video
     
     Transcript:
-    {transcript_text[:4000]}  # Limit to 4000 chars to keep within token limits
+    {transcript_text[:SUMMARY_TRANSCRIPT_CHARS]}  # Limit to 4000 chars to keep within token limits
     """
     
     try:
@@ -158,5 +229,6 @@ def _generate_openai_summary(transcript_text: str) -> Tuple[str, List[str]]:
         return summary_text, key_points
         
     except Exception as e:
+        # The task retries or fails the stage (retry_or_fail); no placeholder summary is saved
         logger.error(f"Error calling OpenAI API: {str(e)}")
-        return "Failed to generate summary due to AI service error.", ["Error processing transcript"] 
\ No newline at end of file
+        raise 
\ No newline at end of file
@@ -1,41 +1,59 @@
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, Union
 
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
 
 from app.workers.celery_app import app
-from app.models.transcript import Transcript
-from app.models.video import Video
-from app.core.database import TranscriptRepository, VideoRepository
+from app.models.transcript import LazyTranscript, Transcript
+from app.core.database import TranscriptRepository, VideoRepository, StaleLeaseError, VIDEO_PIPELINE_FIELDS
+from app.workers.lease import LeaseHeldError, StageLease
+from app.workers.payload import SUMMARY_TRANSCRIPT_CHARS, as_payload, halt, pack_video
+from app.workers.retry import retry_or_fail, skip_duplicate
+from config.config import TASK_MAX_RETRIES
 
 logger = logging.getLogger(__name__)
 
-@app.task(bind=True, max_retries=3)
-def extract_transcript(self, video_id: str) -> Optional[str]:
+@app.task(bind=True, max_retries=TASK_MAX_RETRIES)
+def extract_transcript(self, payload: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
     """
     Extract transcript from a YouTube video.
     
+    First stage of the pipeline (see app.workers.pipeline): loads the
+    video once and passes it on with the part of the transcript text the
+    summary uses, so the full transcript never travels through the broker.
+    
     Args:
-        video_id: YouTube video ID
+        payload: YouTube video ID, or the payload of a pipeline
         
     Returns:
-        Transcript ID if successful, None otherwise
+        Payload with video and transcript_text (trimmed), or halted if there is none
     """
+    payload = as_payload(payload)
+    if payload.get("halted"):
+        return payload
+    video_id = payload["video_id"]
     logger.info(f"Extracting transcript for video ID: {video_id}")
     
+    lease = None
     try:
+        # One worker at a time per stage of a video; a duplicate delivery is skipped
+        lease = StageLease.acquire(video_id, "transcript")
+        
         # Check if video exists in database
-        video_data = VideoRepository.get_video(video_id)
+        video_data = VideoRepository.get_video(video_id, projection=VIDEO_PIPELINE_FIELDS)
         if not video_data:
             logger.error(f"Video not found in database: {video_id}")
-            return None
+            return halt(payload, "video not found")
+        payload["video"] = pack_video(video_data)
         
         # Check if transcript already exists
-        existing_transcript = TranscriptRepository.get_transcript(video_id)
-        if existing_transcript:
-            logger.info(f"Transcript already exists for video ID: {video_id}")
-            return str(existing_transcript.get("_id"))
+        if not payload.get("regenerate"):
+            existing_transcript = TranscriptRepository.get_transcript(video_id)
+            if existing_transcript:
+                logger.info(f"Transcript already exists for video ID: {video_id}")
+                full_text = LazyTranscript.from_dict(existing_transcript).get_full_text()
+                payload["transcript_text"] = full_text[:SUMMARY_TRANSCRIPT_CHARS]
+                return payload
         
         # Get transcript from YouTube API
         try:
@@ -47,34 +65,33 @@ def extract_transcript(self, video_id: str) -> Optional[str]:
             transcript = Transcript.from_youtube_transcript_api(video_id, transcript_data)
             
             # Save transcript to database
-            transcript_id = TranscriptRepository.save_transcript(transcript.to_dict())
+            TranscriptRepository.save_transcript(transcript.to_dict(), fence_token=lease.token)
             
             # Update video status
-            video = Video.from_dict(video_data)
-            video.processed = True
-            video.processed_at = datetime.now()
-            VideoRepository.save_video(video.to_dict())
+            VideoRepository.mark_processed(video_id)
             
             logger.info(f"Transcript extracted and saved for video ID: {video_id}")
             
-            # Trigger summarization task
-            from app.workers.tasks.summarize import generate_summary
-            generate_summary.delay(video_id)
-            
-            return transcript_id
+            payload["transcript_text"] = transcript.get_full_text()[:SUMMARY_TRANSCRIPT_CHARS]
+            return payload
             
         except (TranscriptsDisabled, NoTranscriptFound) as e:
             logger.warning(f"No transcript available for video ID: {video_id}. Error: {str(e)}")
             
             # Update video status
-            video = Video.from_dict(video_data)
-            video.processed = True
-            video.processed_at = datetime.now()
-            VideoRepository.save_video(video.to_dict())
+            VideoRepository.mark_processed(video_id)
             
-            return None
+            return halt(payload, "no transcript")
             
+    except LeaseHeldError as e:
+        return skip_duplicate(self, e, payload, "transcript")
+    except StaleLeaseError as e:
+        # Our lease expired and a newer run of the stage owns the result
+        logger.warning(f"Transcript extraction for video ID {video_id} was superseded: {str(e)}")
+        return halt(payload, "superseded")
     except Exception as e:
         logger.error(f"Error extracting transcript for video ID: {video_id}. Error: {str(e)}")
-        self.retry(exc=e, countdown=60 * 5)  # Retry after 5 minutes
-        return None 
\ No newline at end of file
+        raise retry_or_fail(self, e, video_id, "transcript")
+    finally:
+        if lease:
+            lease.release()
\ No newline at end of file
@@ -8,13 +8,43 @@ load_dotenv()
 YOUTUBE_API_KEY = os.environ.get('YOUTUBE_API_KEY')
 YOUTUBE_CHANNEL_ID = os.environ.get('YOUTUBE_CHANNEL_ID')
 CHECK_INTERVAL_MINUTES = int(os.environ.get('CHECK_INTERVAL_MINUTES', 60))
+YOUTUBE_MAX_PAGES_PER_POLL = int(os.environ.get('YOUTUBE_MAX_PAGES_PER_POLL', 10))
+MONITOR_MAX_WORKERS = int(os.environ.get('MONITOR_MAX_WORKERS', 8))
+MONITOR_CHANNEL_TIMEOUT_SECONDS = int(os.environ.get('MONITOR_CHANNEL_TIMEOUT_SECONDS', 120))
+YOUTUBE_RESPONSE_CACHE_ENABLED = os.environ.get('YOUTUBE_RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+YOUTUBE_RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('YOUTUBE_RESPONSE_CACHE_MAX_ENTRIES', 512))
+
+# Adaptive polling: per-channel intervals learned from upload cadence
+YOUTUBE_DAILY_QUOTA_BUDGET = int(os.environ.get('YOUTUBE_DAILY_QUOTA_BUDGET', 10000))
+SCHEDULER_MIN_INTERVAL_MINUTES = float(os.environ.get('SCHEDULER_MIN_INTERVAL_MINUTES', 5))
+SCHEDULER_MAX_INTERVAL_MINUTES = float(os.environ.get('SCHEDULER_MAX_INTERVAL_MINUTES', 24 * 60))
+SCHEDULER_CADENCE_HISTORY = int(os.environ.get('SCHEDULER_CADENCE_HISTORY', 20))
+
+# Pre-filtering of new videos before they are queued for processing
+VIDEO_DEFER_MINUTES = int(os.environ.get('VIDEO_DEFER_MINUTES', 15))
+VIDEO_CAPTION_GRACE_MINUTES = int(os.environ.get('VIDEO_CAPTION_GRACE_MINUTES', 60))
 
 # MongoDB Configuration
 MONGODB_URI = os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/')
 MONGODB_DB_NAME = os.environ.get('MONGODB_DB_NAME', 'youtube_linkedin_pipeline')
+MONGODB_MAX_POOL_SIZE = int(os.environ.get('MONGODB_MAX_POOL_SIZE', 20))
+MONGODB_MIN_POOL_SIZE = int(os.environ.get('MONGODB_MIN_POOL_SIZE', 0))
+MONGODB_MAX_IDLE_TIME_MS = int(os.environ.get('MONGODB_MAX_IDLE_TIME_MS', 300000))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 10000))
+MONGODB_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGODB_CONNECT_TIMEOUT_MS', 10000))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 10000))
+MONGODB_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGODB_SOCKET_TIMEOUT_MS', 30000))
 MONGODB_COLLECTION_TRANSCRIPTS = 'transcripts'
 MONGODB_COLLECTION_SUMMARIES = 'summaries'
 MONGODB_COLLECTION_POSTS = 'linkedin_posts'
+MONGODB_COLLECTION_CHANNEL_STATE = 'channel_state'
+MONGODB_COLLECTION_TASK_LEASES = 'task_leases'
+MONGODB_COLLECTION_QUOTA_USAGE = 'quota_usage'
+
+# Per-process read-through cache for repository lookups
+REPOSITORY_CACHE_ENABLED = os.environ.get('REPOSITORY_CACHE_ENABLED', 'True').lower() == 'true'
+REPOSITORY_CACHE_MAX_ENTRIES = int(os.environ.get('REPOSITORY_CACHE_MAX_ENTRIES', 1024))
+REPOSITORY_CACHE_TTL_SECONDS = float(os.environ.get('REPOSITORY_CACHE_TTL_SECONDS', 30))
 
 # RabbitMQ Configuration
 RABBITMQ_HOST = os.environ.get('RABBITMQ_HOST', 'localhost')
@@ -23,11 +53,37 @@ RABBITMQ_USER = os.environ.get('RABBITMQ_USER', 'guest')
 RABBITMQ_PASSWORD = os.environ.get('RABBITMQ_PASSWORD', 'guest')
 RABBITMQ_VHOST = os.environ.get('RABBITMQ_VHOST', '/')
 RABBITMQ_QUEUE = os.environ.get('RABBITMQ_QUEUE', 'youtube_new_videos')
+RABBITMQ_BACKFILL_QUEUE = os.environ.get('RABBITMQ_BACKFILL_QUEUE', 'youtube_backfill_videos')
+RABBITMQ_HEARTBEAT_SECONDS = int(os.environ.get('RABBITMQ_HEARTBEAT_SECONDS', 60))
+RABBITMQ_PUBLISH_TIMEOUT_SECONDS = float(os.environ.get('RABBITMQ_PUBLISH_TIMEOUT_SECONDS', 30))
+RABBITMQ_PUBLISH_BATCH_SIZE = int(os.environ.get('RABBITMQ_PUBLISH_BATCH_SIZE', 100))
+
+# Channel back catalogue ingestion (low-priority lane)
+BACKFILL_BATCH_SIZE = int(os.environ.get('BACKFILL_BATCH_SIZE', 10))
+BACKFILL_ENQUEUE_PER_MINUTE = float(os.environ.get('BACKFILL_ENQUEUE_PER_MINUTE', 30))
+BACKFILL_MAX_QUEUE_DEPTH = int(os.environ.get('BACKFILL_MAX_QUEUE_DEPTH', 100))
+BACKFILL_MAX_PIPELINE_DEPTH = int(os.environ.get('BACKFILL_MAX_PIPELINE_DEPTH', 100))
+
+# Consumer bridging the video queues into the Celery pipeline
+VIDEO_CONSUMER_PREFETCH = int(os.environ.get('VIDEO_CONSUMER_PREFETCH', 200))
+VIDEO_CONSUMER_BACKFILL_PREFETCH = int(os.environ.get('VIDEO_CONSUMER_BACKFILL_PREFETCH', 20))
+VIDEO_CONSUMER_BATCH_SIZE = int(os.environ.get('VIDEO_CONSUMER_BATCH_SIZE', 50))
+VIDEO_CONSUMER_FLUSH_SECONDS = float(os.environ.get('VIDEO_CONSUMER_FLUSH_SECONDS', 1.0))
+VIDEO_CONSUMER_DEDUPE_SIZE = int(os.environ.get('VIDEO_CONSUMER_DEDUPE_SIZE', 10000))
 
 # Celery Configuration
 CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', f'amqp://{RABBITMQ_USER}:{RABBITMQ_PASSWORD}@{RABBITMQ_HOST}:{RABBITMQ_PORT}/{RABBITMQ_VHOST}')
 CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', f'mongodb://{MONGODB_URI}/{MONGODB_DB_NAME}')
 
+# Retries of failed pipeline stages: exponential backoff with jitter
+TASK_MAX_RETRIES = int(os.environ.get('TASK_MAX_RETRIES', 5))
+TASK_RETRY_BASE_SECONDS = float(os.environ.get('TASK_RETRY_BASE_SECONDS', 15))
+TASK_RETRY_MAX_SECONDS = float(os.environ.get('TASK_RETRY_MAX_SECONDS', 900))
+
+# Lease a worker holds on a (video, stage) while running it; must outlast the
+# slowest run (OpenAI timeout and client retries included)
+TASK_LEASE_SECONDS = float(os.environ.get('TASK_LEASE_SECONDS', 600))
+
 # Email Configuration
 EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
@@ -35,12 +91,22 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True').lower() == 'true'
 EMAIL_RECIPIENT = os.environ.get('EMAIL_RECIPIENT')
+EMAIL_TIMEOUT_SECONDS = float(os.environ.get('EMAIL_TIMEOUT_SECONDS', 30))
 
 # Web UI Configuration
 WEB_UI_HOST = os.environ.get('WEB_UI_HOST', '0.0.0.0')
 WEB_UI_PORT = int(os.environ.get('WEB_UI_PORT', 8000))
 WEB_UI_BASE_URL = os.environ.get('WEB_UI_BASE_URL', f'http://localhost:{WEB_UI_PORT}')
 
+# WebSub (PubSubHubbub) push notifications for new uploads
+WEBSUB_ENABLED = os.environ.get('WEBSUB_ENABLED', 'False').lower() == 'true'
+WEBSUB_HUB_URL = os.environ.get('WEBSUB_HUB_URL', 'https://pubsubhubbub.appspot.com/subscribe')
+WEBSUB_CALLBACK_URL = os.environ.get('WEBSUB_CALLBACK_URL', f'{WEB_UI_BASE_URL}/websub/youtube')
+WEBSUB_SECRET = os.environ.get('WEBSUB_SECRET')
+WEBSUB_LEASE_SECONDS = int(os.environ.get('WEBSUB_LEASE_SECONDS', 5 * 24 * 60 * 60))
+WEBSUB_RENEW_BEFORE_SECONDS = int(os.environ.get('WEBSUB_RENEW_BEFORE_SECONDS', 24 * 60 * 60))
+WEBSUB_FALLBACK_POLL_MINUTES = float(os.environ.get('WEBSUB_FALLBACK_POLL_MINUTES', 6 * 60))
+
 # LinkedIn API Configuration
 LINKEDIN_CLIENT_ID = os.environ.get('LINKEDIN_CLIENT_ID')
 LINKEDIN_CLIENT_SECRET = os.environ.get('LINKEDIN_CLIENT_SECRET')
@@ -49,4 +115,5 @@ LINKEDIN_REDIRECT_URI = os.environ.get('LINKEDIN_REDIRECT_URI', f'{WEB_UI_BASE_U
 # AI Configuration for Summarization and Post Generation
 AI_MODEL_TYPE = os.environ.get('AI_MODEL_TYPE', 'openai')  # or 'huggingface', etc.
 AI_API_KEY = os.environ.get('AI_API_KEY')
-AI_MODEL_NAME = os.environ.get('AI_MODEL_NAME', 'gpt-4') 
\ No newline at end of file
+AI_MODEL_NAME = os.environ.get('AI_MODEL_NAME', 'gpt-4')
+AI_REQUEST_TIMEOUT_SECONDS = float(os.environ.get('AI_REQUEST_TIMEOUT_SECONDS', 120)) 
\ No newline at end of file
@@ -0,0 +1,75 @@
+import os
+import sys
+import types
+from typing import Dict, List, Tuple
+
+import mongomock
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# config.py (Flask settings) sits next to the config/ settings package and
+# wins the import lookup, so config.config is registered explicitly
+if "config" not in sys.modules:
+    config_package = types.ModuleType("config")
+    config_package.__path__ = [os.path.join(ROOT, "config")]
+    sys.modules["config"] = config_package
+
+# The monitor logs to logs/youtube_monitor.log relative to the working directory
+os.makedirs("logs", exist_ok=True)
+
+# The AI stages build their API client at import; tests never reach the API
+os.environ.setdefault("AI_API_KEY", "test")
+
+from app.core import database
+from app.core.database import MongoDB
+from tests.fake_youtube import FakeYouTubeClient
+
+
+class RecordingPublisher:
+    """Stand-in for ConfirmedPublisher that keeps published messages in memory."""
+    
+    def __init__(self):
+        self.messages: List[Tuple[str, bytes]] = []
+    
+    def publish_batch(self, messages) -> None:
+        self.messages.extend((queue, body) for queue, body, _ in messages)
+    
+    def queue_depth(self, queue: str) -> int:
+        return 0
+    
+    def stats(self) -> Dict:
+        return {"published": len(self.messages)}
+    
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def mongo(monkeypatch):
+    """In-memory MongoDB behind MongoDB.get_client, fresh for every test."""
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(MongoDB, "_client", client)
+    monkeypatch.setattr(MongoDB, "_db", None)
+    monkeypatch.setattr(MongoDB, "_pid", os.getpid())
+    if database.document_cache is not None:
+        database.document_cache.clear()
+    yield MongoDB.get_db()
+    if database.document_cache is not None:
+        database.document_cache.clear()
+
+
+@pytest.fixture
+def youtube() -> FakeYouTubeClient:
+    return FakeYouTubeClient()
+
+
+@pytest.fixture
+def monitor(monkeypatch, youtube):
+    """YouTubeMonitor on the fake API client, publishing to a RecordingPublisher."""
+    from app.api.youtube_monitor import YouTubeMonitor
+    
+    monkeypatch.setattr(YouTubeMonitor, "_init_rabbitmq", lambda self: setattr(self, "publisher", RecordingPublisher()))
+    monitor = YouTubeMonitor(youtube=youtube, max_workers=2)
+    yield monitor
+    monitor._executor.shutdown(wait=True)
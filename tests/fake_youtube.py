@@ -0,0 +1,223 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+class FakeRequest:
+    """
+    Stand-in for a googleapiclient HttpRequest; execute() returns a canned response.
+    
+    Responses carry an etag, and a matching If-None-Match header raises the
+    same HttpError(304) googleapiclient raises for Not Modified.
+    """
+    
+    def __init__(self, client: 'FakeYouTubeClient', method: str, params: Dict):
+        self.client = client
+        self.method = method
+        self.params = params
+        self.headers: Dict[str, str] = {}
+        query = urlencode(sorted((key, value) for key, value in params.items() if value is not None))
+        self.uri = f"https://youtube.googleapis.com/youtube/v3/{method.replace('.list', '')}?{query}"
+    
+    def execute(self) -> Dict:
+        self.client.calls.append((self.method, self.params))
+        self.client.quota_used += FakeYouTubeClient.QUOTA_COSTS.get(self.method, 1)
+        response = getattr(self.client, f"_{self.method.replace('.', '_')}")(**self.params)
+        
+        body = json.dumps(response, sort_keys=True, default=str).encode("utf-8")
+        response["etag"] = hashlib.sha1(body).hexdigest()
+        if self.headers.get("If-None-Match") == response["etag"]:
+            self.client.not_modified += 1
+            raise HttpError(httplib2.Response({"status": 304}), b"", uri=self.uri)
+        return response
+
+
+class FakeResource:
+    """Stand-in for a discovery resource such as youtube.playlistItems()."""
+    
+    def __init__(self, client: 'FakeYouTubeClient', name: str):
+        self.client = client
+        self.name = name
+    
+    def list(self, **params) -> FakeRequest:
+        return FakeRequest(self.client, f"{self.name}.list", params)
+
+
+class FakeYouTubeClient:
+    """
+    Offline stand-in for the YouTube Data API client used by YouTubeMonitor.
+    
+    Holds an in-memory upload history per channel and answers
+    channels.list, playlistItems.list, search.list and videos.list with
+    responses shaped like the real API. Every executed call is recorded in
+    `calls` and charged to `quota_used`, so quota behavior can be checked
+    without network access:
+    
+        youtube = FakeYouTubeClient()
+        youtube.add_upload("UCabc", "vid1", "First video")
+        monitor = YouTubeMonitor(youtube=youtube)
+    """
+    
+    QUOTA_COSTS = {
+        "channels.list": 1,
+        "playlistItems.list": 1,
+        "search.list": 100,
+        "videos.list": 1
+    }
+    
+    def __init__(self):
+        self.uploads: Dict[str, List[Dict]] = {}
+        self.calls: List = []
+        self.quota_used = 0
+        self.not_modified = 0
+    
+    def add_upload(
+        self,
+        channel_id: str,
+        video_id: str,
+        title: str = "",
+        published_at: Optional[datetime] = None,
+        **video_fields
+    ) -> Dict:
+        """
+        Add an upload to a channel.
+        
+        Extra fields such as contentDetails, liveStreamingDetails or
+        liveBroadcastContent override the defaults of its videos.list item
+        (a 10 minute video with captions, not live).
+        """
+        published_at = published_at or datetime.now(timezone.utc)
+        video = {
+            "video_id": video_id,
+            "title": title or video_id,
+            "channel_id": channel_id,
+            "published_at": published_at.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            **video_fields
+        }
+        self.uploads.setdefault(channel_id, []).append(video)
+        self.uploads[channel_id].sort(key=lambda upload: upload["published_at"], reverse=True)
+        return video
+    
+    def add_uploads(
+        self,
+        channel_id: str,
+        count: int,
+        start: Optional[datetime] = None,
+        every: timedelta = timedelta(hours=1)
+    ) -> None:
+        """Add `count` uploads spaced `every` apart, the newest at `start`."""
+        start = start or datetime.now(timezone.utc)
+        for index in range(count):
+            self.add_upload(channel_id, f"{channel_id}-{index:05d}", published_at=start - every * index)
+    
+    def channels(self) -> FakeResource:
+        return FakeResource(self, "channels")
+    
+    def playlistItems(self) -> FakeResource:
+        return FakeResource(self, "playlistItems")
+    
+    def search(self) -> FakeResource:
+        return FakeResource(self, "search")
+    
+    def videos(self) -> FakeResource:
+        return FakeResource(self, "videos")
+    
+    @staticmethod
+    def uploads_playlist_id(channel_id: str) -> str:
+        return "UU" + channel_id[2:]
+    
+    def _snippet(self, video: Dict) -> Dict:
+        return {
+            "title": video["title"],
+            "description": "",
+            "channelId": video["channel_id"],
+            "channelTitle": f"Channel {video['channel_id']}",
+            "publishedAt": video["published_at"],
+            "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{video['video_id']}/hqdefault.jpg"}}
+        }
+    
+    def _page(self, items: List, max_results: int, page_token: Optional[str]) -> Dict:
+        offset = int(page_token or 0)
+        response = {"items": items[offset:offset + max_results]}
+        if offset + max_results < len(items):
+            response["nextPageToken"] = str(offset + max_results)
+        return response
+    
+    def _channels_list(self, part: str, id: str, **kwargs) -> Dict:
+        if id not in self.uploads:
+            return {"items": []}
+        return {"items": [{
+            "id": id,
+            "contentDetails": {"relatedPlaylists": {"uploads": self.uploads_playlist_id(id)}}
+        }]}
+    
+    def _playlistItems_list(
+        self,
+        part: str,
+        playlistId: str,
+        maxResults: int = 5,
+        pageToken: Optional[str] = None,
+        **kwargs
+    ) -> Dict:
+        channel_id = "UC" + playlistId[2:]
+        items = [
+            {
+                "id": f"PLI-{video['video_id']}",
+                "snippet": {
+                    **self._snippet(video),
+                    "playlistId": playlistId,
+                    "resourceId": {"kind": "youtube#video", "videoId": video["video_id"]},
+                    "videoOwnerChannelId": video["channel_id"]
+                },
+                "contentDetails": {"videoId": video["video_id"], "videoPublishedAt": video["published_at"]}
+            }
+            for video in self.uploads.get(channel_id, [])
+        ]
+        return self._page(items, maxResults, pageToken)
+    
+    def _search_list(
+        self,
+        part: str,
+        channelId: str,
+        maxResults: int = 5,
+        pageToken: Optional[str] = None,
+        **kwargs
+    ) -> Dict:
+        items = [
+            {"id": {"kind": "youtube#video", "videoId": video["video_id"]}, "snippet": self._snippet(video)}
+            for video in self.uploads.get(channelId, [])
+        ]
+        return self._page(items, maxResults, pageToken)
+    
+    def _videos_list(self, part: str, id: str, **kwargs) -> Dict:
+        wanted = id.split(",")
+        if len(wanted) > 50:
+            raise ValueError("videos.list accepts at most 50 IDs")
+        videos = {
+            video["video_id"]: video
+            for uploads in self.uploads.values()
+            for video in uploads
+        }
+        items = []
+        for video_id in wanted:
+            video = videos.get(video_id)
+            if video is None:
+                continue
+            item = {
+                "id": video_id,
+                "snippet": {
+                    **self._snippet(video),
+                    "liveBroadcastContent": video.get("liveBroadcastContent", "none")
+                },
+                "contentDetails": video.get("contentDetails", {"duration": "PT10M", "caption": "true"})
+            }
+            for key in ("liveStreamingDetails", "status"):
+                if key in video:
+                    item[key] = video[key]
+            items.append(item)
+        return {"items": items}
@@ -0,0 +1,175 @@
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+import requests
+
+from app.api.websub import channel_id_from_topic, topic_url
+
+logger = logging.getLogger(__name__)
+
+
+def atom_notification(
+    channel_id: str,
+    video_id: str,
+    title: str = "",
+    published_at: Optional[datetime] = None,
+    channel_title: str = ""
+) -> bytes:
+    """Build an Atom upload notification shaped like the ones YouTube pushes."""
+    published = (published_at or datetime.now(timezone.utc)).astimezone(timezone.utc).isoformat()
+    return f"""<?xml version='1.0' encoding='UTF-8'?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">
+  <link rel="hub" href="https://pubsubhubbub.appspot.com"/>
+  <link rel="self" href="{escape(topic_url(channel_id))}"/>
+  <title>YouTube video feed</title>
+  <updated>{published}</updated>
+  <entry>
+    <id>yt:video:{escape(video_id)}</id>
+    <yt:videoId>{escape(video_id)}</yt:videoId>
+    <yt:channelId>{escape(channel_id)}</yt:channelId>
+    <title>{escape(title or video_id)}</title>
+    <link rel="alternate" href="https://www.youtube.com/watch?v={escape(video_id)}"/>
+    <author>
+      <name>{escape(channel_title or channel_id)}</name>
+      <uri>https://www.youtube.com/channel/{escape(channel_id)}</uri>
+    </author>
+    <published>{published}</published>
+    <updated>{published}</updated>
+  </entry>
+</feed>
+""".encode("utf-8")
+
+
+def atom_deletion(channel_id: str, video_id: str) -> bytes:
+    """Build an Atom tombstone like the one YouTube pushes for a deleted video."""
+    when = datetime.now(timezone.utc).isoformat()
+    return f"""<?xml version='1.0' encoding='UTF-8'?>
+<feed xmlns:at="http://purl.org/atompub/tombstones/1.0" xmlns="http://www.w3.org/2005/Atom">
+  <at:deleted-entry ref="yt:video:{escape(video_id)}" when="{when}">
+    <link href="https://www.youtube.com/watch?v={escape(video_id)}"/>
+    <at:by>
+      <name>{escape(channel_id)}</name>
+      <uri>https://www.youtube.com/channel/{escape(channel_id)}</uri>
+    </at:by>
+  </at:deleted-entry>
+</feed>
+""".encode("utf-8")
+
+
+class _HubResponse:
+    """Minimal requests-style response returned by LocalHub.post."""
+    
+    def __init__(self, status_code: int, text: str = ""):
+        self.status_code = status_code
+        self.text = text
+
+
+class LocalHub:
+    """
+    Local stand-in for a WebSub hub, for exercising the callback endpoint.
+    
+    Pass it as the `session` of request_subscription / renew_leases: it
+    verifies intent against the callback immediately and keeps the
+    subscription. publish() then posts signed Atom notifications to every
+    subscriber of the channel's topic. Callbacks are reached through a
+    Flask test client if one is given, otherwise over HTTP:
+        
+        hub = LocalHub(app.test_client())
+        request_subscription("UCabc", session=hub)
+        hub.publish("UCabc", "dQw4w9WgXcQ", "New video")
+    """
+    
+    def __init__(self, client=None):
+        self.client = client
+        self.subscriptions: Dict[Tuple[str, str], Dict] = {}
+        self.deliveries = []
+    
+    def post(self, url: str, data: Dict[str, str], timeout: float = 10) -> _HubResponse:
+        """Handle a subscription request the way the hub's /subscribe endpoint would."""
+        callback = data.get("hub.callback")
+        topic = data.get("hub.topic")
+        mode = data.get("hub.mode")
+        if not callback or mode not in ("subscribe", "unsubscribe") or not channel_id_from_topic(topic):
+            return _HubResponse(400, "Invalid subscription request")
+        
+        lease_seconds = int(data.get("hub.lease_seconds") or 432000)
+        challenge = secrets.token_urlsafe(16)
+        status, body = self._get(callback, {
+            "hub.mode": mode,
+            "hub.topic": topic,
+            "hub.challenge": challenge,
+            "hub.lease_seconds": str(lease_seconds)
+        })
+        if status // 100 != 2 or body != challenge:
+            logger.warning(f"Callback refused {mode} for {topic}")
+            return _HubResponse(202)
+        
+        if mode == "subscribe":
+            self.subscriptions[(callback, topic)] = {
+                "secret": data.get("hub.secret"),
+                "expires_at": time.time() + lease_seconds
+            }
+        else:
+            self.subscriptions.pop((callback, topic), None)
+        return _HubResponse(202)
+    
+    def publish(
+        self,
+        channel_id: str,
+        video_id: str,
+        title: str = "",
+        published_at: Optional[datetime] = None
+    ) -> int:
+        """Push an upload notification; returns how many callbacks answered 2xx."""
+        return self.deliver(channel_id, atom_notification(channel_id, video_id, title, published_at))
+    
+    def deliver(self, channel_id: str, body: bytes) -> int:
+        """Push a raw Atom payload to the subscribers of a channel's topic."""
+        topic = topic_url(channel_id)
+        delivered = 0
+        for (callback, subscribed_topic), subscription in list(self.subscriptions.items()):
+            if subscribed_topic != topic or subscription["expires_at"] < time.time():
+                continue
+            headers = {"Content-Type": "application/atom+xml"}
+            if subscription["secret"]:
+                digest = hmac.new(subscription["secret"].encode("utf-8"), body, hashlib.sha1).hexdigest()
+                headers["X-Hub-Signature"] = f"sha1={digest}"
+            status = self._post(callback, body, headers)
+            self.deliveries.append((callback, topic, status))
+            delivered += status // 100 == 2
+        return delivered
+    
+    def _get(self, url: str, params: Dict[str, str]) -> Tuple[int, str]:
+        if self.client is not None:
+            response = self.client.get(urlsplit(url).path, query_string=params)
+            return response.status_code, response.get_data(as_text=True)
+        response = requests.get(url, params=params, timeout=10)
+        return response.status_code, response.text
+    
+    def _post(self, url: str, body: bytes, headers: Dict[str, str]) -> int:
+        if self.client is not None:
+            return self.client.post(urlsplit(url).path, data=body, headers=headers).status_code
+        return requests.post(url, data=body, headers=headers, timeout=10).status_code
+
+
+if __name__ == "__main__":
+    # Push a sample notification to a running web app: python -m tests.local_hub CHANNEL_ID VIDEO_ID [TITLE]
+    import sys
+    
+    from app.api.websub import request_subscription
+    from config.config import WEBSUB_CALLBACK_URL
+    
+    logging.basicConfig(level=logging.INFO)
+    hub = LocalHub()
+    channel_id, video_id = sys.argv[1], sys.argv[2]
+    request_subscription(channel_id, session=hub)
+    if (WEBSUB_CALLBACK_URL, topic_url(channel_id)) not in hub.subscriptions:
+        sys.exit(f"Callback {WEBSUB_CALLBACK_URL} did not verify the subscription")
+    print(f"Delivered to {hub.publish(channel_id, video_id, ' '.join(sys.argv[3:]))} callback(s)")
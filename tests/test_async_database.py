@@ -0,0 +1,217 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.core import async_database
+from app.core.async_database import (
+    AsyncLinkedInPostRepository,
+    AsyncMongoDB,
+    AsyncSummaryRepository,
+    AsyncTaskLeaseRepository,
+    AsyncVideoRepository
+)
+from app.core.database import StaleLeaseError, TaskLeaseRepository
+from app.core.indexes import ensure_indexes
+
+VIDEO_ID = "vid1"
+
+
+class FakeMotorClient:
+    """Stand-in for AsyncIOMotorClient that records whether it was closed."""
+    
+    def __init__(self, *args, **kwargs):
+        self.closed = False
+    
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeMotorCursor:
+    """Stand-in for AsyncIOMotorCursor over a mongomock cursor."""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+    
+    def sort(self, *args, **kwargs) -> "FakeMotorCursor":
+        self._cursor.sort(*args, **kwargs)
+        return self
+    
+    def limit(self, limit: int) -> "FakeMotorCursor":
+        self._cursor.limit(limit)
+        return self
+    
+    async def to_list(self, length=None) -> list:
+        documents = list(self._cursor)
+        return documents if length is None else documents[:length]
+    
+    async def __aiter__(self):
+        for document in self._cursor:
+            yield document
+
+
+class FakeMotorCollection:
+    """Stand-in for AsyncIOMotorCollection running each operation on a mongomock collection."""
+    
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+    
+    def find(self, *args, **kwargs) -> FakeMotorCursor:
+        return FakeMotorCursor(self._collection.find(*args, **kwargs))
+    
+    async def bulk_write(self, operations, ordered=True):
+        # mongomock keys upserted_ids by upsert count; MongoDB keys them by operation index
+        upserted_ids = {}
+        for index, operation in enumerate(operations):
+            result = self._collection.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            if result.upserted_id is not None:
+                upserted_ids[index] = result.upserted_id
+        return SimpleNamespace(upserted_ids=upserted_ids)
+    
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+        
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class RacingCollection(FakeMotorCollection):
+    """Collection where another writer inserts the document just before our first upsert."""
+    
+    def __init__(self, collection):
+        super().__init__(collection)
+        self.upserts = 0
+    
+    async def find_one_and_update(self, query, update, **kwargs):
+        if kwargs.get("upsert"):
+            self.upserts += 1
+            self._collection.insert_one({"video_id": query["video_id"], "summary_text": "theirs"})
+            raise DuplicateKeyError("E11000 duplicate key error")
+        return self._collection.find_one_and_update(query, update, **kwargs)
+
+
+@pytest.fixture
+def motor(mongo, monkeypatch):
+    """Async repositories running on the in-memory database of the mongo fixture."""
+    ensure_indexes()
+    monkeypatch.setattr(
+        AsyncMongoDB,
+        "get_collection",
+        classmethod(lambda cls, collection_name: FakeMotorCollection(mongo[collection_name]))
+    )
+    return mongo
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    monkeypatch.setattr(async_database, "AsyncIOMotorClient", FakeMotorClient)
+    monkeypatch.setattr(AsyncMongoDB, "_clients", {})
+    monkeypatch.setattr(AsyncMongoDB, "_pid", None)
+    return AsyncMongoDB._clients
+
+
+async def get_client():
+    return AsyncMongoDB.get_client()
+
+
+def test_client_per_event_loop(clients):
+    first = asyncio.run(get_client())
+    second = asyncio.run(get_client())
+    
+    # asyncio.run closed the first loop, so its client is closed rather than leaked
+    assert first is not second
+    assert first.closed and not second.closed
+    assert list(clients.values()) == [second]
+    
+    AsyncMongoDB.close()
+    assert second.closed
+    assert AsyncMongoDB._clients == {}
+
+
+def test_forked_process_forgets_inherited_clients(clients, monkeypatch):
+    inherited = asyncio.run(get_client())
+    monkeypatch.setattr(AsyncMongoDB, "_pid", os.getpid() + 1)
+    
+    assert asyncio.run(get_client()) is not inherited
+    assert not inherited.closed
+
+
+def test_fenced_save_refuses_an_older_lease(motor):
+    newer = asyncio.run(AsyncSummaryRepository.save_summary({"video_id": VIDEO_ID, "summary_text": "newer"}, fence_token=2))
+    
+    with pytest.raises(StaleLeaseError):
+        asyncio.run(AsyncSummaryRepository.save_summary({"video_id": VIDEO_ID, "summary_text": "older"}, fence_token=1))
+    
+    assert motor.summaries.find_one({"video_id": VIDEO_ID})["summary_text"] == "newer"
+    assert asyncio.run(AsyncSummaryRepository.save_summary({"video_id": VIDEO_ID, "summary_text": "newest"}, fence_token=3)) == newer
+    assert motor.summaries.find_one({"video_id": VIDEO_ID})["fence_token"] == 3
+
+
+def test_upsert_that_loses_an_insert_race_updates_the_winner(motor):
+    collection = RacingCollection(motor.summaries)
+    
+    document_id = asyncio.run(async_database._upsert_by_video_id(collection, {"video_id": VIDEO_ID, "summary_text": "ours"}))
+    
+    document = motor.summaries.find_one({"video_id": VIDEO_ID})
+    assert collection.upserts == 1
+    assert document_id == str(document["_id"])
+    assert document["summary_text"] == "ours"
+
+
+def test_save_videos_returns_only_inserted_ids_in_order(motor):
+    def video(video_id):
+        return {"video_id": video_id, "title": video_id, "published_at": datetime(2024, 3, 4, 10, 0)}
+    
+    asyncio.run(AsyncVideoRepository.save_video(video("old")))
+    
+    inserted = asyncio.run(AsyncVideoRepository.save_videos([video("new1"), video("old"), video("new2")]))
+    
+    assert inserted == ["new1", "new2"]
+    assert motor.videos.count_documents({}) == 3
+    assert asyncio.run(AsyncVideoRepository.save_videos([])) == []
+
+
+def test_keyset_pages_cover_every_post_once(motor):
+    created = datetime(2024, 3, 4, 10, 0)
+    # Two posts share a created_at, so the _id tie-breaker decides their order
+    for index, offset in enumerate([0, 1, 1, 2, 3]):
+        motor.linkedin_posts.insert_one({"video_id": f"vid{index}", "created_at": created + timedelta(hours=offset), "status": "draft"})
+    motor.linkedin_posts.insert_one({"video_id": "other", "created_at": created, "status": "published"})
+    expected = [post["video_id"] for post in motor.linkedin_posts.find({"status": "draft"}).sort([("created_at", -1), ("_id", -1)])]
+    
+    seen, cursor = [], None
+    while True:
+        page, cursor = asyncio.run(AsyncLinkedInPostRepository.list_posts_page(limit=2, status="draft", cursor=cursor))
+        seen += [post["video_id"] for post in page]
+        if cursor is None:
+            break
+    
+    assert seen == expected
+    assert len(seen) == 5
+
+
+def test_lease_lifecycle(motor):
+    lease = asyncio.run(AsyncTaskLeaseRepository.acquire(VIDEO_ID, "summary", "worker-1", 60))
+    
+    assert lease["token"] == 1
+    # Held: neither an async nor a sync caller can take it
+    assert asyncio.run(AsyncTaskLeaseRepository.acquire(VIDEO_ID, "summary", "worker-2", 60)) is None
+    assert TaskLeaseRepository.acquire(VIDEO_ID, "summary", "worker-2", 60) is None
+    assert asyncio.run(AsyncTaskLeaseRepository.mark_started(VIDEO_ID, "summary", 1))
+    assert asyncio.run(AsyncTaskLeaseRepository.get_lease(VIDEO_ID, "summary"))["started_at"] is not None
+    
+    # Expired: the next holder gets a higher token and the old one is fenced off
+    motor.task_leases.update_many({}, {"$set": {"expires_at": datetime.now() - timedelta(seconds=1)}})
+    assert asyncio.run(AsyncTaskLeaseRepository.acquire(VIDEO_ID, "summary", "worker-2", 60))["token"] == 2
+    assert not asyncio.run(AsyncTaskLeaseRepository.mark_started(VIDEO_ID, "summary", 1))
+    assert not asyncio.run(AsyncTaskLeaseRepository.release(VIDEO_ID, "summary", 1))
+    
+    assert asyncio.run(AsyncTaskLeaseRepository.release(VIDEO_ID, "summary", 2, completed=True))
+    released = asyncio.run(AsyncTaskLeaseRepository.get_lease(VIDEO_ID, "summary"))
+    assert released["owner"] is None and released["completed_at"] is not None
+    assert TaskLeaseRepository.acquire(VIDEO_ID, "summary", "worker-3", 60)["token"] == 3
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.database import VideoRepository
+from app.models.video_message import VideoMessage
+from app.workers.consumer import VideoConsumer
+from config.config import BACKFILL_MAX_PIPELINE_DEPTH, RABBITMQ_BACKFILL_QUEUE, RABBITMQ_QUEUE
+
+
+class FakeChannel:
+    """Records the consumer's calls on a pika BlockingChannel."""
+    
+    def __init__(self):
+        self.consumers = {}
+        self.acked = []
+    
+    def basic_qos(self, prefetch_count: int) -> None:
+        pass
+    
+    def basic_consume(self, queue: str, on_message_callback) -> str:
+        tag = f"ctag-{len(self.consumers)}"
+        self.consumers[tag] = queue
+        return tag
+    
+    def basic_cancel(self, consumer_tag: str) -> None:
+        del self.consumers[consumer_tag]
+    
+    def basic_ack(self, delivery_tag: int, multiple: bool = False) -> None:
+        self.acked.append((delivery_tag, multiple))
+
+
+@pytest.fixture
+def consumer():
+    dispatched = []
+    depth = [0]
+    consumer = VideoConsumer(
+        dispatch=lambda video_ids, backfill: dispatched.append((video_ids, backfill)),
+        parameters=object(),
+        backfill_depth=lambda: depth[0]
+    )
+    consumer.channel = FakeChannel()
+    consumer.dispatched_batches = dispatched
+    consumer.depth = depth
+    return consumer
+
+
+def deliver(consumer, queue: str, video_id: str, delivery_tag: int) -> None:
+    body = VideoMessage(video_id=video_id).to_json()
+    consumer._on_message(queue, consumer.channel, SimpleNamespace(delivery_tag=delivery_tag), None, body)
+
+
+def test_lanes_are_dispatched_apart(consumer):
+    for video_id in ("fresh1", "old1", "fresh2"):
+        VideoRepository.save_video({"video_id": video_id})
+    deliver(consumer, RABBITMQ_BACKFILL_QUEUE, "old1", 1)
+    deliver(consumer, RABBITMQ_QUEUE, "fresh1", 2)
+    deliver(consumer, RABBITMQ_QUEUE, "fresh2", 3)
+    
+    assert consumer.flush() == 3
+    assert consumer.dispatched_batches == [(["fresh1", "fresh2"], False), (["old1"], True)]
+    assert consumer.channel.acked == [(3, True)]
+
+
+def test_backfill_lane_pauses_while_stage_queues_are_full(consumer):
+    consumer._pace_backfill()
+    assert list(consumer.channel.consumers.values()) == [RABBITMQ_BACKFILL_QUEUE]
+    
+    consumer.depth[0] = BACKFILL_MAX_PIPELINE_DEPTH
+    consumer._pace_backfill()
+    assert consumer.channel.consumers == {}
+    assert consumer.backfill_pauses == 1
+    
+    consumer.depth[0] = BACKFILL_MAX_PIPELINE_DEPTH - 1
+    consumer._pace_backfill()
+    assert list(consumer.channel.consumers.values()) == [RABBITMQ_BACKFILL_QUEUE]
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from app.core.database import MongoDB, StaleLeaseError, TaskLeaseRepository
+from app.workers.lease import StageLease
+from app.workers.tasks import email
+
+VIDEO_ID = "vid1"
+
+
+def payload():
+    return {
+        "video_id": VIDEO_ID,
+        "video": {
+            "video_id": VIDEO_ID,
+            "title": "First video",
+            "channel_id": "UCchannel",
+            "channel_title": "Channel",
+            "published_at": datetime(2024, 3, 4, 10, 0).isoformat(),
+            "description": ""
+        },
+        "post": {"content": "Draft", "title": "Post"}
+    }
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Recipients of the emails the task hands to the SMTP server."""
+    messages = []
+    
+    def send_email(recipient, subject, html_content):
+        messages.append(recipient)
+        return True
+    
+    monkeypatch.setattr(email, "_send_email", send_email)
+    return messages
+
+
+def expire_lease():
+    MongoDB.get_task_leases_collection().update_many({}, {"$set": {"expires_at": datetime.now() - timedelta(seconds=1)}})
+
+
+def test_duplicate_delivery_is_not_sent_again(sent):
+    assert email.send_post_notification(payload()) is True
+    assert email.send_post_notification(payload()) is True
+    assert len(sent) == 1
+    
+    assert email.send_post_notification({**payload(), "regenerate": True}) is True
+    assert len(sent) == 2
+
+
+def test_sent_email_counts_as_done_when_release_fails(sent, monkeypatch):
+    def release(*args, **kwargs):
+        raise AutoReconnect("connection lost")
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(TaskLeaseRepository, "release", release)
+        assert email.send_post_notification(payload()) is True
+    assert TaskLeaseRepository.get_lease(VIDEO_ID, "email").get("completed_at") is None
+    
+    # Redelivered once the lease the worker never gave up has expired
+    expire_lease()
+    assert email.send_post_notification(payload()) is True
+    assert len(sent) == 1
+
+
+def test_failed_send_is_sent_again(sent, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(email, "_send_email", lambda recipient, subject, html_content: False)
+        assert email.send_post_notification(payload()) is False
+    
+    assert email.send_post_notification(payload()) is True
+    assert len(sent) == 1
+
+
+def test_lease_taken_over_before_sending(sent):
+    lease = StageLease.acquire(VIDEO_ID, "email")
+    expire_lease()
+    StageLease.acquire(VIDEO_ID, "email")
+    
+    with pytest.raises(StaleLeaseError):
+        lease.mark_started()
+    assert sent == []
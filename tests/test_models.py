@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.codec import REQUIRED, Field, model_codec
+from app.models.linkedin_post import LinkedInPost, PostStatus
+from app.models.summary import Summary
+from app.models.transcript import TranscriptSegment
+from app.models.video import Video
+
+PUBLISHED_AT = datetime(2024, 3, 4, 10, 0)
+
+
+@model_codec(
+    Field("name", REQUIRED),
+    Field("tags", ()),
+    Field("size", init=False),
+    Field("ratio", encode=str, decode=float)
+)
+class Sample:
+    __slots__ = ("name", "tags", "size", "ratio")
+    
+    def __init__(self, name, tags=(), ratio=None):
+        self.name = name
+        self.tags = tags
+        self.size = None
+        self.ratio = ratio
+
+
+def test_round_trip_keeps_every_field():
+    sample = Sample("first", ("a", "b"), ratio=0.5)
+    sample.size = 3
+    
+    data = sample.to_dict()
+    copy = Sample.from_dict(data)
+    
+    assert data == {"name": "first", "tags": ("a", "b"), "size": 3, "ratio": "0.5"}
+    assert (copy.name, copy.tags, copy.size, copy.ratio) == ("first", ("a", "b"), 3, 0.5)
+
+
+def test_missing_keys_take_their_defaults():
+    copy = Sample.from_dict({"name": "first", "ratio": "1"})
+    
+    assert copy.tags == () and copy.size is None and copy.ratio == 1.0
+
+
+def test_missing_required_key_is_an_error():
+    with pytest.raises(KeyError):
+        Sample.from_dict({"ratio": "1"})
+
+
+def test_generated_methods_are_named_after_the_model():
+    assert Sample.to_dict.__qualname__ == "Sample.to_dict"
+    assert Sample.from_dict.__qualname__ == "Sample.from_dict"
+
+
+def test_video_round_trip_keeps_fields_set_after_construction():
+    video = Video("vid1", "First video", "UCchannel", "Channel", PUBLISHED_AT, description="About")
+    video.processed = True
+    video.duration_seconds = 600
+    video.live_status = "none"
+    
+    copy = Video.from_dict(video.to_dict())
+    
+    assert copy.to_dict() == video.to_dict()
+    assert copy.processed is True and copy.duration_seconds == 600
+
+
+def test_video_from_an_old_document_defaults_processed():
+    copy = Video.from_dict({
+        "video_id": "vid1",
+        "title": "First video",
+        "channel_id": "UCchannel",
+        "channel_title": "Channel",
+        "published_at": PUBLISHED_AT
+    })
+    
+    assert copy.processed is False and copy.description is None
+
+
+def test_post_status_is_stored_as_its_value():
+    post = LinkedInPost("vid1", "Post body", title="Title", status=PostStatus.REVIEWED)
+    
+    data = post.to_dict()
+    copy = LinkedInPost.from_dict(data)
+    
+    assert data["status"] == "reviewed"
+    assert copy.status is PostStatus.REVIEWED
+    assert copy.to_dict() == data
+    assert LinkedInPost.from_dict({"video_id": "vid1", "content": "Post body"}).status is PostStatus.DRAFT
+
+
+def test_summary_and_segment_round_trips():
+    summary = Summary("vid1", "Greetings.", ["Hello"], model_used="model", key_point_times=[1.5])
+    segment = TranscriptSegment("Hello there.", 1.5, 2.0)
+    
+    assert Summary.from_dict(summary.to_dict()).to_dict() == summary.to_dict()
+    assert TranscriptSegment.from_dict(segment.to_dict()).to_dict() == {"text": "Hello there.", "start": 1.5, "duration": 2.0}
@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import httpx
+import openai
+import pytest
+from celery.exceptions import Ignore
+
+from app.core.database import LinkedInPostRepository, SummaryRepository, TranscriptRepository, VideoRepository
+from app.models.transcript import Transcript, TranscriptSegment
+from app.workers.lease import StageLease
+from app.workers.payload import pack_video
+from app.workers.tasks import linkedin_post, summarize
+
+VIDEO_ID = "vid1"
+
+FATAL_ERRORS = [
+    (401, openai.AuthenticationError, None),
+    (429, openai.RateLimitError, "insufficient_quota"),
+    (400, openai.BadRequestError, None)
+]
+
+AI_STAGES = [
+    (summarize, summarize.generate_summary, "summary", SummaryRepository.get_summary),
+    (linkedin_post, linkedin_post.generate_linkedin_post, "post", LinkedInPostRepository.get_post)
+]
+
+
+def api_error(status: int, error_class, code=None) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status, request=request)
+    return error_class(f"Error code: {status}", response=response, body={"code": code} if code else None)
+
+
+@pytest.fixture
+def video():
+    VideoRepository.save_video({
+        "video_id": VIDEO_ID,
+        "title": "First video",
+        "channel_id": "UCchannel",
+        "channel_title": "Channel",
+        "published_at": datetime(2024, 3, 4, 10, 0),
+        "description": "",
+        "processed": False
+    })
+    SummaryRepository.save_summary({"video_id": VIDEO_ID, "summary_text": "Greetings.", "key_points": ["Hello"]})
+
+
+@pytest.mark.parametrize("status, error_class, code", FATAL_ERRORS)
+@pytest.mark.parametrize("module, task, stage, get_output", AI_STAGES)
+def test_fatal_ai_error_fails_the_stage(video, monkeypatch, module, task, stage, get_output, status, error_class, code):
+    error = api_error(status, error_class, code)
+    
+    def create(**kwargs):
+        raise error
+    
+    monkeypatch.setattr(module.ai_client.chat.completions, "create", create)
+    saved = get_output(VIDEO_ID)
+    
+    with pytest.raises(error_class):
+        task({"video_id": VIDEO_ID, "regenerate": True, "transcript_text": "Hello there."})
+    
+    # No placeholder summary or template post replaces the stage's output
+    assert get_output(VIDEO_ID) == saved
+    last_error = VideoRepository.get_video(VIDEO_ID)["last_error"]
+    assert last_error["stage"] == stage
+    assert last_error["retrying"] is False
+
+
+def test_duplicate_delivery_is_skipped(video):
+    StageLease.acquire(VIDEO_ID, "summary")
+    
+    payload = summarize.generate_summary({"video_id": VIDEO_ID, "transcript_text": "Hello there."})
+    
+    assert payload["halted"] == "duplicate delivery"
+    document = VideoRepository.get_video(VIDEO_ID)
+    assert "last_error" not in document and "retry_counts" not in document
+
+
+def test_redelivery_runs_again_when_the_lease_expires(video, monkeypatch):
+    StageLease.acquire(VIDEO_ID, "summary", ttl_seconds=600)
+    resent = []
+    
+    class Signature:
+        def __init__(self, **options):
+            self.options = options
+        
+        def apply_async(self):
+            resent.append(self.options)
+    
+    monkeypatch.setattr(summarize.generate_summary, "signature_from_request", Signature)
+    
+    # The broker gave the message back after the lease holder's worker was lost
+    summarize.generate_summary.push_request(args=[VIDEO_ID], kwargs={}, delivery_info={"redelivered": True})
+    try:
+        with pytest.raises(Ignore):
+            summarize.generate_summary.run(VIDEO_ID)
+    finally:
+        summarize.generate_summary.pop_request()
+    
+    assert len(resent) == 1 and 590 < resent[0]["countdown"] <= 600
+    assert "last_error" not in VideoRepository.get_video(VIDEO_ID)
+
+
+def test_key_points_link_to_the_moment_they_are_quoted_from(video, monkeypatch):
+    transcript = Transcript(VIDEO_ID, [
+        TranscriptSegment("Welcome to the show.", 0.0, 4.0),
+        TranscriptSegment("Caching makes reads   cheap.", 65.5, 5.0)
+    ])
+    TranscriptRepository.save_transcript(transcript.to_dict())
+    monkeypatch.setattr(
+        summarize,
+        "_generate_ai_summary",
+        lambda text: ("A talk about caching.", ["caching makes reads cheap", "A paraphrased point"])
+    )
+    
+    payload = summarize.generate_summary({
+        "video_id": VIDEO_ID,
+        "regenerate": True,
+        "transcript_text": transcript.get_full_text()
+    })
+    
+    assert payload["summary"]["key_point_times"] == [65.5, None]
+    assert SummaryRepository.get_summary(VIDEO_ID)["key_point_times"] == [65.5, None]
+    
+    monkeypatch.setattr(linkedin_post, "AI_MODEL_TYPE", "template")
+    payload["video"] = pack_video(VideoRepository.get_video(VIDEO_ID))
+    content = linkedin_post.generate_linkedin_post(payload)["post"]["content"]
+    
+    assert f"• caching makes reads cheap (https://www.youtube.com/watch?v={VIDEO_ID}&t=65s)" in content
+    assert "• A paraphrased point\n" in content
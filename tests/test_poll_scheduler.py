@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from app.api.poll_scheduler import QUOTA_TIMEZONE, PollScheduler, QuotaBudget
+from app.core.database import QuotaUsageRepository
+
+# 10:00 Pacific on two consecutive quota days
+DAY_ONE = datetime(2024, 3, 4, 10, 0, tzinfo=QUOTA_TIMEZONE).timestamp()
+DAY_TWO = datetime(2024, 3, 5, 10, 0, tzinfo=QUOTA_TIMEZONE).timestamp()
+
+
+def test_quota_is_shared_between_processes():
+    monitor_quota = QuotaBudget(daily_budget=100)
+    webapp_quota = QuotaBudget(daily_budget=100)
+    
+    monitor_quota.charge("playlistItems.list", now=DAY_ONE)
+    webapp_quota.charge("videos.list", now=DAY_ONE)
+    webapp_quota.charge("search.list", now=DAY_ONE)
+    
+    assert QuotaUsageRepository.get_units("2024-03-04") == 102
+    assert monitor_quota.spent(now=DAY_ONE) == 102
+    assert monitor_quota.spent_here(now=DAY_ONE) == 1
+    assert monitor_quota.remaining(now=DAY_ONE) == 0
+    
+    # A new quota day starts from zero
+    assert monitor_quota.spent(now=DAY_TWO) == 0
+
+
+def test_quota_without_persistence_counts_this_process():
+    quota = QuotaBudget(daily_budget=100, persistent=False)
+    quota.charge("videos.list", now=DAY_ONE)
+    
+    assert quota.spent(now=DAY_ONE) == 1
+    assert QuotaUsageRepository.get_units("2024-03-04") == 0
+
+
+def test_cost_per_poll_restarts_with_the_quota_day():
+    scheduler = PollScheduler(QuotaBudget(daily_budget=10000))
+    for _ in range(4):
+        scheduler.quota.charge("playlistItems.list", now=DAY_ONE)
+        scheduler.quota.charge("videos.list", now=DAY_ONE)
+        scheduler.reschedule("UCchannel", now=DAY_ONE)
+    assert scheduler.cost_per_poll(now=DAY_ONE) == 2
+    
+    # Spending by other processes does not count as polling cost
+    QuotaUsageRepository.add_units(QuotaBudget.day_key(QuotaBudget.day_bounds(DAY_ONE)[0]), 500)
+    assert scheduler.cost_per_poll(now=DAY_ONE) == 2
+    
+    scheduler.quota.charge("playlistItems.list", now=DAY_TWO)
+    scheduler.reschedule("UCchannel", now=DAY_TWO)
+    assert scheduler.cost_per_poll(now=DAY_TWO) == 1
+
+
+def test_budget_stretch_counts_spending_by_other_processes():
+    scheduler = PollScheduler(QuotaBudget(daily_budget=1000), default_interval=60)
+    scheduler.add("UCchannel", due_at=DAY_ONE)
+    scheduler.reschedule("UCchannel", now=DAY_ONE)
+    assert scheduler.budget_stretch(now=DAY_ONE) == 1.0
+    
+    QuotaUsageRepository.add_units(QuotaBudget.day_key(QuotaBudget.day_bounds(DAY_ONE)[0]), 1000)
+    assert scheduler.budget_stretch(now=DAY_ONE) == float("inf")
@@ -0,0 +1,153 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.database import TRANSCRIPT_INDEX_FIELDS, TranscriptRepository
+from app.models.transcript import LazyTranscript, Transcript, TranscriptSegment
+from app.models.transcript_codec import (
+    COMPRESS_MIN_CHARS,
+    OFFSET_TYPECODE,
+    TIME_TYPECODE,
+    is_columnar,
+    pack_column,
+    unpack_column
+)
+
+VIDEO_ID = "vid1"
+
+SEGMENTS = [
+    ("Welcome to the show.", 0.0, 4.0),
+    ("Today: caching in Python.", 4.0, 3.5),
+    ("Ünïcode and ß survive too.", 10.0, 2.0),
+    ("Thanks for watching!", 12.0, 3.0)
+]
+
+
+def make_transcript(segments=SEGMENTS) -> Transcript:
+    return Transcript(VIDEO_ID, [TranscriptSegment(text, start, duration) for text, start, duration in segments])
+
+
+def legacy_document(segments=SEGMENTS) -> dict:
+    """Transcript document in the one-subdocument-per-segment layout."""
+    return {
+        "video_id": VIDEO_ID,
+        "language": "en",
+        "created_at": datetime(2024, 3, 4, 10, 0),
+        "segments": [{"text": text, "start": start, "duration": duration} for text, start, duration in segments]
+    }
+
+
+def segment_tuples(segments) -> list:
+    return [(segment.text, segment.start, segment.duration) for segment in segments]
+
+
+def test_columns_round_trip():
+    data = pack_column(TIME_TYPECODE, [0.0, 1.5, 2.25])
+    
+    assert len(data) == 24
+    assert list(unpack_column(TIME_TYPECODE, data)) == [0.0, 1.5, 2.25]
+    with pytest.raises(ValueError):
+        unpack_column(OFFSET_TYPECODE, data[:-1])
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_short_text_is_never_compressed(compress):
+    data = make_transcript().to_dict(compress=compress)
+    
+    assert is_columnar(data)
+    assert data["text_compression"] is None
+    assert segment_tuples(Transcript.from_dict(data).segments) == SEGMENTS
+
+
+@pytest.mark.parametrize("compress, compression", [(True, "zlib"), (False, None)])
+def test_long_text_is_compressed_when_enabled(compress, compression):
+    segments = [(f"Segment number {index} of a long talk.", index * 2.0, 2.0) for index in range(200)]
+    transcript = make_transcript(segments)
+    assert len(transcript.get_full_text()) >= COMPRESS_MIN_CHARS
+    
+    data = transcript.to_dict(compress=compress)
+    
+    assert data["text_compression"] == compression
+    assert isinstance(data["text"], bytes if compress else str)
+    assert segment_tuples(Transcript.from_dict(data).segments) == segments
+    assert LazyTranscript.from_dict(data).get_full_text() == transcript.get_full_text()
+
+
+def test_stored_transcript_round_trips_through_mongo():
+    TranscriptRepository.save_transcript(make_transcript().to_dict())
+    
+    stored = TranscriptRepository.get_transcript(VIDEO_ID)
+    
+    assert segment_tuples(Transcript.from_dict(stored).segments) == SEGMENTS
+    assert segment_tuples(LazyTranscript.from_dict(stored)) == SEGMENTS
+
+
+def test_legacy_documents_are_still_read():
+    document = legacy_document()
+    lazy = LazyTranscript.from_dict(document)
+    
+    assert not is_columnar(document)
+    assert segment_tuples(Transcript.from_dict(document).segments) == SEGMENTS
+    assert segment_tuples(lazy) == SEGMENTS
+    assert lazy.get_full_text() == make_transcript().get_full_text()
+    assert list(lazy.offsets) == list(LazyTranscript.from_dict(make_transcript().to_dict()).offsets)
+
+
+@pytest.mark.parametrize("document", [make_transcript().to_dict(), legacy_document()], ids=["columnar", "legacy"])
+def test_lazy_indexing(document):
+    lazy = LazyTranscript.from_dict(document)
+    
+    assert len(lazy) == len(SEGMENTS)
+    assert segment_tuples([lazy[1], lazy[-1]]) == [SEGMENTS[1], SEGMENTS[-1]]
+    assert segment_tuples(lazy.iter_segments(1, 3)) == SEGMENTS[1:3]
+    assert segment_tuples(lazy.to_transcript().segments) == SEGMENTS
+    for index in (len(SEGMENTS), -len(SEGMENTS) - 1):
+        with pytest.raises(IndexError):
+            lazy[index]
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    (0.0, 4.0, [0]),
+    (3.0, 5.0, [0, 1]),
+    # 7.5 to 10.0 falls between the second and third segments
+    (8.0, 9.0, []),
+    (7.5, 10.5, [2]),
+    (11.0, 100.0, [2, 3]),
+    (100.0, 200.0, [])
+])
+def test_iter_window(start, end, expected):
+    lazy = LazyTranscript.from_dict(make_transcript().to_dict())
+    
+    assert segment_tuples(lazy.iter_window(start, end)) == [SEGMENTS[index] for index in expected]
+
+
+def test_timestamps_by_offset_and_snippet():
+    transcript = make_transcript()
+    lazy = LazyTranscript.from_dict(transcript.to_dict())
+    text = transcript.get_full_text()
+    
+    assert lazy.timestamp_at(0) == 0.0
+    assert lazy.timestamp_at(text.index("Thanks")) == 12.0
+    assert lazy.timestamp_of("CACHING in   python") == 4.0
+    assert transcript.timestamp_of("thanks for watching") == 12.0
+    assert lazy.timestamp_of("not in the video") is None
+    assert lazy.timestamp_of("  ") is None
+
+
+def test_snippet_offsets_are_not_shifted_by_case_folding():
+    # "İ".lower() is two characters long, so searching the lowered text put
+    # "ok" three characters late, in the next segment
+    transcript = make_transcript([("We saw İzmir, İstanbul and İzmit, ok", 0.0, 5.0), ("Next stop is Ankara.", 5.0, 5.0)])
+    
+    assert transcript.timestamp_of("OK") == 0.0
+    assert transcript.timestamp_of("next stop") == 5.0
+
+
+def test_offset_index_needs_no_text():
+    TranscriptRepository.save_transcript(make_transcript().to_dict())
+    stored = TranscriptRepository.get_transcript(VIDEO_ID, projection=TRANSCRIPT_INDEX_FIELDS)
+    
+    offset_index = LazyTranscript.from_dict(stored).get_offset_index()
+    
+    assert "text" not in stored
+    assert offset_index.timestamp_of(make_transcript().get_full_text(), "Ünïcode and") == 10.0
@@ -0,0 +1,132 @@
+import hashlib
+import hmac
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.api import websub
+from app.api.websub import WebSubReceiver, renew_leases, request_subscription, signature_valid, topic_url
+from app.core.database import ChannelStateRepository, VideoRepository
+from config.config import RABBITMQ_QUEUE, WEBSUB_CALLBACK_URL
+from tests.local_hub import LocalHub, atom_notification
+
+SECRET = "s3cret"
+CHANNEL = "UCchannel0000000000000000"
+OTHER_CHANNEL = "UCother000000000000000000"
+
+
+@pytest.fixture
+def client(monkeypatch, monitor):
+    """Flask test client of the web app, with WebSub enabled on the monitor fixture."""
+    from app.ui import app as webapp
+    
+    monkeypatch.setattr(websub, "WEBSUB_SECRET", SECRET)
+    monkeypatch.setattr(webapp, "websub_receiver", WebSubReceiver(monitor=monitor, secret=SECRET))
+    return webapp.app.test_client()
+
+
+@pytest.fixture
+def hub(client) -> LocalHub:
+    ChannelStateRepository.register_channel(CHANNEL)
+    return LocalHub(client)
+
+
+def sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha1=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha1).hexdigest()
+
+
+def test_receiver_requires_secret():
+    with pytest.raises(ValueError):
+        WebSubReceiver(secret=None)
+    assert not signature_valid(b"<feed/>", sign(b"<feed/>"), secret=None)
+
+
+def test_signature_check(client, monitor, youtube):
+    ChannelStateRepository.register_channel(CHANNEL)
+    youtube.add_upload(CHANNEL, "vid1")
+    body = atom_notification(CHANNEL, "vid1")
+    
+    for signature in (None, "sha1=0000", sign(body, "wrong"), "md5=" + hashlib.md5(body).hexdigest()):
+        headers = {"X-Hub-Signature": signature} if signature else {}
+        assert client.post("/websub/youtube", data=body, headers=headers).status_code == 204
+    assert monitor.publisher.messages == []
+    
+    assert client.post("/websub/youtube", data=body, headers={"X-Hub-Signature": sign(body)}).status_code == 204
+    assert [queue for queue, _ in monitor.publisher.messages] == [RABBITMQ_QUEUE]
+    assert VideoRepository.get_video("vid1") is not None
+
+
+def test_verify_intent_echoes_challenge(client):
+    ChannelStateRepository.register_channel(CHANNEL)
+    params = {
+        "hub.mode": "subscribe",
+        "hub.topic": topic_url(CHANNEL),
+        "hub.challenge": "challenge-123",
+        "hub.lease_seconds": "3600"
+    }
+    
+    response = client.get("/websub/youtube", query_string=params)
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == "challenge-123"
+    expires_at = ChannelStateRepository.get_state(CHANNEL)["websub_lease_expires_at"]
+    assert expires_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc) + timedelta(minutes=59)
+    
+    # Unregistered channels are not subscribed, and enabled ones are not unsubscribed
+    assert client.get("/websub/youtube", query_string={**params, "hub.topic": topic_url(OTHER_CHANNEL)}).status_code == 404
+    assert client.get("/websub/youtube", query_string={**params, "hub.mode": "unsubscribe"}).status_code == 404
+    assert client.get("/websub/youtube", query_string={**params, "hub.topic": "https://example.com/feed"}).status_code == 404
+
+
+def test_subscribed_push_is_queued(hub, monitor, youtube):
+    youtube.add_upload(CHANNEL, "vid1", "First video")
+    
+    assert request_subscription(CHANNEL, session=hub)
+    assert hub.subscriptions[(WEBSUB_CALLBACK_URL, topic_url(CHANNEL))]["secret"] == SECRET
+    assert hub.publish(CHANNEL, "vid1", "First video") == 1
+    assert len(monitor.publisher.messages) == 1
+    assert ChannelStateRepository.get_state(CHANNEL)["last_video_id"] == "vid1"
+    
+    # The same video pushed again (e.g. a title edit) is not queued twice
+    hub.publish(CHANNEL, "vid1", "Edited title")
+    assert len(monitor.publisher.messages) == 1
+
+
+def test_push_naming_another_channel_is_rejected(hub, monitor, youtube):
+    youtube.add_upload(OTHER_CHANNEL, "foreign")
+    request_subscription(CHANNEL, session=hub)
+    
+    # Signed for a registered channel, but videos.list places the video elsewhere
+    hub.publish(CHANNEL, "foreign")
+    hub.publish(CHANNEL, "missing")
+    assert monitor.publisher.messages == []
+    assert VideoRepository.get_video("foreign") is None
+
+
+def test_entity_expansion_is_ignored(client, monitor):
+    body = b"""<?xml version="1.0"?>
+<!DOCTYPE feed [<!ENTITY a "aaaaaaaaaa"><!ENTITY b "&a;&a;&a;&a;&a;&a;&a;&a;&a;&a;">]>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>&b;</title></feed>"""
+    
+    assert client.post("/websub/youtube", data=body, headers={"X-Hub-Signature": sign(body)}).status_code == 204
+    assert monitor.publisher.messages == []
+
+
+def test_renew_leases(hub):
+    now = datetime.now(timezone.utc)
+    ChannelStateRepository.register_channel("UCexpiring0000000000000000", websub_lease_expires_at=now + timedelta(hours=2))
+    ChannelStateRepository.register_channel("UCleased00000000000000000", websub_lease_expires_at=now + timedelta(days=3))
+    ChannelStateRepository.register_channel("UCpending00000000000000000", websub_requested_at=now - timedelta(minutes=5))
+    ChannelStateRepository.register_channel("UCdisabled0000000000000000", enabled=False)
+    
+    assert renew_leases(session=hub, now=now) == 2
+    assert {topic for _, topic in hub.subscriptions} == {
+        topic_url(CHANNEL),
+        topic_url("UCexpiring0000000000000000")
+    }
+    for channel_id in (CHANNEL, "UCexpiring0000000000000000"):
+        state = ChannelStateRepository.get_state(channel_id)
+        assert state["websub_lease_expires_at"].replace(tzinfo=timezone.utc) > now + timedelta(days=4)
+        assert state["websub_requested_at"] is None
+    
+    # Renewed leases are not requested again until they near expiry
+    assert renew_leases(session=hub, now=now) == 0
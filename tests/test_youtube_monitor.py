@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+
+from app.api import youtube_monitor
+from app.core.database import ChannelStateRepository, MongoDB
+from app.models.video import Video
+from config.config import RABBITMQ_BACKFILL_QUEUE, RABBITMQ_QUEUE
+
+CHANNEL = "UCchannel0000000000000000"
+
+
+def playlist_pages(youtube) -> int:
+    return sum(method == "playlistItems.list" for method, _ in youtube.calls)
+
+
+def test_first_poll_without_watermark_checks_last_day(monitor, youtube):
+    now = datetime.now(timezone.utc)
+    youtube.add_uploads(CHANNEL, 100, start=now - timedelta(minutes=30))
+    
+    videos = monitor.get_latest_videos(channel_id=CHANNEL)
+    
+    # Uploads are an hour apart, so the last 24 hours hold 24 of them, all on the first page
+    assert len(videos) == 24
+    assert [video.video_id for video in videos] == [f"{CHANNEL}-{index:05d}" for index in range(23, -1, -1)]
+    assert playlist_pages(youtube) == 1
+
+
+def test_poll_pages_until_watermark(monitor, youtube):
+    now = datetime.now(timezone.utc)
+    youtube.add_uploads(CHANNEL, 300, start=now)
+    ChannelStateRepository.update_state(CHANNEL, last_published_at=now - timedelta(hours=120, minutes=30))
+    
+    videos = monitor.get_latest_videos(channel_id=CHANNEL)
+    
+    assert len(videos) == 121
+    assert playlist_pages(youtube) == 3
+
+
+def test_poll_stops_at_page_limit(monitor, youtube, monkeypatch):
+    monkeypatch.setattr(youtube_monitor, "YOUTUBE_MAX_PAGES_PER_POLL", 2)
+    now = datetime.now(timezone.utc)
+    youtube.add_uploads(CHANNEL, 300, start=now)
+    ChannelStateRepository.update_state(CHANNEL, last_published_at=now - timedelta(days=365))
+    
+    videos = monitor.get_latest_videos(channel_id=CHANNEL)
+    
+    assert len(videos) == 100
+    assert playlist_pages(youtube) == 2
+
+
+def test_check_channel_advances_watermark(monitor, youtube):
+    now = datetime.now(timezone.utc)
+    youtube.add_uploads(CHANNEL, 3, start=now - timedelta(minutes=5))
+    
+    assert len(monitor.check_channel(CHANNEL)) == 3
+    state = ChannelStateRepository.get_state(CHANNEL)
+    assert state["last_video_id"] == f"{CHANNEL}-00000"
+    assert len(monitor.publisher.messages) == 3
+    
+    # Nothing new: the cached first page revalidates and still starts at the watermark
+    assert monitor.check_channel(CHANNEL) == []
+    assert youtube.not_modified == 1
+    
+    youtube.add_upload(CHANNEL, "fresh", published_at=now)
+    videos = monitor.check_channel(CHANNEL)
+    assert [video.video_id for video in videos] == ["fresh"]
+    assert ChannelStateRepository.get_state(CHANNEL)["last_video_id"] == "fresh"
+    assert len(monitor.publisher.messages) == 4
+
+
+def test_backdated_upload_below_watermark_stops_paging(monitor, youtube):
+    now = datetime.now(timezone.utc)
+    youtube.add_uploads(CHANNEL, 2, start=now - timedelta(hours=1))
+    monitor.check_channel(CHANNEL)
+    
+    # Published (e.g. made public) with an older date than the newest video seen
+    youtube.add_upload(CHANNEL, "backdated", published_at=now - timedelta(days=3))
+    youtube.add_upload(CHANNEL, "newer", published_at=now)
+    
+    videos = monitor.check_channel(CHANNEL)
+    assert [video.video_id for video in videos] == ["newer"]
+    assert playlist_pages(youtube) == 2
+
+
+def test_deferred_video_returns_to_its_lane(monitor, youtube):
+    now = datetime.now(timezone.utc)
+    for video_id, queue in (("old-upload", RABBITMQ_BACKFILL_QUEUE), ("new-upload", RABBITMQ_QUEUE)):
+        upload = youtube.add_upload(CHANNEL, video_id, published_at=now, contentDetails={"duration": "PT5M", "caption": "false"})
+        video = Video.from_playlist_item({
+            "snippet": {"title": video_id, "channelId": CHANNEL, "publishedAt": upload["published_at"]},
+            "contentDetails": {"videoId": video_id}
+        })
+        monitor.process_new_videos(monitor.enrich_videos([video]), queue=queue, source="backfill")
+    assert monitor.publisher.messages == []
+    
+    # Captions arrived and the deferral ended
+    for upload in youtube.uploads[CHANNEL]:
+        upload["contentDetails"]["caption"] = "true"
+    MongoDB.get_videos_collection().update_many({}, {"$set": {"deferred_until": now - timedelta(minutes=1)}})
+    
+    assert monitor.process_deferred_videos() == 2
+    assert sorted(queue for queue, _ in monitor.publisher.messages) == sorted([RABBITMQ_BACKFILL_QUEUE, RABBITMQ_QUEUE])
+    queued = {queue: body for queue, body in monitor.publisher.messages}
+    assert b"old-upload" in queued[RABBITMQ_BACKFILL_QUEUE]
+    assert b"new-upload" in queued[RABBITMQ_QUEUE]
+
+
+def test_backfill_counts_only_published_videos(monitor, youtube, monkeypatch):
+    monkeypatch.setattr(youtube_monitor.time, "sleep", lambda seconds: None)
+    now = datetime.now(timezone.utc)
+    youtube.add_uploads(CHANNEL, 3, start=now - timedelta(days=30))
+    youtube.add_upload(CHANNEL, "no-captions", published_at=now, contentDetails={"duration": "PT5M", "caption": "false"})
+    
+    assert monitor.backfill(CHANNEL) == 3
+    assert ChannelStateRepository.get_state(CHANNEL)["backfill_queued"] == 3
+    assert [queue for queue, _ in monitor.publisher.messages] == [RABBITMQ_BACKFILL_QUEUE] * 3